@@ -2,8 +2,11 @@ import json
 import logging
 import threading
 
+from asgiref.sync import sync_to_async
 from django.utils.deprecation import MiddlewareMixin
 
+from item_manager.middleware import get_request_context
+
 from .services import EmailNotificationService
 
 logger = logging.getLogger(__name__)
@@ -15,6 +18,13 @@ class EmailNotificationMiddleware(MiddlewareMixin):
         self.get_response = get_response
         super().__init__(get_response)
 
+    async def __acall__(self, request):
+        """ASGI 下只读请求直接返回，不为 process_response 切换线程"""
+        response = await self.get_response(request)
+        if request.method not in ['POST', 'PUT', 'PATCH']:
+            return response
+        return await sync_to_async(self.process_response, thread_sensitive=True)(request, response)
+
     def process_response(self, request, response):
         """处理响应，在数据修改操作成功后异步发送邮件通知"""
         try:
@@ -35,7 +45,7 @@ class EmailNotificationMiddleware(MiddlewareMixin):
                 return response
 
             # 获取用户信息
-            user_info = self._get_user_info(request)
+            user_info = get_request_context(request).actor
 
             # 异步处理邮件通知，避免阻塞API响应
             if '/api/items/' in request.path:
@@ -54,25 +64,6 @@ class EmailNotificationMiddleware(MiddlewareMixin):
 
         return response
 
-    def _get_user_info(self, request):
-        """获取用户信息"""
-        try:
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                return f"{request.user.username} ({request.user.email})"
-            else:
-                return f"匿名用户 (IP: {self._get_client_ip(request)})"
-        except:
-            return "未知用户"
-
-    def _get_client_ip(self, request):
-        """获取客户端IP"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-
     def _handle_item_operation_async(self, request, response, user_info):
         """异步处理物品操作"""
         def send_notification():
@@ -43,6 +43,9 @@ LABEL_MAP = {
     'condition_after': '使用后状况',
     'purchase_date': '购买日期',
     'expected_return_time': '预计归还时间',
+    'is_overdue': '是否逾期',
+    'overdue_count': '逾期数量',
+    'new_overdue_count': '新增逾期数量',
 
     # 财务记录
     'amount': '金额',
@@ -179,24 +182,26 @@ class EmailNotificationService:
     @staticmethod
     def send_operation_notification(operation_type, model_name, instance_data, user_info=None):
         """
-        发送操作通知邮件到多个邮箱（带HTML模板，按label显示，空值隐藏）。
+        发送操作通知邮件到多个邮箱（带HTML模板，按label显示，空值隐藏），返回发送成功的邮箱数量。
         """
+        sent = 0
         try:
             settings_data = EmailNotificationService.get_notification_settings()
 
             if not settings_data.get('email_enabled') or not settings_data.get('notification_emails'):
-                return
+                return sent
 
             notification_emails = settings_data.get('notification_emails', [])
             if not notification_emails:
                 logger.warning("没有配置启用的通知邮箱")
-                return
+                return sent
 
             # 操作类型映射
             operation_map = {
                 'CREATE': '创建',
                 'UPDATE': '更新',
-                'DELETE': '删除'
+                'DELETE': '删除',
+                'OVERDUE': '逾期提醒',
             }
             operation_text = operation_map.get(operation_type, operation_type)
 
@@ -250,12 +255,14 @@ class EmailNotificationService:
                             fail_silently=False,
                             html_message=html_body,
                         )
+                        sent += 1
                         logger.info(f"邮件通知发送成功到 {email}: {operation_type} {model_name}")
                     except Exception as e:
                         logger.error(f"发送邮件到 {email} 失败: {e}")
 
         except Exception as e:
             logger.error(f"发送邮件通知失败: {e}")
+        return sent
 
     @staticmethod
     def send_item_operation_notification(operation_type, item_instance, user_info=None):
@@ -298,6 +305,38 @@ class EmailNotificationService:
         except Exception as e:
             logger.error(f"准备财务记录操作通知失败: {e}")
 
+    @staticmethod
+    def send_overdue_digest_notification(overdue_usages, new_overdue_count=0, batch_size=50):
+        """
+        同步发送物品逾期提醒汇总邮件（由定时任务调用），返回至少成功发送到一个邮箱的记录
+
+        每封邮件最多包含 batch_size 条逾期记录，避免逐条发送邮件。
+        """
+        now = timezone.now()
+        total = len(overdue_usages)
+        batch_count = (total + batch_size - 1) // batch_size
+        delivered = []
+
+        for batch_index in range(batch_count):
+            batch = overdue_usages[batch_index * batch_size:(batch_index + 1) * batch_size]
+            instance_data = {
+                'operation_type': f'物品逾期汇总（第 {batch_index + 1}/{batch_count} 封）' if batch_count > 1 else '物品逾期汇总',
+                'overdue_count': total,
+                'new_overdue_count': new_overdue_count,
+                'timestamp': timezone.localtime(now).strftime('%Y-%m-%d %H:%M'),
+            }
+            for usage in batch:
+                overdue_days = (now - usage.expected_return_time).days
+                expected = timezone.localtime(usage.expected_return_time).strftime('%Y-%m-%d %H:%M')
+                instance_data[f'#{usage.id} {usage.item.name} ({usage.item.serial_number})'] = (
+                    f'借用人: {usage.user}，联系方式: {usage.borrower_contact}，'
+                    f'预计归还: {expected}，已逾期 {overdue_days} 天'
+                )
+
+            if EmailNotificationService.send_operation_notification('OVERDUE', '物品', instance_data):
+                delivered.extend(batch)
+        return delivered
+
     @staticmethod
     def send_evaluation_operation_notification(operation_type, evaluation_instance=None, user_info=None, operation_description=None):
         """异步发送考评操作通知"""
@@ -1,15 +1,16 @@
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
 import json
 import re
 
+from item_manager.authentication import CachedJWTAuthentication
+
 from .services import EmailNotificationService
 
 
 @api_view(["GET", "POST"])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([CachedJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def notification_settings(request):
     """通知设置API（需要JWT）"""
@@ -91,7 +92,7 @@ def notification_settings(request):
 
 
 @api_view(["POST"])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([CachedJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def toggle_email_status(request):
     """切换邮箱启用状态API（需要JWT）"""
@@ -11,4 +11,5 @@ class EvaluationRecordAdmin(admin.ModelAdmin):
     ]
     list_filter = ['department', 'evaluation_date', 'created_at']
     search_fields = ['personnel', 'item_description', 'remarks']
+    raw_id_fields = ['personnel_ref']
     ordering = ['-evaluation_date', '-created_at']
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class EvaluationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'evaluation'
+
+    def ready(self):
+        from item_manager.caching import register_versioned_models
+        register_versioned_models('evaluation.EvaluationRecord')
+        # 注册导入样表
+        from . import spreadsheets  # noqa: F401
@@ -0,0 +1,47 @@
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+
+from item_manager.async_views import async_api_view, format_decimal, int_param, json_response
+
+from .models import EvaluationRecord
+
+
+@async_api_view
+async def personnel_summary(request):
+    """人员汇总（异步），与 personnel-summary 接口相同，支持 department / personnel / personnel_id / grade 过滤"""
+    department_id = int_param(request, 'department')
+    personnel_id = int_param(request, 'personnel_id')
+    queryset = EvaluationRecord.objects.all()
+    if department_id is not None:
+        queryset = queryset.filter(department_id=department_id)
+    if request.GET.get('personnel'):
+        queryset = queryset.filter(personnel__icontains=request.GET['personnel'])
+    if personnel_id is not None:
+        queryset = queryset.filter(personnel_ref_id=personnel_id)
+    if request.GET.get('grade'):
+        queryset = queryset.filter(grade__icontains=request.GET['grade'])
+
+    summary = queryset.group_by_person().annotate(
+        total_bonus=Sum('bonus_score'),
+        total_deduction=Sum('deduction_score'),
+        bonus_count=Count('id', filter=Q(bonus_score__gt=0)),
+        deduction_count=Count('id', filter=Q(deduction_score__gt=0)),
+    ).order_by('department_name', 'person_name')
+
+    result = []
+    async for row in summary.aiterator():
+        total_bonus = row['total_bonus'] or Decimal('0')
+        total_deduction = row['total_deduction'] or Decimal('0')
+        result.append({
+            'personnel': row['person_name'],
+            'personnel_id': row['personnel_ref'],
+            'department_name': row['department_name'] or '',
+            'grade': row['person_grade'] or '',
+            'total_bonus': format_decimal(total_bonus),
+            'total_deduction': format_decimal(total_deduction),
+            'total_score': format_decimal(total_bonus - total_deduction),
+            'bonus_count': row['bonus_count'],
+            'deduction_count': row['deduction_count'],
+        })
+    return json_response(result)
@@ -15,6 +15,10 @@ class EvaluationRecordFilter(django_filters.FilterSet):
         lookup_expr='icontains',
         label='人员'
     )
+    personnel_id = django_filters.NumberFilter(
+        field_name='personnel_ref',
+        label='关联人员'
+    )
     grade = django_filters.CharFilter(
         field_name='grade',
         lookup_expr='icontains',
@@ -23,5 +27,5 @@ class EvaluationRecordFilter(django_filters.FilterSet):
 
     class Meta:
         model = EvaluationRecord
-        fields = ['department', 'personnel', 'grade']
+        fields = ['department', 'personnel', 'personnel_id', 'grade']
 
@@ -0,0 +1,77 @@
+"""
+考评记录与人员名单的关联
+
+考评记录的人员、年级是自由文本，按 姓名 + 部门 + 年级 与 personnel.Personnel 匹配后写入 personnel_ref。
+人员的 grade_major（如“2024级 计算机”）与考评记录的年级（如“24”“2024级”）写法不同，统一取两位年份比较。
+同名同部门的多名人员无法按年级区分时不关联，保留文本列。
+"""
+import re
+from collections import defaultdict
+
+from personnel.models import Personnel
+
+from .models import EvaluationRecord
+
+GRADE_YEAR_PATTERN = re.compile(r'\d{2,4}')
+LINK_BATCH_SIZE = 500
+
+
+def grade_key(value):
+    """年级统一为两位年份：'2024级 计算机' / '2024' / '24级' -> '24'，无法识别时返回 None"""
+    match = GRADE_YEAR_PATTERN.search(value or '')
+    return match.group()[-2:] if match else None
+
+
+class PersonnelMatcher:
+    """一次加载人员名单，在内存中按 姓名 + 部门 + 年级 匹配"""
+
+    def __init__(self, names=None):
+        queryset = Personnel.objects.values_list('id', 'name', 'department_id', 'grade_major')
+        if names is not None:
+            queryset = queryset.filter(name__in={name.strip() for name in names})
+        self.roster = defaultdict(list)
+        for personnel_id, name, department_id, grade_major in queryset:
+            self.roster[(name.strip(), department_id)].append((personnel_id, grade_key(grade_major)))
+
+    def match(self, name, department_id, grade):
+        """返回唯一匹配的人员 id，没有或有多个匹配时返回 None"""
+        candidates = self.roster.get(((name or '').strip(), department_id), [])
+        key = grade_key(grade)
+        if key is not None:
+            candidates = [candidate for candidate in candidates if candidate[1] in (key, None)]
+        return candidates[0][0] if len(candidates) == 1 else None
+
+    def link(self, records):
+        """为未关联的记录对象设置 personnel_ref_id，返回关联的数量"""
+        linked = 0
+        for record in records:
+            if record.personnel_ref_id is None:
+                record.personnel_ref_id = self.match(record.personnel, record.department_id, record.grade)
+                linked += record.personnel_ref_id is not None
+        return linked
+
+
+def link_unmatched_records(dry_run=False):
+    """
+    为所有未关联的考评记录匹配人员并批量写入，返回 (关联的记录数, 未匹配的 (姓名, 部门 id, 年级) 列表)
+
+    按 (姓名, 部门, 年级) 去重后只匹配一次，记录按主键分批 bulk_update。
+    """
+    matcher = PersonnelMatcher()
+    unmatched = EvaluationRecord.objects.filter(personnel_ref__isnull=True)
+    matches = {
+        group: matcher.match(*group)
+        for group in unmatched.order_by().values_list('personnel', 'department_id', 'grade').distinct()
+    }
+
+    to_update = []
+    for record_id, *group in unmatched.order_by('id').values_list(
+        'id', 'personnel', 'department_id', 'grade'
+    ).iterator(chunk_size=2000):
+        personnel_id = matches[tuple(group)]
+        if personnel_id is not None:
+            to_update.append(EvaluationRecord(id=record_id, personnel_ref_id=personnel_id))
+
+    if not dry_run and to_update:
+        EvaluationRecord.objects.bulk_update(to_update, ['personnel_ref'], batch_size=LINK_BATCH_SIZE)
+    return len(to_update), sorted(group for group, personnel_id in matches.items() if personnel_id is None)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from evaluation.linking import link_unmatched_records
+
+
+class Command(BaseCommand):
+    help = '按 姓名 + 部门 + 年级 将未关联的考评记录关联到人员名单，可重复执行'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='只统计匹配结果，不写入数据库')
+        parser.add_argument('--show-unmatched', action='store_true', help='列出未能匹配的人员')
+
+    def handle(self, *args, **options):
+        linked, unmatched = link_unmatched_records(dry_run=options['dry_run'])
+        action = '可关联' if options['dry_run'] else '已关联'
+        self.stdout.write(self.style.SUCCESS(f'{action} {linked} 条记录，{len(unmatched)} 组人员未匹配'))
+        if options['show_unmatched']:
+            for name, department_id, grade in unmatched:
+                self.stdout.write(f'  {name}（部门 {department_id}，年级 {grade or "-"}）')
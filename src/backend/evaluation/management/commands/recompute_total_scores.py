@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from evaluation.models import EvaluationRecord
+
+
+class Command(BaseCommand):
+    help = '重新计算考评记录总分（总分 = 加分 - 扣分），修正批量写入时未同步的记录'
+
+    def handle(self, *args, **options):
+        updated = EvaluationRecord.objects.recompute_total_scores()
+        if updated:
+            self.stdout.write(self.style.SUCCESS(f'已修正 {updated} 条记录的总分'))
+        else:
+            self.stdout.write(self.style.SUCCESS('所有记录的总分都正确'))
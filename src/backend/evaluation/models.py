@@ -1,6 +1,83 @@
 from django.db import models
+from django.db.models import Case, CharField, ExpressionWrapper, F, IntegerField, Max, Q, Value, When
 from django.utils import timezone
 
+from item_manager.caching import bump_model_version
+
+SCORE_FIELDS = ('bonus_score', 'deduction_score')
+
+
+def compute_total_score(bonus_score, deduction_score):
+    return (bonus_score or 0) - (deduction_score or 0)
+
+
+class EvaluationRecordQuerySet(models.QuerySet):
+    """
+    维护 total_score = bonus_score - deduction_score
+
+    update / bulk_create / bulk_update 不会调用 save()，这里在修改加分或扣分时同步写入总分，
+    批量导入和批量修正分数都不需要调用方再计算总分。这些操作也不触发模型信号，完成后（事务提交后）更换数据版本号。
+    """
+
+    def update(self, **kwargs):
+        if 'total_score' not in kwargs and any(field in kwargs for field in SCORE_FIELDS):
+            bonus, deduction = (
+                kwargs.get(field, F(field)) for field in SCORE_FIELDS
+            )
+            total = ExpressionWrapper(
+                (bonus if hasattr(bonus, 'resolve_expression') else Value(bonus))
+                - (deduction if hasattr(deduction, 'resolve_expression') else Value(deduction)),
+                output_field=self.model._meta.get_field('total_score'),
+            )
+            # total_score 放在最前面：MySQL 按顺序赋值，后面的列在赋值后读取的是新值
+            kwargs = {'total_score': total, **kwargs}
+        rows = super().update(**kwargs)
+        bump_model_version(self.model, self.db)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.total_score = compute_total_score(obj.bonus_score, obj.deduction_score)
+        created = super().bulk_create(objs, *args, **kwargs)
+        bump_model_version(self.model, self.db)
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if 'total_score' not in fields and any(field in fields for field in SCORE_FIELDS):
+            fields = [*fields, 'total_score']
+            for obj in objs:
+                obj.total_score = compute_total_score(obj.bonus_score, obj.deduction_score)
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        bump_model_version(self.model, self.db)
+        return rows
+
+    def group_by_person(self):
+        """
+        按人员分组：已关联人员的记录只按 personnel_ref 分组，未关联的历史记录按 姓名 + 部门 + 年级 分组
+
+        同一人员的记录中年级等文本写法不同（如“24”和“2024级”）时仍合并为一行。每行包含 personnel_ref，
+        以及展示用的 person_name / person_department / department_name / person_grade，可继续 annotate 汇总值。
+        """
+        linked = Q(personnel_ref__isnull=False)
+        return self.order_by().values(
+            'personnel_ref',
+            group_personnel=Case(When(linked, then=Value('')), default=F('personnel'), output_field=CharField()),
+            group_department=Case(When(linked, then=Value(0)), default=F('department'), output_field=IntegerField()),
+            group_grade=Case(When(linked, then=Value('')), default=F('grade'), output_field=CharField()),
+        ).annotate(
+            person_name=Max('personnel'),
+            person_department=Max('department'),
+            department_name=Max('department__name'),
+            person_grade=Max('grade'),
+        )
+
+    def recompute_total_scores(self):
+        """用一条 UPDATE 重新计算总分，返回总分有误并被修正的记录数"""
+        expected = F('bonus_score') - F('deduction_score')
+        return self.exclude(total_score=expected).update(total_score=expected)
+
 
 class EvaluationRecord(models.Model):
     """考评记录"""
@@ -11,6 +88,17 @@ class EvaluationRecord(models.Model):
         verbose_name='所属部门'
     )
     personnel = models.CharField(max_length=100, verbose_name='人员')
+    # 关联到人员名单，link_evaluation_personnel 命令按 姓名 + 部门 + 年级 回填；未匹配的历史记录为空，仍使用文本列
+    # 单列索引由下面的 (personnel_ref, evaluation_date) 联合索引覆盖
+    personnel_ref = models.ForeignKey(
+        'personnel.Personnel',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='evaluation_records',
+        verbose_name='关联人员'
+    )
     grade = models.CharField(max_length=50, blank=True, verbose_name='年级')
     item_description = models.CharField(max_length=255, verbose_name='加/扣分事项说明')
     bonus_score = models.DecimalField(max_digits=8, decimal_places=2, default=0, verbose_name='加分数值')
@@ -21,6 +109,8 @@ class EvaluationRecord(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
 
+    objects = EvaluationRecordQuerySet.as_manager()
+
     class Meta:
         verbose_name = '考评记录'
         verbose_name_plural = verbose_name
@@ -28,6 +118,7 @@ class EvaluationRecord(models.Model):
         indexes = [
             models.Index(fields=['department', 'evaluation_date']),
             models.Index(fields=['personnel', 'evaluation_date']),
+            models.Index(fields=['personnel_ref', 'evaluation_date']),
             models.Index(fields=['evaluation_date']),
         ]
 
@@ -35,5 +126,8 @@ class EvaluationRecord(models.Model):
         return f'{self.evaluation_date} {self.personnel} ({self.total_score})'
 
     def save(self, *args, **kwargs):
-        self.total_score = (self.bonus_score or 0) - (self.deduction_score or 0)
+        self.total_score = compute_total_score(self.bonus_score, self.deduction_score)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and any(field in update_fields for field in SCORE_FIELDS):
+            kwargs['update_fields'] = {*update_fields, 'total_score'}
         super().save(*args, **kwargs)
@@ -1,8 +1,18 @@
+from collections import Counter
+
+from django.utils import timezone
 from rest_framework import serializers
 from django.db.models import Sum, Count, Q
 
+from finance.models import Department
+from search.registry import index_created
+
+from .linking import PersonnelMatcher
 from .models import EvaluationRecord
 
+# 批量录入一次最多的人数
+BATCH_CREATE_MAX_PERSONNEL = 500
+
 
 class EvaluationRecordSerializer(serializers.ModelSerializer):
     department_name = serializers.CharField(source='department.name', read_only=True)
@@ -16,10 +26,22 @@ class EvaluationRecordSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('部门必须是一个有效的ID，不能是对象')
         return value
 
+    def validate(self, attrs):
+        # 未指定关联人员时，按姓名、部门、年级匹配人员名单；修改这些字段时重新匹配
+        if 'personnel_ref' not in attrs and any(field in attrs for field in ('personnel', 'department', 'grade')):
+            personnel = attrs.get('personnel', getattr(self.instance, 'personnel', ''))
+            department = attrs.get('department', getattr(self.instance, 'department', None))
+            grade = attrs.get('grade', getattr(self.instance, 'grade', ''))
+            personnel_id = PersonnelMatcher(names=[personnel]).match(
+                personnel, getattr(department, 'id', None), grade
+            )
+            attrs['personnel_ref_id'] = personnel_id
+        return attrs
+
     class Meta:
         model = EvaluationRecord
         fields = [
-            'id', 'department', 'department_name', 'personnel', 'personnel_name', 'grade',
+            'id', 'department', 'department_name', 'personnel', 'personnel_name', 'personnel_ref', 'grade',
             'item_description', 'bonus_score', 'deduction_score', 'remarks',
             'total_score', 'evaluation_date', 'created_at', 'updated_at'
         ]
@@ -29,6 +51,7 @@ class EvaluationRecordSerializer(serializers.ModelSerializer):
 class PersonnelSummarySerializer(serializers.Serializer):
     """人员汇总序列化器"""
     personnel = serializers.CharField()
+    personnel_id = serializers.IntegerField(allow_null=True)
     department_name = serializers.CharField()
     grade = serializers.CharField()
     total_bonus = serializers.DecimalField(max_digits=10, decimal_places=2)
@@ -37,3 +60,120 @@ class PersonnelSummarySerializer(serializers.Serializer):
     bonus_count = serializers.IntegerField()
     deduction_count = serializers.IntegerField()
 
+
+class PersonnelRankingSerializer(serializers.Serializer):
+    """人员排行榜序列化器"""
+    personnel = serializers.CharField(source='person_name')
+    personnel_id = serializers.IntegerField(source='personnel_ref', allow_null=True)
+    department = serializers.IntegerField(source='person_department')
+    department_name = serializers.CharField()
+    grade = serializers.CharField(source='person_grade')
+    total_bonus = serializers.DecimalField(max_digits=10, decimal_places=2)
+    total_deduction = serializers.DecimalField(max_digits=10, decimal_places=2)
+    total_score = serializers.DecimalField(max_digits=10, decimal_places=2)
+    record_count = serializers.IntegerField()
+    rank = serializers.IntegerField()
+    dense_rank = serializers.IntegerField()
+    percent_rank = serializers.FloatField()
+
+
+class TimelinePointSerializer(serializers.Serializer):
+    """分数时间线中的一个时间段"""
+    period = serializers.DateField()
+    score = serializers.DecimalField(max_digits=10, decimal_places=2)
+    cumulative_score = serializers.DecimalField(max_digits=10, decimal_places=2)
+    record_count = serializers.IntegerField()
+
+
+class BatchPersonnelSerializer(serializers.Serializer):
+    """批量录入中的一名人员，可以直接传姓名字符串，部门和年级默认使用外层的值"""
+    personnel = serializers.CharField(max_length=100)
+    department = serializers.IntegerField(required=False)
+    grade = serializers.CharField(max_length=50, required=False, allow_blank=True)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = {'personnel': data}
+        return super().to_internal_value(data)
+
+
+class EvaluationBatchCreateSerializer(serializers.Serializer):
+    """批量录入：同一事项和分值应用到多名人员"""
+    personnel = BatchPersonnelSerializer(many=True, allow_empty=False)
+    department = serializers.IntegerField(required=False)
+    grade = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+    item_description = serializers.CharField(max_length=255)
+    bonus_score = serializers.DecimalField(max_digits=8, decimal_places=2, min_value=0, default=0)
+    deduction_score = serializers.DecimalField(max_digits=8, decimal_places=2, min_value=0, default=0)
+    evaluation_date = serializers.DateField(required=False)
+    remarks = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+    def validate_personnel(self, value):
+        if len(value) > BATCH_CREATE_MAX_PERSONNEL:
+            raise serializers.ValidationError(f'一次最多录入 {BATCH_CREATE_MAX_PERSONNEL} 人')
+        return value
+
+    def validate(self, attrs):
+        entries = []
+        for entry in attrs['personnel']:
+            department_id = entry.get('department', attrs.get('department'))
+            if department_id is None:
+                raise serializers.ValidationError({'personnel': f'{entry["personnel"]} 缺少部门'})
+            entries.append((entry['personnel'].strip(), department_id, entry.get('grade', attrs['grade']).strip()))
+
+        duplicates = [entry for entry, count in Counter(entries).items() if count > 1]
+        if duplicates:
+            names = '、'.join(sorted({name for name, _, _ in duplicates}))
+            raise serializers.ValidationError({'personnel': f'人员重复: {names}'})
+
+        # 所有部门一次查询校验
+        departments = Department.objects.in_bulk({department_id for _, department_id, _ in entries})
+        missing = sorted({department_id for _, department_id, _ in entries if department_id not in departments})
+        if missing:
+            raise serializers.ValidationError({'department': f'部门不存在: {", ".join(map(str, missing))}'})
+
+        attrs['entries'] = [
+            (name, departments[department_id], grade) for name, department_id, grade in entries
+        ]
+        attrs.setdefault('evaluation_date', timezone.now().date())
+        return attrs
+
+    def create(self, validated_data):
+        records = [
+            EvaluationRecord(
+                personnel=name,
+                department=department,
+                grade=grade,
+                item_description=validated_data['item_description'],
+                bonus_score=validated_data['bonus_score'],
+                deduction_score=validated_data['deduction_score'],
+                evaluation_date=validated_data['evaluation_date'],
+                remarks=validated_data['remarks'],
+            )
+            for name, department, grade in validated_data['entries']
+        ]
+        PersonnelMatcher(names=[record.personnel for record in records]).link(records)
+        started_at = timezone.now()
+        created = EvaluationRecord.objects.bulk_create(records)
+        if any(record.pk is None for record in created):
+            created = self._reselect(created, started_at)
+        # bulk_create 不触发信号，需要手动写入搜索索引
+        index_created(created)
+        return created
+
+    @staticmethod
+    def _reselect(records, started_at):
+        """
+        数据库不回填主键（如 MySQL）时，按事项、日期和写入时间重新查询刚插入的记录
+
+        同一批次中 姓名 + 部门 + 年级 不重复，用它对应回原顺序；窗口内有相同的记录时取主键最大的一条。
+        """
+        inserted = EvaluationRecord.objects.select_related('department').filter(
+            item_description=records[0].item_description,
+            evaluation_date=records[0].evaluation_date,
+            created_at__gte=started_at,
+            personnel__in={record.personnel for record in records},
+            department_id__in={record.department_id for record in records},
+        ).order_by('id')
+        by_entry = {(record.personnel, record.department_id, record.grade): record for record in inserted}
+        return [by_entry[(record.personnel, record.department_id, record.grade)] for record in records]
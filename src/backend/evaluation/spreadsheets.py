@@ -0,0 +1,37 @@
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Font, PatternFill
+
+from item_manager.spreadsheet_templates import register_template
+
+IMPORT_TEMPLATE = 'evaluation_import'
+
+
+@register_template(IMPORT_TEMPLATE, '人员导入样表.xlsx')
+def build_import_template():
+    """人员导入样表：部门、年级、姓名"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = '人员导入样表'
+
+    # 表头
+    headers = ['部门', '年级', '姓名']
+    ws.append(headers)
+
+    # 设置表头样式
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF")
+    for col in range(1, len(headers) + 1):
+        cell = ws.cell(row=1, column=col)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+
+    # 添加示例数据行
+    ws.append(['程序部', '24', '张三'])
+    ws.append(['Web部', '23', '李四'])
+
+    # 设置列宽
+    ws.column_dimensions['A'].width = 20
+    ws.column_dimensions['B'].width = 15
+    ws.column_dimensions['C'].width = 15
+    return wb
@@ -1,3 +1,465 @@
-from django.test import TestCase
+import io
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models import F
+from django.test import AsyncClient, TestCase
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from finance.models import Department
+from personnel.models import Personnel
+
+from item_manager.spreadsheet_templates import _workbook_bytes
+from search.models import SearchDocument
+
+from .models import EvaluationRecord, EvaluationRecordQuerySet
+from .spreadsheets import build_import_template
+
+
+class EvaluationTestMixin:
+    def setUp(self):
+        # 同一事务中的修改提交后只更换一次版本号，这里模拟数据准备的事务已提交
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dept_a = Department.objects.create(name='程序部')
+            self.dept_b = Department.objects.create(name='Web部')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pass1234'))
+
+    def create_record(self, personnel, department, evaluation_date, bonus=0, deduction=0, grade='24',
+                      description='值班'):
+        return EvaluationRecord.objects.create(
+            personnel=personnel, department=department, grade=grade, item_description=description,
+            bonus_score=Decimal(bonus), deduction_score=Decimal(deduction), evaluation_date=evaluation_date,
+        )
+
+
+class EvaluationExportTestCase(EvaluationTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # 不启动真实的邮件通知线程
+        patcher = mock.patch('evaluation.views.EmailNotificationService.send_evaluation_operation_notification')
+        self.notify = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_export_one_sheet_per_person(self):
+        """按人员、部门分表，统计由本表的记录累计，记录按考评时间倒序"""
+        self.create_record('张三', self.dept_a, date(2025, 1, 1), bonus=3)
+        self.create_record('张三', self.dept_a, date(2025, 3, 1), deduction=1)
+        self.create_record('张三', self.dept_a, date(2025, 2, 1), bonus=2)
+        self.create_record('张三', self.dept_b, date(2025, 2, 1), bonus=1)
+        self.create_record('李四', self.dept_b, date(2025, 2, 1), bonus=5)
+
+        response = self.client.get('/api/evaluation-records/export/')
+        self.assertEqual(response.status_code, 200)
+        wb = load_workbook(io.BytesIO(response.content))
+        self.assertEqual(len(wb.sheetnames), 3)
+
+        sheet = next(
+            wb[name] for name in wb.sheetnames
+            if wb[name]['B3'].value == '张三' and wb[name]['B2'].value == '程序部'
+        )
+        self.assertEqual(sheet['B7'].value, '5.00')
+        self.assertEqual(sheet['B8'].value, '1.00')
+        self.assertEqual(sheet['B9'].value, 2)
+        self.assertEqual(sheet['B10'].value, 1)
+        self.assertEqual([row[1] for row in sheet.iter_rows(min_row=13, values_only=True)],
+                         ['2025-03-01', '2025-02-01', '2025-01-01'])
+        self.notify.assert_called_once()
+        self.assertEqual(self.notify.call_args.kwargs['operation_description'], '导出考评记录 - 3名人员，共5条记录')
+
+    def test_export_empty(self):
+        self.assertEqual(self.client.get('/api/evaluation-records/export/').status_code, 400)
+        self.notify.assert_not_called()
+
+
+class EvaluationImportTestCase(EvaluationTestMixin, TestCase):
+    HEADER = '部门,姓名,年级,扣分/加分说明,考评日期,分值,备注\n'
+
+    def setUp(self):
+        super().setUp()
+        # 不启动真实的邮件通知线程
+        patcher = mock.patch('evaluation.views.EmailNotificationService.send_evaluation_operation_notification')
+        self.notify = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self, rows):
+        content = (self.HEADER + ''.join(f'{row}\n' for row in rows)).encode('utf-8')
+        upload = SimpleUploadedFile('records.csv', content, content_type='text/csv')
+        return self.client.post('/api/evaluation-records/import/', {'file': upload}, format='multipart')
+
+    def test_full_import_applies_only_the_delta(self):
+        """完整格式导入只写入新增、更新和删除的记录，未变化的记录保持原主键"""
+        rows = [
+            '程序部,张三,24,值班,2025-01-01,+2,',
+            '程序部,张三,24,值班,2025-01-01,+2,',
+            'Web部,李四,23,迟到,2025-01-02,-1,',
+        ]
+        response = self.upload(rows)
+        self.assertEqual(response.data['created'], 3)
+        kept_ids = set(EvaluationRecord.objects.filter(personnel='张三').values_list('id', flat=True))
+
+        response = self.upload(rows)
+        self.assertEqual(response.data['unchanged'], 3)
+        self.assertEqual(response.data['created'], 0)
+
+        response = self.upload([
+            '程序部,张三,24,值班,2025-01-01,+2,',
+            '程序部,张三,24,值班,2025-01-01,+2,补录',
+            'Web部,王五,23,活动,2025-01-03,+3,',
+        ])
+        self.assertEqual(
+            {key: response.data[key] for key in ('created', 'updated', 'deleted', 'unchanged')},
+            {'created': 1, 'updated': 1, 'deleted': 1, 'unchanged': 1},
+        )
+        self.assertEqual(set(EvaluationRecord.objects.filter(personnel='张三').values_list('id', flat=True)), kept_ids)
+        self.assertFalse(EvaluationRecord.objects.filter(personnel='李四').exists())
+        self.assertEqual(EvaluationRecord.objects.get(personnel='王五').total_score, Decimal('3'))
+        # 数据没有变化的导入不发送通知
+        self.assertEqual(self.notify.call_count, 2)
+
+    def test_unknown_department_rejected(self):
+        response = self.upload(['美工部,张三,24,值班,2025-01-01,+2,'])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(EvaluationRecord.objects.exists())
+        self.notify.assert_not_called()
+
+
+class TotalScoreTestCase(EvaluationTestMixin, TestCase):
+    def test_bulk_operations_keep_total_score(self):
+        """bulk_create / bulk_update / update 修改分数时同步总分"""
+        [record] = EvaluationRecord.objects.bulk_create([EvaluationRecord(
+            personnel='张三', department=self.dept_a, item_description='值班',
+            bonus_score=Decimal('3'), deduction_score=Decimal('1'),
+        )])
+        record.refresh_from_db()
+        self.assertEqual(record.total_score, Decimal('2'))
+
+        record.deduction_score = Decimal('2.5')
+        EvaluationRecord.objects.bulk_update([record], ['deduction_score'])
+        record.refresh_from_db()
+        self.assertEqual(record.total_score, Decimal('0.5'))
+
+        EvaluationRecord.objects.filter(id=record.id).update(bonus_score=F('bonus_score') + 1)
+        record.refresh_from_db()
+        self.assertEqual(record.total_score, Decimal('1.5'))
+
+        EvaluationRecord.objects.filter(id=record.id).update(deduction_score=0)
+        record.refresh_from_db()
+        self.assertEqual(record.total_score, Decimal('4'))
+
+    def test_recompute_total_scores(self):
+        record = self.create_record('张三', self.dept_a, date(2025, 1, 1), bonus=3)
+        EvaluationRecord.objects.filter(id=record.id).update(total_score=0)
+        self.assertEqual(EvaluationRecord.objects.recompute_total_scores(), 1)
+        self.assertEqual(EvaluationRecord.objects.recompute_total_scores(), 0)
+        record.refresh_from_db()
+        self.assertEqual(record.total_score, Decimal('3'))
+
+
+class RankingTestCase(EvaluationTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            for personnel, department, bonus in [
+                ('张三', self.dept_a, 3), ('李四', self.dept_a, 5), ('王五', self.dept_a, 5),
+                ('张三', self.dept_a, 1), ('赵六', self.dept_b, 2),
+            ]:
+                self.create_record(personnel, department, date(2025, 1, 1), bonus=bonus)
+
+    def test_rank_within_department(self):
+        response = self.client.get('/api/evaluation-records/rankings/', {'department': self.dept_a.id})
+        self.assertEqual(
+            [(row['personnel'], row['total_score'], row['rank'], row['dense_rank']) for row in response.data],
+            [('李四', '5.00', 1, 1), ('王五', '5.00', 1, 1), ('张三', '4.00', 3, 2)],
+        )
+
+    def test_top_and_percentile_filters(self):
+        response = self.client.get('/api/evaluation-records/rankings/', {'top': 1})
+        self.assertEqual({row['personnel'] for row in response.data}, {'李四', '王五', '赵六'})
+        response = self.client.get('/api/evaluation-records/rankings/', {'scope': 'all', 'percentile': 50})
+        self.assertEqual({row['personnel'] for row in response.data}, {'李四', '王五'})
+        self.assertEqual(
+            self.client.get('/api/evaluation-records/rankings/', {'scope': 'team'}).status_code, 400
+        )
+
+    def test_cached_until_scores_change(self):
+        """数据版本不变时返回 304，批量修改分数后排名更新"""
+        response = self.client.get('/api/evaluation-records/rankings/', {'scope': 'all'})
+        etag = response['ETag']
+        self.assertEqual(
+            self.client.get('/api/evaluation-records/rankings/', {'scope': 'all'}, HTTP_IF_NONE_MATCH=etag).status_code,
+            304,
+        )
+        # 版本号在事务提交后更换
+        with self.captureOnCommitCallbacks(execute=True):
+            EvaluationRecord.objects.filter(personnel='赵六').update(bonus_score=10)
+        response = self.client.get('/api/evaluation-records/rankings/', {'scope': 'all'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['personnel'], '赵六')
+
+    def test_cached_until_personnel_deleted(self):
+        """删除人员会把考评记录的 personnel_ref 置空，排名缓存随之失效"""
+        with self.captureOnCommitCallbacks(execute=True):
+            person = Personnel.objects.create(
+                name='赵六', student_id='20240004', gender='male', grade_major='2024级 计算机', department=self.dept_b,
+                position='成员', start_date=date(2024, 9, 1), phone='13800000000', qq='10004', email='d@example.com',
+            )
+            EvaluationRecord.objects.filter(personnel='赵六').update(personnel_ref=person)
+        response = self.client.get('/api/evaluation-records/rankings/', {'scope': 'all'})
+        self.assertEqual(response.data[-1]['personnel_id'], person.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            person.delete()
+        response = self.client.get(
+            '/api/evaluation-records/rankings/', {'scope': 'all'}, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data[-1]['personnel_id'])
+
+
+class TimelineTestCase(EvaluationTestMixin, TestCase):
+    def test_monthly_cumulative_scores_for_several_people(self):
+        self.create_record('张三', self.dept_a, date(2025, 1, 3), bonus=3)
+        self.create_record('张三', self.dept_a, date(2025, 1, 20), deduction=1)
+        self.create_record('张三', self.dept_a, date(2025, 3, 1), bonus=2)
+        self.create_record('李四', self.dept_b, date(2025, 2, 1), bonus=5)
+
+        response = self.client.get('/api/evaluation-records/timeline/', {'personnel': '张三,李四,王五'})
+        self.assertEqual(response.status_code, 200)
+        series = {item['personnel']: item['points'] for item in response.data['series']}
+        self.assertEqual(
+            [(p['period'], p['score'], p['cumulative_score'], p['record_count']) for p in series['张三']],
+            [('2025-01-01', '2.00', '2.00', 2), ('2025-03-01', '2.00', '4.00', 1)],
+        )
+        self.assertEqual(series['李四'][0]['cumulative_score'], '5.00')
+        self.assertEqual(series['王五'], [])
+
+    def test_weekly_interval_and_validation(self):
+        self.create_record('张三', self.dept_a, date(2025, 1, 1), bonus=1)
+        self.create_record('张三', self.dept_a, date(2025, 1, 3), bonus=1)
+        response = self.client.get('/api/evaluation-records/timeline/', {'personnel': '张三', 'interval': 'week'})
+        self.assertEqual([p['period'] for p in response.data['series'][0]['points']], ['2024-12-30'])
+        self.assertEqual(self.client.get('/api/evaluation-records/timeline/').status_code, 400)
+        for params in [{'personnel': '张三', 'department': 'abc'}, {'personnel_id': '1,x'}]:
+            self.assertEqual(self.client.get('/api/evaluation-records/timeline/', params).status_code, 400)
+
+    def test_personnel_id_series_groups_on_linked_personnel(self):
+        """按 personnel_id 查询时，同一人员不同年级写法的记录合并为一条时间线"""
+        person = Personnel.objects.create(
+            name='张三', student_id='20240001', gender='male', grade_major='2024级 计算机', department=self.dept_a,
+            position='成员', start_date=date(2024, 9, 1), phone='13800000000', qq='10001', email='a@example.com',
+        )
+        self.create_record('张三', self.dept_a, date(2025, 1, 3), bonus=3, grade='24')
+        self.create_record('张三', self.dept_a, date(2025, 2, 1), bonus=1, grade='2024级')
+        EvaluationRecord.objects.update(personnel_ref=person)
+        self.create_record('李四', self.dept_b, date(2025, 2, 1), bonus=5)
+
+        response = self.client.get(
+            '/api/evaluation-records/timeline/', {'personnel_id': str(person.id), 'personnel': '李四'}
+        )
+        self.assertEqual(response.status_code, 200)
+        [linked, named] = response.data['series']
+        self.assertEqual((linked['personnel'], linked['personnel_id']), ('张三', person.id))
+        self.assertEqual(
+            [(p['period'], p['cumulative_score']) for p in linked['points']],
+            [('2025-01-01', '3.00'), ('2025-02-01', '4.00')],
+        )
+        self.assertEqual((named['personnel'], named['personnel_id'], len(named['points'])), ('李四', None, 1))
+
+
+class BatchCreateTestCase(EvaluationTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # 不启动真实的邮件通知线程
+        patcher = mock.patch('evaluation.views.EmailNotificationService.send_evaluation_operation_notification')
+        self.notify = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch_create_for_many_people(self):
+        payload = {
+            'department': self.dept_a.id,
+            'grade': '24',
+            'personnel': ['张三', '李四', {'personnel': '王五', 'department': self.dept_b.id, 'grade': '23'}],
+            'item_description': '参加活动',
+            'bonus_score': '2',
+            'evaluation_date': '2025-05-01',
+        }
+        # 部门校验、人员名单、写入记录各一次，搜索索引两次，加上事务保存点
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/evaluation-records/batch-create/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['count'], 3)
+        self.notify.assert_called_once()
+        self.assertIn('共3人', self.notify.call_args.kwargs['operation_description'])
+        record = EvaluationRecord.objects.get(personnel='王五')
+        self.assertEqual((record.department, record.grade, record.total_score), (self.dept_b, '23', Decimal('2')))
+        self.assertEqual(EvaluationRecord.objects.filter(department=self.dept_a, grade='24').count(), 2)
+
+    def test_batch_create_without_returned_primary_keys(self):
+        """数据库不回填主键（如 MySQL）时重新查询插入的记录，只为它们建立索引并返回 id"""
+        old = self.create_record('张三', self.dept_a, date(2025, 5, 1), bonus=1, description='参加活动')
+        SearchDocument.objects.filter(doc_type='evaluation', object_id=old.id).delete()
+        bulk_create = EvaluationRecordQuerySet.bulk_create
+
+        def bulk_create_without_pks(queryset, objs, *args, **kwargs):
+            created = bulk_create(queryset, objs, *args, **kwargs)
+            for obj in created:
+                obj.pk = None
+            return created
+
+        with mock.patch.object(EvaluationRecordQuerySet, 'bulk_create', bulk_create_without_pks):
+            response = self.client.post('/api/evaluation-records/batch-create/', {
+                'department': self.dept_a.id, 'grade': '24', 'personnel': ['张三', '李四'],
+                'item_description': '参加活动', 'bonus_score': '2', 'evaluation_date': '2025-05-01',
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.notify.assert_called_once()
+        ids = [record['id'] for record in response.data['records']]
+        self.assertEqual(
+            ids, list(EvaluationRecord.objects.exclude(id=old.id).order_by('id').values_list('id', flat=True))
+        )
+        self.assertEqual(
+            sorted(SearchDocument.objects.filter(doc_type='evaluation').values_list('object_id', flat=True)), ids
+        )
+
+    def test_batch_create_validates_departments_and_duplicates(self):
+        response = self.client.post('/api/evaluation-records/batch-create/', {
+            'department': 999, 'personnel': ['张三'], 'item_description': '活动', 'bonus_score': '1',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/evaluation-records/batch-create/', {
+            'department': self.dept_a.id, 'personnel': ['张三', '张三'], 'item_description': '活动',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(EvaluationRecord.objects.exists())
+        self.notify.assert_not_called()
+
+
+class PersonnelLinkTestCase(EvaluationTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # 不启动真实的邮件通知线程
+        patcher = mock.patch('evaluation.views.EmailNotificationService.send_evaluation_operation_notification')
+        self.notify = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_personnel(self, name, department, grade_major):
+        return Personnel.objects.create(
+            name=name, student_id='20240001', gender='male', grade_major=grade_major, department=department,
+            position='成员', start_date=date(2024, 9, 1), phone='13800000000', qq='10001', email='a@example.com',
+        )
+
+    def test_link_command_matches_name_department_grade(self):
+        """按 姓名 + 部门 + 年级 回填，同名不同年级分别关联，无法匹配的保留文本"""
+        zhang_24 = self.create_personnel('张三', self.dept_a, '2024级 计算机')
+        zhang_23 = self.create_personnel('张三', self.dept_a, '2023级 软件工程')
+        self.create_record('张三', self.dept_a, date(2025, 1, 1), bonus=1, grade='24')
+        self.create_record('张三', self.dept_a, date(2025, 1, 2), bonus=1, grade='2023级')
+        self.create_record('张三', self.dept_a, date(2025, 1, 3), bonus=1, grade='')
+        self.create_record('张三', self.dept_b, date(2025, 1, 1), bonus=1)
+        EvaluationRecord.objects.update(personnel_ref=None)
+
+        call_command('link_evaluation_personnel', stdout=io.StringIO())
+        self.assertEqual(
+            sorted(EvaluationRecord.objects.values_list('grade', 'department', 'personnel_ref')),
+            [('', self.dept_a.id, None), ('2023级', self.dept_a.id, zhang_23.id),
+             ('24', self.dept_a.id, zhang_24.id), ('24', self.dept_b.id, None)],
+        )
+
+        response = self.client.get('/api/evaluation-records/personnel-summary/', {'personnel_id': zhang_24.id})
+        self.assertEqual([(row['personnel_id'], row['grade']) for row in response.data], [(zhang_24.id, '24')])
+
+        response = self.client.delete(f'/api/evaluation-records/delete-personnel/?personnel_id={zhang_23.id}')
+        self.assertEqual(response.data['deleted_count'], 1)
+        self.assertEqual(EvaluationRecord.objects.filter(personnel='张三').count(), 3)
+
+    def test_linked_records_grouped_by_personnel(self):
+        """已关联人员的记录年级写法不同时，汇总和排行榜中仍为一行"""
+        person = self.create_personnel('王五', self.dept_a, '2024级 计算机')
+        self.create_record('王五', self.dept_a, date(2025, 1, 1), bonus=2, grade='24')
+        self.create_record('王五', self.dept_a, date(2025, 1, 2), bonus=3, grade='2024级')
+        self.create_record('王五', self.dept_a, date(2025, 1, 3), bonus=1, grade='24')
+        EvaluationRecord.objects.update(personnel_ref=person)
+        self.create_record('赵六', self.dept_a, date(2025, 1, 1), bonus=1, grade='24')
+        self.create_record('赵六', self.dept_a, date(2025, 1, 2), bonus=1, grade='2024级')
+
+        response = self.client.get('/api/evaluation-records/personnel-summary/')
+        self.assertEqual(
+            sorted((row['personnel'], row['personnel_id'], row['total_score']) for row in response.data),
+            [('王五', person.id, '6.00'), ('赵六', None, '1.00'), ('赵六', None, '1.00')],
+        )
+
+        response = self.client.get('/api/evaluation-records/rankings/', {'scope': 'department'})
+        linked = [row for row in response.data if row['personnel_id'] == person.id]
+        self.assertEqual(len(linked), 1)
+        self.assertEqual((linked[0]['total_score'], linked[0]['record_count'], linked[0]['rank']), ('6.00', 3, 1))
+
+    def test_new_records_linked_on_create(self):
+        person = self.create_personnel('李四', self.dept_b, '2024级 计算机')
+        response = self.client.post('/api/evaluation-records/', {
+            'department': self.dept_b.id, 'personnel': '李四', 'grade': '24', 'item_description': '值班',
+            'bonus_score': '1', 'evaluation_date': '2025-01-01',
+        }, format='json')
+        self.assertEqual(response.data['personnel_ref'], person.id)
+
+
+class AsyncPersonnelSummaryTestCase(EvaluationTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        person = Personnel.objects.create(
+            name='张三', student_id='20240001', gender='male', grade_major='2024级 计算机', department=self.dept_a,
+            position='成员', start_date=date(2024, 9, 1), phone='13800000000', qq='10001', email='a@example.com',
+        )
+        self.create_record('张三', self.dept_a, date(2025, 1, 1), bonus=3, grade='24')
+        self.create_record('张三', self.dept_a, date(2025, 1, 2), deduction=1, grade='2024级')
+        EvaluationRecord.objects.update(personnel_ref=person)
+        self.create_record('李四', self.dept_a, date(2025, 1, 1), bonus=2)
+        self.create_record('王五', self.dept_b, date(2025, 1, 1), deduction=1.5)
+        self.person = person
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(User.objects.get(username="admin"))}'}
+
+    async def test_async_summary_matches_sync_summary(self):
+        """异步人员汇总与 DRF 接口输出一致"""
+        client = AsyncClient()
+        for query in ['', f'?department={self.dept_a.id}', f'?personnel_id={self.person.id}', '?grade=24']:
+            sync_response = await client.get(
+                f'/api/evaluation-records/personnel-summary/{query}', headers=self.headers
+            )
+            async_response = await client.get(
+                f'/api/async/evaluation-records/personnel-summary/{query}', headers=self.headers
+            )
+            self.assertEqual(async_response.status_code, 200)
+            self.assertEqual(async_response.json(), sync_response.json())
+
+    async def test_invalid_ids_rejected(self):
+        client = AsyncClient()
+        for query in ['?department=abc', '?personnel_id=1x']:
+            response = await client.get(
+                f'/api/async/evaluation-records/personnel-summary/{query}', headers=self.headers
+            )
+            self.assertEqual(response.status_code, 400)
+
+
+class ImportTemplateTestCase(EvaluationTestMixin, TestCase):
+    def test_template_served_from_cached_bytes(self):
+        """样表字节可复现，带强 ETag，ETag 匹配时返回 304"""
+        self.assertEqual(_workbook_bytes(build_import_template()), _workbook_bytes(build_import_template()))
+
+        response = self.client.get('/api/evaluation-records/download-template/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response['ETag'].startswith('W/'))
+        self.assertIn('max-age', response['Cache-Control'])
+        sheet = load_workbook(io.BytesIO(response.content)).active
+        self.assertEqual([cell.value for cell in sheet[1]], ['部门', '年级', '姓名'])
+
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/evaluation-records/download-template/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
@@ -1,12 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import EvaluationRecordViewSet
 
 router = DefaultRouter()
 router.register(r'evaluation-records', EvaluationRecordViewSet)
 
 urlpatterns = [
+    path('api/async/evaluation-records/personnel-summary/', async_views.personnel_summary,
+         name='async_personnel_summary'),
     path('api/', include(router.urls)),
 ]
 
@@ -2,42 +2,84 @@ import csv
 import io
 import logging
 from datetime import datetime, date, timedelta
+from collections import defaultdict
 from decimal import Decimal
+from itertools import chain, groupby
 import os
 
+from django.conf import settings
 from django.db import transaction
-from django.db.models import Sum, Count, Q
+from django.db.models import Case, CharField, Count, F, IntegerField, Q, Sum, Value, When, Window
+from django.db.models.functions import DenseRank, PercentRank, Rank, TruncMonth, TruncWeek
 from django.http import HttpResponse
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from openpyxl import load_workbook
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill
 
+from item_manager.authentication import CachedJWTAuthentication
+from item_manager.caching import conditional_response
+from item_manager.metrics import SerializerMetricsMixin
+from item_manager.spreadsheet_templates import template_response
 from finance.models import Department
+from personnel.models import Personnel
 from email_notice.services import EmailNotificationService
+from scheduler.deletion import enqueue_deletion
+from scheduler.serializers import DeletionJobSerializer
+from search.filters import FullTextSearchFilter, FullTextSearchMixin
+from search.registry import index_created, index_objects
 
 from .filters import EvaluationRecordFilter
+from .linking import PersonnelMatcher
 from .models import EvaluationRecord
-from .serializers import EvaluationRecordSerializer, PersonnelSummarySerializer
+from .serializers import (
+    EvaluationBatchCreateSerializer,
+    EvaluationRecordSerializer,
+    PersonnelRankingSerializer,
+    PersonnelSummarySerializer,
+    TimelinePointSerializer,
+)
+from .spreadsheets import IMPORT_TEMPLATE
 
 logger = logging.getLogger(__name__)
 
-
-class EvaluationRecordViewSet(viewsets.ModelViewSet):
+SCORE_QUANTUM = Decimal('0.01')
+# 完整格式导入时用于比较记录是否相同的字段，备注不同视为更新
+IMPORT_FINGERPRINT_FIELDS = (
+    'personnel', 'department_id', 'grade', 'evaluation_date', 'item_description', 'bonus_score', 'deduction_score',
+)
+IMPORT_BATCH_SIZE = 500
+# 排行榜的排名范围：参数值 -> 分区字段
+RANKING_SCOPES = {
+    'department': ['person_department'],
+    'grade': ['person_grade'],
+    'department_grade': ['person_department', 'person_grade'],
+    'all': [],
+}
+# 分数时间线的时间粒度
+TIMELINE_INTERVALS = {
+    'month': TruncMonth,
+    'week': TruncWeek,
+}
+# 分数时间线一次最多对比的人数
+TIMELINE_MAX_PERSONNEL = 10
+
+
+class EvaluationRecordViewSet(FullTextSearchMixin, SerializerMetricsMixin, viewsets.ModelViewSet):
     """考评记录视图集"""
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     queryset = EvaluationRecord.objects.select_related('department').all()
     serializer_class = EvaluationRecordSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, OrderingFilter]
     filterset_class = EvaluationRecordFilter
-    search_fields = ['item_description', 'remarks', 'personnel', 'department__name', 'grade']
+    # 考评说明、备注、姓名、部门、年级在全文索引中搜索
+    search_doc_type = 'evaluation'
     ordering_fields = ['evaluation_date', 'created_at', 'total_score', 'bonus_score', 'deduction_score']
     ordering = ['-evaluation_date', '-created_at']
 
@@ -78,27 +120,55 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
         # 执行删除
         instance.delete()
 
+    @action(detail=False, methods=['post'], url_path='batch-create')
+    def batch_create(self, request, *args, **kwargs):
+        """批量录入：同一事项和分值应用到多名人员，只发送一封汇总通知"""
+        serializer = EvaluationBatchCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            records = serializer.save()
+
+        user_info = getattr(request.user, 'username', '系统') if hasattr(request, 'user') else '系统'
+        data = serializer.validated_data
+        score = f"+{data['bonus_score']}" if data['bonus_score'] else f"-{data['deduction_score']}"
+        EmailNotificationService.send_evaluation_operation_notification(
+            'CREATE',
+            evaluation_instance=None,
+            user_info=user_info,
+            operation_description=(
+                f"批量录入考评记录 - {data['item_description']}（{score}），共{len(records)}人："
+                f"{'、'.join(record.personnel for record in records)}"
+            )
+        )
+
+        return Response({
+            'detail': f'成功录入 {len(records)} 条记录',
+            'count': len(records),
+            'records': EvaluationRecordSerializer(records, many=True).data,
+        }, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=['get'], url_path='personnel-summary')
     def personnel_summary(self, request, *args, **kwargs):
         """获取人员汇总列表"""
         queryset = self.filter_queryset(self.get_queryset())
         
-        # 按人员、部门、年级分组汇总
-        summary_data = queryset.values('personnel', 'department__name', 'grade').annotate(
+        # 已关联的记录按人员 id 分组汇总，未关联的历史记录按 姓名 + 部门 + 年级 分组
+        summary_data = queryset.group_by_person().annotate(
             total_bonus=Sum('bonus_score'),
             total_deduction=Sum('deduction_score'),
             bonus_count=Count('id', filter=Q(bonus_score__gt=0)),
             deduction_count=Count('id', filter=Q(deduction_score__gt=0)),
-        ).order_by('department__name', 'personnel')
+        ).order_by('department_name', 'person_name')
         
         # 计算总分
         result = []
         for item in summary_data:
             total_score = (item['total_bonus'] or Decimal('0')) - (item['total_deduction'] or Decimal('0'))
             result.append({
-                'personnel': item['personnel'],
-                'department_name': item['department__name'] or '',
-                'grade': item['grade'] or '',
+                'personnel': item['person_name'],
+                'personnel_id': item['personnel_ref'],
+                'department_name': item['department_name'] or '',
+                'grade': item['person_grade'] or '',
                 'total_bonus': item['total_bonus'] or Decimal('0'),
                 'total_deduction': item['total_deduction'] or Decimal('0'),
                 'total_score': total_score,
@@ -109,28 +179,171 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
         serializer = PersonnelSummarySerializer(result, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], url_path='rankings')
+    def rankings(self, request, *args, **kwargs):
+        """
+        人员总分排行榜：/api/evaluation-records/rankings/?scope=department&top=10&percentile=20
+
+        scope 为排名范围（department / grade / department_grade / all，默认 department），
+        top 只返回每个范围内前 N 名，percentile 只返回每个范围内前百分之 N；支持列表的筛选参数
+        """
+        scope = request.query_params.get('scope', 'department')
+        if scope not in RANKING_SCOPES:
+            return Response(
+                {'detail': f'scope 必须为 {" / ".join(RANKING_SCOPES)} 之一'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            top = int(request.query_params['top']) if request.query_params.get('top') else None
+            percentile = (
+                float(request.query_params['percentile']) if request.query_params.get('percentile') else None
+            )
+        except ValueError:
+            return Response({'detail': 'top 和 percentile 必须为数字'}, status=status.HTTP_400_BAD_REQUEST)
+        if (top is not None and top < 1) or (percentile is not None and not 0 < percentile <= 100):
+            return Response(
+                {'detail': 'top 必须大于 0，percentile 必须在 0 到 100 之间'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        def build():
+            partition_by = [F(field) for field in RANKING_SCOPES[scope]]
+            order_by = F('total_score').desc()
+            # 排名窗口必须在分组汇总之后单独 annotate，否则会被加入 GROUP BY
+            queryset = self.filter_queryset(self.get_queryset()).group_by_person().annotate(
+                total_bonus=Sum('bonus_score'),
+                total_deduction=Sum('deduction_score'),
+                total_score=Sum('bonus_score') - Sum('deduction_score'),
+                record_count=Count('id'),
+            ).annotate(
+                rank=Window(Rank(), partition_by=partition_by, order_by=order_by),
+                dense_rank=Window(DenseRank(), partition_by=partition_by, order_by=order_by),
+                percent_rank=Window(PercentRank(), partition_by=partition_by, order_by=order_by),
+            )
+            if top is not None:
+                queryset = queryset.filter(rank__lte=top)
+            if percentile is not None:
+                queryset = queryset.filter(percent_rank__lte=percentile / 100)
+            queryset = queryset.order_by(*RANKING_SCOPES[scope], 'rank', 'person_name')
+
+            return PersonnelRankingSerializer(queryset, many=True).data
+
+        # 按考评数据、部门和人员的版本号缓存，数据不变时直接返回缓存或 304；
+        # 删除人员时 personnel_ref 以批量 UPDATE 置空，不会触发考评记录的信号，因此人员也要作为依赖
+        return conditional_response(request, [EvaluationRecord, Department, Personnel], build)
+
     @action(detail=False, methods=['get'], url_path='personnel-records')
     def personnel_records(self, request, *args, **kwargs):
-        """获取某个人员的所有记录"""
+        """获取某个人员的所有记录，personnel_id 按关联人员查询，personnel 按姓名查询"""
+        personnel_id = request.query_params.get('personnel_id')
         personnel_name = request.query_params.get('personnel')
-        if not personnel_name:
+        if personnel_id:
+            if not personnel_id.isdigit():
+                return Response({'detail': 'personnel_id 必须为整数'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = self.get_queryset().filter(personnel_ref_id=personnel_id)
+        elif personnel_name:
+            queryset = self.get_queryset().filter(personnel=personnel_name)
+        else:
             return Response({'detail': '缺少personnel参数'}, status=status.HTTP_400_BAD_REQUEST)
-        queryset = self.get_queryset().filter(personnel=personnel_name).order_by('-evaluation_date')
+        queryset = queryset.order_by('-evaluation_date')
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], url_path='timeline')
+    def timeline(self, request, *args, **kwargs):
+        """
+        人员分数时间线：/api/evaluation-records/timeline/?personnel=张三,李四&personnel_id=3,5&interval=month
+
+        按月/周汇总每个时间段的得分和累计得分，可同时对比多人；personnel_id 按关联人员汇总（不受姓名、年级写法影响），
+        personnel 按姓名汇总未关联或需要按文本对比的记录；department、grade 为可选的精确筛选
+        """
+        names, ids = [], []
+        for value in request.query_params.getlist('personnel'):
+            names.extend(name.strip() for name in value.split(',') if name.strip())
+        for value in request.query_params.getlist('personnel_id'):
+            ids.extend(part.strip() for part in value.split(',') if part.strip())
+        if not all(part.isdigit() for part in ids):
+            return Response({'detail': 'personnel_id 必须为整数'}, status=status.HTTP_400_BAD_REQUEST)
+        names = list(dict.fromkeys(names))
+        ids = list(dict.fromkeys(int(part) for part in ids))
+        if not names and not ids:
+            return Response({'detail': '缺少personnel参数'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(names) + len(ids) > TIMELINE_MAX_PERSONNEL:
+            return Response(
+                {'detail': f'一次最多对比 {TIMELINE_MAX_PERSONNEL} 人'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        interval = request.query_params.get('interval', 'month')
+        if interval not in TIMELINE_INTERVALS:
+            return Response({'detail': 'interval 必须为 month 或 week'}, status=status.HTTP_400_BAD_REQUEST)
+        department = request.query_params.get('department')
+        if department and not department.isdigit():
+            return Response({'detail': 'department 必须为整数'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = EvaluationRecord.objects.filter(Q(personnel_ref_id__in=ids) | Q(personnel__in=names))
+        if department:
+            queryset = queryset.filter(department_id=department)
+        if request.query_params.get('grade'):
+            queryset = queryset.filter(grade=request.query_params['grade'])
+
+        # 按 personnel_id 查询的记录按关联人员分组，其余按姓名分组
+        by_id = Q(personnel_ref_id__in=ids)
+        series_ref = Case(When(by_id, then=F('personnel_ref')), default=None, output_field=IntegerField())
+        series_name = Case(When(by_id, then=Value('')), default=F('personnel'), output_field=CharField())
+
+        # 全部用窗口函数计算：每个时间段的得分、记录数，以及按时间段累加的得分
+        # 累计窗口的默认范围包含同一时间段的所有记录，DISTINCT 后每人每个时间段一行
+        score = F('bonus_score') - F('deduction_score')
+        series_partition = [F('series_ref'), F('series_name')]
+        period_partition = [*series_partition, F('period')]
+        rows = queryset.annotate(
+            period=TIMELINE_INTERVALS[interval]('evaluation_date'),
+            series_ref=series_ref,
+            series_name=series_name,
+        ).annotate(
+            score=Window(Sum(score), partition_by=period_partition),
+            record_count=Window(Count('id'), partition_by=period_partition),
+            cumulative_score=Window(Sum(score), partition_by=series_partition, order_by=F('period').asc()),
+        ).values(
+            'series_ref', 'series_name', 'period', 'score', 'record_count', 'cumulative_score'
+        ).distinct().order_by('series_ref', 'series_name', 'period')
+
+        points = defaultdict(list)
+        for row in rows:
+            points[row['series_ref'] or row['series_name']].append(row)
+        linked_names = dict(Personnel.objects.filter(id__in=ids).values_list('id', 'name'))
+        series = [
+            {'personnel': linked_names.get(personnel_id, f'人员 {personnel_id}'), 'personnel_id': personnel_id,
+             'points': TimelinePointSerializer(points[personnel_id], many=True).data}
+            for personnel_id in ids
+        ] + [
+            {'personnel': name, 'personnel_id': None,
+             'points': TimelinePointSerializer(points[name], many=True).data}
+            for name in names
+        ]
+        return Response({'interval': interval, 'series': series})
+
     @action(detail=False, methods=['delete'], url_path='delete-personnel')
     def delete_personnel(self, request, *args, **kwargs):
-        """删除某个人员的所有记录"""
+        """删除某个人员的所有记录，personnel_id 按关联人员删除，personnel 按姓名删除"""
+        personnel_id = request.query_params.get('personnel_id')
         personnel_name = request.query_params.get('personnel')
         department_name = request.query_params.get('department')
         grade = request.query_params.get('grade', '')
-        
-        if not personnel_name:
+
+        if personnel_id:
+            if not personnel_id.isdigit():
+                return Response({'detail': 'personnel_id 必须为整数'}, status=status.HTTP_400_BAD_REQUEST)
+            filter_params = {'personnel_ref_id': personnel_id}
+            if not personnel_name:
+                personnel_name = Personnel.objects.filter(id=personnel_id).values_list('name', flat=True).first()
+                personnel_name = personnel_name or f'人员 {personnel_id}'
+        elif personnel_name:
+            filter_params = {'personnel': personnel_name}
+        else:
             return Response({'detail': '缺少personnel参数'}, status=status.HTTP_400_BAD_REQUEST)
-        
+
         # 构建查询条件
-        filter_params = {'personnel': personnel_name}
         if department_name:
             filter_params['department__name'] = department_name
         if grade:
@@ -151,13 +364,21 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
             'count': deleted_count
         }
 
-        # 删除记录
-        queryset.delete()
-
-        # 异步发送邮箱通知
         user_info = getattr(request.user, 'username', '系统') if hasattr(request, 'user') else '系统'
         operation_description = f"删除人员考评记录 - {personnel_name}({deleted_info['department']}-{deleted_info['grade']})，共{deleted_count}条记录"
 
+        # 超过一批的记录由后台任务按主键分批删除，避免长时间锁库
+        job = None
+        if deleted_count > settings.DELETION_CHUNK_SIZE:
+            job = enqueue_deletion(
+                [{'model': EvaluationRecord._meta.label, 'filters': filter_params}],
+                operation_description, created_by=user_info
+            )
+        else:
+            queryset.delete()
+
+        # 异步发送邮箱通知
+
         EmailNotificationService.send_evaluation_operation_notification(
             'DELETE',
             evaluation_instance=None,
@@ -165,6 +386,12 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
             operation_description=operation_description
         )
 
+        if job is not None:
+            return Response({
+                'detail': f'共 {deleted_count} 条记录，已提交后台删除',
+                'count': deleted_count,
+                'job': DeletionJobSerializer(job).data,
+            }, status=status.HTTP_202_ACCEPTED)
         return Response({
             'detail': f'成功删除 {deleted_count} 条记录',
             'deleted_count': deleted_count
@@ -174,56 +401,45 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
     def export_records(self, request, *args, **kwargs):
         """导出人员考评记录，每个人一个表格"""
         queryset = self.filter_queryset(self.get_queryset())
+
         if not queryset.exists():
             return Response({'detail': '暂无数据可导出'}, status=status.HTTP_400_BAD_REQUEST)
 
+        # 数据库按人员、部门排序，组内按考评时间倒序，一次遍历即可逐人写入
+        records = queryset.only(
+            'personnel', 'department__name', 'grade', 'item_description', 'bonus_score',
+            'deduction_score', 'remarks', 'evaluation_date',
+        ).order_by('personnel', 'department', '-evaluation_date', '-created_at').iterator(chunk_size=2000)
+
         # 创建Excel工作簿
         wb = Workbook()
         wb.remove(wb.active)  # 删除默认工作表
 
-        # 按人员分组
-        personnel_groups = {}
-        for record in queryset:
-            personnel_key = f"{record.personnel}_{record.department.name if record.department else ''}"
-            if personnel_key not in personnel_groups:
-                personnel_groups[personnel_key] = {
-                    'personnel': record.personnel,
-                    'department_name': record.department.name if record.department else '',
-                    'grade': record.grade or '',
-                    'records': []
-                }
-            personnel_groups[personnel_key]['records'].append(record)
-
         # 样式定义
         header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
         header_font = Font(bold=True, color="FFFFFF")
-        summary_fill = PatternFill(start_color="DCE6F1", end_color="DCE6F1", fill_type="solid")
-        summary_font = Font(bold=True)
 
         # 为每个人创建表格
-        for idx, (key, group) in enumerate(personnel_groups.items(), 1):
-            ws = wb.create_sheet(title=f"{group['personnel']}_{idx}")
-            
-            # 计算统计信息
-            total_bonus = sum(record.bonus_score for record in group['records'])
-            total_deduction = sum(record.deduction_score for record in group['records'])
-            total_score = total_bonus - total_deduction
-            bonus_count = sum(1 for record in group['records'] if record.bonus_score > 0)
-            deduction_count = sum(1 for record in group['records'] if record.deduction_score > 0)
+        sheet_count = record_count = 0
+        groups = groupby(records, key=lambda record: (record.personnel, record.department_id))
+        for idx, (key, group_records) in enumerate(groups, 1):
+            first = next(group_records)
+            department_name = first.department.name if first.department else ''
+            ws = wb.create_sheet(title=f"{first.personnel}_{idx}")
+            sheet_count = idx
 
             # 基本信息行
             ws.append(['基本信息'])
-            ws.append(['部门', group['department_name']])
-            ws.append(['姓名', group['personnel']])
-            ws.append(['年级', group['grade']])
+            ws.append(['部门', department_name])
+            ws.append(['姓名', first.personnel])
+            ws.append(['年级', first.grade or ''])
             ws.append([])
 
-            # 统计信息行
+            # 统计信息行，数值在遍历本表的记录时累计，写完记录后填入
             ws.append(['统计信息'])
-            ws.append(['总加分', f'{total_bonus:.2f}'])
-            ws.append(['总扣分', f'{total_deduction:.2f}'])
-            ws.append(['加分次数', bonus_count])
-            ws.append(['扣分次数', deduction_count])
+            stats_row = ws.max_row + 1
+            for label in ('总加分', '总扣分', '加分次数', '扣分次数'):
+                ws.append([label])
             ws.append([])
 
             # 记录表头
@@ -237,14 +453,22 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
                 cell.font = header_font
                 cell.alignment = Alignment(horizontal='center', vertical='center')
 
-            # 添加记录数据
-            for record in sorted(group['records'], key=lambda x: x.evaluation_date, reverse=True):
+            # 添加记录数据（已按考评时间倒序）
+            total_bonus = total_deduction = Decimal('0')
+            bonus_count = deduction_count = 0
+            for record in chain([first], group_records):
+                total_bonus += record.bonus_score
+                total_deduction += record.deduction_score
+                bonus_count += record.bonus_score > 0
+                deduction_count += record.deduction_score > 0
+                record_count += 1
+
                 score_value = ''
                 if record.bonus_score > 0:
                     score_value = f"+{record.bonus_score:.2f}"
                 elif record.deduction_score > 0:
                     score_value = f"-{record.deduction_score:.2f}"
-                
+
                 ws.append([
                     record.item_description,
                     record.evaluation_date.strftime('%Y-%m-%d') if record.evaluation_date else '',
@@ -252,6 +476,11 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
                     record.remarks or '',
                 ])
 
+            for offset, value in enumerate((
+                f'{total_bonus:.2f}', f'{total_deduction:.2f}', bonus_count, deduction_count,
+            )):
+                ws.cell(row=stats_row + offset, column=2, value=value)
+
             # 设置列宽
             ws.column_dimensions['A'].width = 30
             ws.column_dimensions['B'].width = 15
@@ -267,7 +496,7 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
 
         # 异步发送邮箱通知
         user_info = getattr(request.user, 'username', '系统') if hasattr(request, 'user') else '系统'
-        operation_description = f"导出考评记录 - {len(personnel_groups)}名人员，共{queryset.count()}条记录"
+        operation_description = f"导出考评记录 - {sheet_count}名人员，共{record_count}条记录"
 
         EmailNotificationService.send_evaluation_operation_notification(
             'CREATE',
@@ -285,47 +514,8 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='download-template')
     def download_template(self, request, *args, **kwargs):
-        """下载导入样表"""
-        # 创建Excel工作簿
-        wb = Workbook()
-        ws = wb.active
-        ws.title = '人员导入样表'
-
-        # 表头
-        headers = ['部门', '年级', '姓名']
-        ws.append(headers)
-
-        # 设置表头样式
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        for col in range(1, len(headers) + 1):
-            cell = ws.cell(row=1, column=col)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-
-        # 添加示例数据行
-        ws.append(['程序部', '24', '张三'])
-        ws.append(['Web部', '23', '李四'])
-
-
-        # 设置列宽
-        ws.column_dimensions['A'].width = 20
-        ws.column_dimensions['B'].width = 15
-        ws.column_dimensions['C'].width = 15
-
-        # 保存到内存
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-
-        filename = f'人员导入样表_{timezone.now().strftime("%Y%m%d")}.xlsx'
-        response = HttpResponse(
-            output.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
+        """下载导入样表，样表每个进程只生成一次，带 ETag 和 Cache-Control"""
+        return template_response(request, IMPORT_TEMPLATE)
 
     @action(detail=False, methods=['post'], url_path='import')
     def import_records(self, request, *args, **kwargs):
@@ -447,6 +637,14 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
         errors = []
         skipped_count = 0
 
+        # 部门和已有人员一次性加载，逐行校验时不再查询数据库
+        departments = {department.name: department for department in Department.objects.all()}
+        existing_personnel = set()
+        if is_template_format:
+            existing_personnel = set(
+                EvaluationRecord.objects.values_list('personnel', 'grade', 'department_id').distinct()
+            )
+
         for idx, row in enumerate(records_data, start=2):
             try:
                 if not isinstance(row, dict):
@@ -462,7 +660,7 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
                 if not department_name:
                     available_keys = list(row.keys())
                     raise ValueError(f'部门名称不能为空。当前行的列名: {available_keys}')
-                department = Department.objects.filter(name=department_name).first()
+                department = departments.get(department_name)
                 if not department:
                     raise ValueError(f'找不到部门: {department_name}')
 
@@ -474,16 +672,10 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
                 # 年级（可选）
                 grade = str(get_field_value(row, 'grade') or '').strip()
 
-                # 检查是否已存在相同姓名、年级、部门的人员记录
-                existing_records = EvaluationRecord.objects.filter(
-                    personnel=personnel_name,
-                    grade=grade,
-                    department=department
-                ).exists()
-                
-                if existing_records:
+                # 样表格式跳过已存在相同姓名、年级、部门的人员
+                if is_template_format and (personnel_name, grade, department.id) in existing_personnel:
                     skipped_count += 1
-                    continue  # 跳过已存在的人员
+                    continue
 
                 # 如果是样表格式（只有部门、年级、姓名），创建初始记录（总分为39）
                 if is_template_format:
@@ -545,14 +737,14 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
                     item_description = str(get_field_value(row, 'item_description') or '').strip()
                     remarks = str(get_field_value(row, 'remarks') or '').strip()
 
-                # total_score 会在 save() 方法中自动计算，不需要手动设置
+                # total_score 由 EvaluationRecordQuerySet.bulk_create 计算
                 record = EvaluationRecord(
                     department=department,
                     personnel=personnel_name,
                     grade=grade,
                     item_description=item_description,
-                    bonus_score=bonus_score,
-                    deduction_score=deduction_score,
+                    bonus_score=bonus_score.quantize(SCORE_QUANTUM),
+                    deduction_score=deduction_score.quantize(SCORE_QUANTUM),
                     evaluation_date=evaluation_date,
                     remarks=remarks,
                 )
@@ -563,6 +755,37 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
         if errors:
             return Response({'detail': '导入失败', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
 
+        # 一次加载导入涉及的人员名单，为新记录关联人员
+        PersonnelMatcher(names={record.personnel for record in records_to_create}).link(records_to_create)
+
+        user_info = getattr(request.user, 'username', '系统') if hasattr(request, 'user') else '系统'
+
+        if not is_template_format:
+            # 完整格式：文件即为考评记录的完整内容，只写入与现有数据的差异
+            counts = self._sync_full_import(records_to_create)
+            if not (counts['created'] or counts['updated'] or counts['deleted']):
+                return Response({
+                    'detail': f'数据没有变化，{counts["unchanged"]} 条记录与现有数据一致',
+                    **counts,
+                }, status=status.HTTP_200_OK)
+
+            EmailNotificationService.send_evaluation_operation_notification(
+                'CREATE',
+                evaluation_instance=None,
+                user_info=user_info,
+                operation_description=(
+                    f"导入考评记录（完整格式） - 新增{counts['created']}条，"
+                    f"更新{counts['updated']}条，删除{counts['deleted']}条"
+                )
+            )
+            return Response({
+                'detail': (
+                    f"导入完成：新增 {counts['created']} 条，更新 {counts['updated']} 条，"
+                    f"删除 {counts['deleted']} 条，未变化 {counts['unchanged']} 条"
+                ),
+                **counts,
+            }, status=status.HTTP_200_OK)
+
         if not records_to_create:
             skip_msg = f'跳过 {skipped_count} 条已存在的记录' if skipped_count > 0 else ''
             return Response(
@@ -571,18 +794,12 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
             )
 
         with transaction.atomic():
-            if not is_template_format:
-                # 完整格式导入时，先删除所有记录（保持原有行为）
-                EvaluationRecord.objects.all().delete()
-            EvaluationRecord.objects.bulk_create(records_to_create)
+            created_records = EvaluationRecord.objects.bulk_create(records_to_create)
+            # bulk_create 不触发信号，需要手动写入搜索索引
+            index_created(created_records)
 
         # 异步发送邮箱通知
-        user_info = getattr(request.user, 'username', '系统') if hasattr(request, 'user') else '系统'
-        operation_description = f"导入考评人员 - {len(records_to_create)}条记录"
-        if is_template_format:
-            operation_description += "（样表格式）"
-        else:
-            operation_description += "（完整格式）"
+        operation_description = f"导入考评人员 - {len(records_to_create)}条记录（样表格式）"
 
         EmailNotificationService.send_evaluation_operation_notification(
             'CREATE',
@@ -596,6 +813,55 @@ class EvaluationRecordViewSet(viewsets.ModelViewSet):
             'detail': f'成功导入 {len(records_to_create)} 条记录{skip_msg}'
         }, status=status.HTTP_200_OK)
 
+    @staticmethod
+    def _sync_full_import(records):
+        """
+        按指纹比较导入记录与现有记录，只写入差异，返回各类数量
+
+        指纹相同、备注不同的记录原地更新；相同指纹出现多次时按出现次数逐一配对。
+        """
+        existing = defaultdict(list)
+        for record_id, remarks, *values in EvaluationRecord.objects.order_by('id').values_list(
+            'id', 'remarks', *IMPORT_FINGERPRINT_FIELDS
+        ).iterator(chunk_size=2000):
+            existing[tuple(values)].append((record_id, remarks))
+
+        to_create, to_update = [], []
+        unchanged = 0
+        now = timezone.now()
+        for record in records:
+            candidates = existing.get(tuple(getattr(record, field) for field in IMPORT_FINGERPRINT_FIELDS))
+            if not candidates:
+                to_create.append(record)
+                continue
+            # 优先配对备注也相同的记录，减少更新
+            position = next(
+                (i for i, (_, remarks) in enumerate(candidates) if remarks == record.remarks), 0
+            )
+            record_id, remarks = candidates.pop(position)
+            if remarks == record.remarks:
+                unchanged += 1
+            else:
+                record.id = record_id
+                record.updated_at = now
+                to_update.append(record)
+        to_delete = [record_id for candidates in existing.values() for record_id, _ in candidates]
+
+        with transaction.atomic():
+            for start in range(0, len(to_delete), IMPORT_BATCH_SIZE):
+                EvaluationRecord.objects.filter(id__in=to_delete[start:start + IMPORT_BATCH_SIZE]).delete()
+            EvaluationRecord.objects.bulk_update(to_update, ['remarks', 'updated_at'], batch_size=IMPORT_BATCH_SIZE)
+            created_records = EvaluationRecord.objects.bulk_create(to_create, batch_size=IMPORT_BATCH_SIZE)
+            # bulk_create / bulk_update 不触发信号，需要手动写入搜索索引
+            index_created(created_records)
+            index_objects(to_update)
+
+        return {
+            'created': len(to_create),
+            'updated': len(to_update),
+            'deleted': len(to_delete),
+            'unchanged': unchanged,
+        }
 
     @staticmethod
     def _read_excel(file_bytes):
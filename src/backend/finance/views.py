@@ -5,7 +5,13 @@ from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from item_manager.authentication import CachedJWTAuthentication
+from item_manager.caching import ConditionalListMixin
+from item_manager.metrics import SerializerMetricsMixin
+from item_manager.middleware import get_request_context
+from scheduler.deletion import cascade_steps, delete_or_enqueue
+from scheduler.serializers import DeletionJobSerializer
 
 from .models import FinancialRecord, Department, Category, ProofImage
 from .serializers import (
@@ -17,11 +23,11 @@ from .serializers import (
 )
 
 
-class FinancialRecordViewSet(viewsets.ModelViewSet):
+class FinancialRecordViewSet(SerializerMetricsMixin, viewsets.ModelViewSet):
     """
     获取财务记录
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     queryset = FinancialRecord.objects.all()
 
     def get_serializer_class(self):
@@ -30,25 +36,6 @@ class FinancialRecordViewSet(viewsets.ModelViewSet):
             return FinancialRecordReadSerializer
         return FinancialRecordWriteSerializer
 
-    def _get_user_info(self, request):
-        """获取用户信息"""
-        try:
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                return f"{request.user.username} ({request.user.email})"
-            else:
-                return f"匿名用户 (IP: {self._get_client_ip(request)})"
-        except:
-            return "未知用户"
-
-    def _get_client_ip(self, request):
-        """获取客户端IP"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-
     def destroy(self, request, *args, **kwargs):
         """删除方法，删除并发送邮件通知"""
         instance = self.get_object()
@@ -79,6 +66,9 @@ class FinancialRecordViewSet(viewsets.ModelViewSet):
                 except (ValueError, AttributeError, OSError) as e:
                     print(f"删除凭证文件失败 {e}")
 
+        # 获取用户信息（在请求线程中解析，后台线程直接复用）
+        user_info = get_request_context(request).actor
+
         # 立即删除财务记录（会级联删除相关的凭证图片记录）
         super().destroy(request, *args, **kwargs)
 
@@ -87,9 +77,6 @@ class FinancialRecordViewSet(viewsets.ModelViewSet):
             try:
                 from email_notice.services import EmailNotificationService
 
-                # 获取用户信息
-                user_info = self._get_user_info(request)
-
                 # 构建邮件通知数据
                 notification_data = {
                     'id': record_id,
@@ -144,13 +131,13 @@ class FinancialRecordViewSet(viewsets.ModelViewSet):
             )
             created_images.append(ProofImageSerializer(proof_image).data)
 
+        user_info = get_request_context(request).actor
+
         # 异步发送凭证上传通知邮件
         def send_proof_upload_notification():
             try:
                 from email_notice.services import EmailNotificationService
 
-                user_info = self._get_user_info(request)
-
                 # 构建凭证更新通知数据
                 notification_data = {
                     'record_id': record.id,
@@ -187,7 +174,7 @@ class ProofImageViewSet(viewsets.ModelViewSet):
     """
     凭证API
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     queryset = ProofImage.objects.all()
     serializer_class = ProofImageSerializer
 
@@ -226,13 +213,13 @@ class ProofImageViewSet(viewsets.ModelViewSet):
                 print(f"删除文件失败: {file_path}, 错误: {e}")
                 # 即使文件删除失败，也不抛出异常，因为数据库记录已经删除
 
+        user_info = get_request_context(request).actor
+
         # 异步发送凭证删除通知邮件
         def send_proof_delete_notification():
             try:
                 from email_notice.services import EmailNotificationService
 
-                user_info = self._get_user_info(request)
-
                 # 构建凭证删除通知数据
                 notification_data = {
                     'proof_id': proof_info['id'],
@@ -262,31 +249,12 @@ class ProofImageViewSet(viewsets.ModelViewSet):
 
         return Response({'message': '图片删除成功'}, status=status.HTTP_200_OK)
 
-    def _get_user_info(self, request):
-        """获取用户信息"""
-        try:
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                return f"{request.user.username} ({request.user.email})"
-            else:
-                return f"匿名用户 (IP: {self._get_client_ip(request)})"
-        except:
-            return "未知用户"
-
-    def _get_client_ip(self, request):
-        """获取客户端IP"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """
     获取部门
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
 
@@ -306,10 +274,19 @@ class DepartmentViewSet(viewsets.ModelViewSet):
         }
 
         # 获取用户信息
-        user_info = self._get_user_info(request)
-
-        # 执行删除操作
-        response = super().destroy(request, *args, **kwargs)
+        user_info = get_request_context(request).actor
+
+        # 级联的人员、考评记录超过一批时由后台任务按主键分批删除，最后删除部门本身
+        job, total = delete_or_enqueue(
+            cascade_steps(department), f"删除部门 - {department.name}", created_by=user_info
+        )
+        if job is None:
+            response = Response(status=status.HTTP_204_NO_CONTENT)
+        else:
+            response = Response({
+                'detail': f'部门关联的 {total} 条数据较多，已提交后台删除',
+                'job': DeletionJobSerializer(job).data,
+            }, status=status.HTTP_202_ACCEPTED)
 
         # 异步发送删除通知邮件
         def send_delete_notification():
@@ -326,30 +303,11 @@ class DepartmentViewSet(viewsets.ModelViewSet):
 
         return response
 
-    def _get_user_info(self, request):
-        """获取用户信息"""
-        try:
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                return f"{request.user.username} ({request.user.email})"
-            else:
-                return f"匿名用户 (IP: {self._get_client_ip(request)})"
-        except:
-            return "未知用户"
-
-    def _get_client_ip(self, request):
-        """获取客户端IP"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """
     获取分类
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
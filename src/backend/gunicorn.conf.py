@@ -20,6 +20,9 @@ accesslog = "access.log"
 errorlog = "error.log"
 access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
 
+# 使用生产环境配置（item_manager/settings_production.py）
+raw_env = ["DJANGO_SETTINGS_MODULE=item_manager.settings_production"]
+
 # 进程设置
 preload_app = True
 daemon = False
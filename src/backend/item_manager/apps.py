@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ItemManagerConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "item_manager"
+    verbose_name = "系统核心"
+
+    def ready(self):
+        from .authentication import connect_signals
+        connect_signals()
@@ -11,6 +11,11 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from item_manager.spreadsheet_templates import build_templates
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "item_manager.settings")
 
 application = get_asgi_application()
+
+# 预先生成 Excel 样表；gunicorn preload_app 时只在主进程生成一次，worker 共享
+build_templates()
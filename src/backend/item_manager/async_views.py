@@ -0,0 +1,83 @@
+"""
+异步（ASGI 原生）只读接口的公共部分
+
+DRF 的视图和序列化器都是同步的，在 uvicorn 下每个请求都要切换到线程中执行，
+序列化器里的逐行查询（N+1）也会逐条切换线程。这里的异步视图直接使用 Django 的异步 ORM，
+按批次取出数据后在事件循环中组装 JSON，输出格式与对应的 DRF 接口保持一致。
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from rest_framework import exceptions, serializers
+
+from .authentication import CachedJWTAuthentication
+
+# 与 DRF 序列化器相同的字段格式
+_datetime_field = serializers.DateTimeField()
+_date_field = serializers.DateField()
+
+
+def format_datetime(value):
+    return _datetime_field.to_representation(value) if value else None
+
+
+def format_date(value):
+    return _date_field.to_representation(value) if value else None
+
+
+def format_decimal(value, decimal_places=2, max_digits=10):
+    if value is None:
+        return None
+    return serializers.DecimalField(max_digits=max_digits, decimal_places=decimal_places).to_representation(value)
+
+
+def int_param(request, name):
+    """读取整数查询参数，未提供时返回 None，不是整数时返回 400（与 DRF 的过滤器一致）"""
+    value = request.GET.get(name)
+    if not value:
+        return None
+    if not value.isdigit():
+        raise exceptions.ParseError(f'{name} 必须为整数')
+    return int(value)
+
+
+def file_url(request, file):
+    """与 DRF 的 ImageField 一致，返回文件的绝对地址"""
+    if not file:
+        return None
+    return request.build_absolute_uri(file.url)
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data, status=status, safe=False, encoder=DjangoJSONEncoder, json_dumps_params={'ensure_ascii': False}
+    )
+
+
+def error_response(exc):
+    return json_response({'detail': str(exc.detail)}, status=exc.status_code)
+
+
+def async_api_view(view):
+    """异步只读接口装饰器：只允许 GET，使用与 DRF 相同的 JWT 认证"""
+    authenticator = CachedJWTAuthentication()
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return error_response(exceptions.MethodNotAllowed(request.method))
+        try:
+            # 认证命中缓存时不查询数据库，但缓存后端本身是同步的
+            result = await sync_to_async(authenticator.authenticate)(request)
+        except exceptions.AuthenticationFailed as e:
+            return error_response(e)
+        if result is None:
+            return error_response(exceptions.NotAuthenticated())
+        request.user, request.auth = result
+        try:
+            return await view(request, *args, **kwargs)
+        except exceptions.APIException as e:
+            return error_response(e)
+    return wrapper
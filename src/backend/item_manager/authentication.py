@@ -0,0 +1,98 @@
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_PREFIX = 'jwt_user'
+# 缓存中只保存认证和权限判断需要的字段，不保存密码哈希
+CACHED_USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser')
+
+
+def _user_key(user_id, jti):
+    return f'{USER_CACHE_PREFIX}:{user_id}:{jti}'
+
+
+def _generation_key(user_id):
+    return f'{USER_CACHE_PREFIX}_gen:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """使某个用户的所有缓存失效（更换代数，旧的缓存条目自然作废）"""
+    cache.set(_generation_key(user_id), uuid.uuid4().hex, None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    带用户缓存的JWT认证
+
+    以 用户ID + 令牌jti 为键缓存用户的 CACHED_USER_FIELDS 字段，令牌有效期内的后续请求不再查询用户表。
+    缓存中不保存密码哈希，还原出的用户对象中密码为延迟加载字段；需要校验密码哈希（CHECK_REVOKE_TOKEN）时不使用缓存。
+    用户保存/删除时更换该用户的缓存代数，使已缓存的用户全部失效。
+    """
+
+    def get_user(self, validated_token):
+        timeout = getattr(settings, 'JWT_USER_CACHE_TIMEOUT', 300)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if not timeout or user_id is None or jti is None or api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        user_key = _user_key(user_id, jti)
+        generation_key = _generation_key(user_id)
+        cached = cache.get_many([user_key, generation_key])
+        generation = cached.get(generation_key)
+        entry = cached.get(user_key)
+
+        if entry is not None and entry[0] == generation:
+            db, fields = entry[1], entry[2]
+            # from_db 按模型字段顺序取值，未提供的字段（密码等）为延迟加载
+            names = [f.attname for f in self.user_model._meta.concrete_fields if f.attname in fields]
+            user = self.user_model.from_db(db, names, [fields[name] for name in names])
+            self._check_user(user)
+            return user
+
+        user = super().get_user(validated_token)
+
+        # 缓存时间不超过令牌剩余有效期
+        expires_in = int(validated_token.get('exp', 0) - time.time())
+        timeout = min(timeout, expires_in)
+        if timeout > 0:
+            if generation is None:
+                generation = uuid.uuid4().hex
+                cache.add(generation_key, generation, None)
+                # add 失败说明其他进程已写入代数，以实际值为准
+                generation = cache.get(generation_key, generation)
+            fields = {field: getattr(user, field) for field in CACHED_USER_FIELDS}
+            cache.set(user_key, (generation, user._state.db, fields), timeout)
+        return user
+
+    @staticmethod
+    def _check_user(user):
+        """对缓存命中的用户执行与父类相同的状态校验"""
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+
+def invalidate_user_on_change(sender, instance, **kwargs):
+    """用户保存（含停用、改密）或删除时清除认证缓存"""
+    try:
+        invalidate_cached_user(instance.pk)
+    except Exception as e:
+        logger.error(f"清除用户认证缓存失败: {e}")
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+
+    user_model = get_user_model()
+    post_save.connect(invalidate_user_on_change, sender=user_model, dispatch_uid='jwt_user_cache_save')
+    post_delete.connect(invalidate_user_on_change, sender=user_model, dispatch_uid='jwt_user_cache_delete')
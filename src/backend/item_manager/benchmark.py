@@ -0,0 +1,173 @@
+"""
+基准测试公共工具：测试数据库、合成数据集与延迟统计
+
+所有基准命令都在独立的测试数据库中运行，不会读写正式数据。
+"""
+import contextlib
+import os
+import random
+import statistics
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'item-manager-benchmark',
+    }
+}
+
+
+@contextlib.contextmanager
+def benchmark_database(name=None):
+    """
+    创建独立的测试数据库，退出时销毁
+
+    name 为测试库名称（SQLite 为文件路径）；SQLite 默认使用内存库，需要多线程访问时应指定文件。
+    期间缓存换成独立的进程内缓存，压测不读写、不清空配置的缓存（文件缓存等），也不受其中旧数据影响
+    """
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    if name:
+        test_settings['NAME'] = name
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with override_settings(CACHES=BENCHMARK_CACHES):
+            caches['default'].clear()
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings['NAME'] = old_test_name
+
+
+def seed_dataset(items=200, seed=0, images_per_item=2, usages_per_item=3,
+                 finance_records=None, personnel=None, records_per_person=4):
+    """
+    按物品数量生成合成数据集，其余数据默认按比例生成：
+    每个物品 2 张图片、3 条使用记录（使用中的物品最新一条未归还）、每条记录 1 张图片；
+    财务记录与物品数量相同；人员为物品数量的一半，每人 4 条考评记录
+    """
+    from evaluation.models import EvaluationRecord
+    from finance.models import Category, Department, FinancialRecord
+    from items.models import Item, ItemImage, ItemUsage, UsageImage
+    from personnel.models import Personnel
+
+    rnd = random.Random(seed)
+    now = timezone.now()
+    today = now.date()
+
+    departments = [Department.objects.get_or_create(name=f'部门{i}')[0] for i in range(1, 6)]
+    categories = [Category.objects.get_or_create(name=f'类别{i}')[0] for i in range(1, 6)]
+
+    # 测试数据库为空库，bulk_create 后重新查询以兼容不回填主键的数据库（如 MySQL）
+    Item.objects.bulk_create([
+        Item(
+            name=f'物品{i}', serial_number=f'BENCH-{i:06d}', category=f'类别{i % 5}',
+            description='基准测试物品' * 5, location=f'仓库{i % 3}', value=Decimal(rnd.randint(10, 5000)),
+            status='in_use' if i % 3 == 0 else 'available',
+        )
+        for i in range(items)
+    ])
+    item_objs = list(Item.objects.order_by('id'))
+    ItemImage.objects.bulk_create([
+        ItemImage(item=item, image=f'items/{item.id}/initial/{n}.jpg', is_primary=(n == 0))
+        for item in item_objs for n in range(images_per_item)
+    ])
+
+    ItemUsage.objects.bulk_create([
+        ItemUsage(
+            item=item, user=f'用户{rnd.randint(1, 100)}', purpose='基准测试',
+            start_time=now - timedelta(days=n * 7 + 1),
+            expected_return_time=now + timedelta(days=1 - n * 7),
+            is_returned=not (n == 0 and item.status == 'in_use'),
+        )
+        for item in item_objs for n in range(usages_per_item)
+    ])
+    usage_objs = list(ItemUsage.objects.order_by('id'))
+    UsageImage.objects.bulk_create([
+        UsageImage(usage=usage, image=f'usage_images/{usage.id}.jpg', image_type='borrow')
+        for usage in usage_objs
+    ])
+
+    if finance_records is None:
+        finance_records = items
+    if personnel is None:
+        personnel = max(items // 2, 1)
+
+    FinancialRecord.objects.bulk_create([
+        FinancialRecord(
+            title=f'财务记录{i}', amount=Decimal(rnd.randint(1, 10000)) / 10,
+            record_type=rnd.choice(['expense', 'income']), transaction_date=today - timedelta(days=i % 365),
+            department=rnd.choice(departments), category=rnd.choice(categories),
+        )
+        for i in range(finance_records)
+    ])
+
+    Personnel.objects.bulk_create([
+        Personnel(
+            name=f'人员{i}', student_id=f'2024{i:06d}', gender=rnd.choice(['male', 'female']),
+            grade_major='2024级 计算机', department=departments[i % 5], position='成员',
+            start_date=today - timedelta(days=365), phone=f'138{i:08d}', qq=f'{100000 + i}',
+            email=f'user{i}@example.com',
+        )
+        for i in range(personnel)
+    ])
+    personnel_objs = list(Personnel.objects.select_related('department').order_by('id'))
+    EvaluationRecord.objects.bulk_create([
+        EvaluationRecord(
+            department=person.department, personnel=person.name, personnel_ref=person, grade='2024级',
+            item_description='值班', bonus_score=Decimal(rnd.randint(0, 5)),
+            deduction_score=Decimal(rnd.randint(0, 2)), evaluation_date=today - timedelta(days=n * 30),
+        )
+        for person in personnel_objs for n in range(records_per_person)
+    ])
+
+    return {
+        'first_item_id': item_objs[0].id if item_objs else None,
+        'items': len(item_objs),
+        'usages': len(usage_objs),
+        'personnel': len(personnel_objs),
+        'item_images': len(item_objs) * images_per_item,
+        'evaluation_records': len(personnel_objs) * records_per_person,
+        'finance_records': finance_records,
+    }
+
+
+def percentile(values, percent):
+    """返回第 percent 百分位数（最近秩法）"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * percent / 100), len(values) - 1)]
+
+
+def latency_summary(latencies):
+    """延迟统计（毫秒）"""
+    return {
+        'mean': round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        'p50': round(percentile(latencies, 50) * 1000, 2),
+        'p95': round(percentile(latencies, 95) * 1000, 2),
+        'p99': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def current_rss_mb():
+    """当前进程常驻内存（MB），无法获取时返回 None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # 非 Linux 系统退回峰值内存，macOS 单位为字节，Linux 为 KB
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024 / (1024 if os.uname().sysname == 'Darwin' else 1), 1)
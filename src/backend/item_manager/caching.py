@@ -0,0 +1,139 @@
+"""
+基于模型版本号的条件请求与响应缓存
+
+每个注册的模型在缓存中保存一个版本号（随机令牌 + 修改时间），保存/删除/多对多变更时更换。
+列表接口用请求路径和相关模型的版本号计算 ETag：
+- 客户端携带的 If-None-Match / If-Modified-Since 仍然有效时直接返回 304，不执行查询
+- 否则优先返回缓存中的序列化结果，只有版本变化后的第一次请求才真正查询数据库
+不经过模型信号的批量写入（bulk_create、queryset.update 等）需要调用 bump_model_version。
+版本号在事务提交后才更换：否则其他请求可能在提交前读到新版本号，查询到旧数据并以新 ETag 缓存。
+同一事务中一个模型无论修改多少行，提交后只更换一次版本号。
+版本号使用随机令牌而不是自增计数，缓存被清空后也不会与旧的 ETag 重复。
+"""
+import hashlib
+import math
+import time
+import uuid
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .transactions import defer_until_commit
+
+VERSION_PREFIX = 'model_version'
+RESPONSE_PREFIX = 'list_response'
+
+
+def _version_key(model):
+    return f'{VERSION_PREFIX}:{model._meta.label_lower}'
+
+
+def bump_model_version(model, using=None):
+    """在当前事务提交后更换模型的版本号（不在事务中时立即更换），使基于它的 ETag 和缓存响应全部失效"""
+    defer_until_commit('model_version', _version_key(model), _set_versions, using=using)
+
+
+def _set_versions(keys):
+    now = time.time()
+    cache.set_many({key: (uuid.uuid4().hex, now) for key in keys}, None)
+
+
+def get_model_versions(models):
+    """批量获取模型版本号，返回 [(令牌, 修改时间戳)]；缓存中不存在时初始化"""
+    keys = [_version_key(model) for model in models]
+    cached = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = cached.get(key)
+        if version is None:
+            version = (uuid.uuid4().hex, time.time())
+            # add 失败说明其他进程已初始化，以实际值为准
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+        versions.append(version)
+    return versions
+
+
+def _on_change(sender, using=None, **kwargs):
+    bump_model_version(sender, using)
+
+
+def _on_m2m_change(sender, instance, action, model, using=None, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_model_version(type(instance), using)
+        bump_model_version(model, using)
+
+
+def register_versioned_models(*labels):
+    """为模型（"app_label.ModelName"）注册版本号信号，在 AppConfig.ready 中调用"""
+    for label in labels:
+        model = apps.get_model(label)
+        uid = model._meta.label_lower
+        post_save.connect(_on_change, sender=model, dispatch_uid=f'model_version_save_{uid}')
+        post_delete.connect(_on_change, sender=model, dispatch_uid=f'model_version_delete_{uid}')
+        for field in model._meta.many_to_many:
+            m2m_changed.connect(
+                _on_m2m_change, sender=field.remote_field.through, dispatch_uid=f'model_version_m2m_{uid}_{field.name}'
+            )
+
+
+def conditional_response(request, models, build_data, timeout=60 * 60):
+    """
+    基于模型版本号的条件请求与响应缓存
+
+    models 为响应内容依赖的模型；版本号不变时返回 304 或缓存中的数据，否则调用 build_data() 生成
+    """
+    versions = get_model_versions(models)
+    digest = hashlib.md5(
+        '|'.join([request.get_full_path(), *(token for token, _ in versions)]).encode()
+    ).hexdigest()
+    etag = quote_etag(digest)
+    # 向上取整：截断会让 Last-Modified 早于实际修改时间，同一秒内稍早的 If-Modified-Since 会误判为未修改
+    last_modified = math.ceil(max(timestamp for _, timestamp in versions))
+
+    if _not_modified(request, etag, last_modified):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        cache_key = f'{RESPONSE_PREFIX}:{digest}'
+        data = cache.get(cache_key)
+        if data is None:
+            data = build_data()
+            cache.set(cache_key, data, timeout)
+        response = Response(data)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # 允许浏览器缓存，但每次使用前都要重新验证
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        # 经过 gzip 等代理后 ETag 可能被改为弱校验形式 W/"..."
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return etag in tags or '*' in tags
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+class ConditionalListMixin:
+    """
+    为 ViewSet 的 list 增加 ETag/Last-Modified 条件请求和响应缓存
+
+    list_cache_dependencies 声明序列化结果中还用到了哪些模型（如项目组中的部门名称）。
+    """
+    list_cache_dependencies = ()
+    list_cache_timeout = 60 * 60
+
+    def list(self, request, *args, **kwargs):
+        models = [self.get_queryset().model, *(apps.get_model(label) for label in self.list_cache_dependencies)]
+        return conditional_response(
+            request, models, lambda: super(ConditionalListMixin, self).list(request, *args, **kwargs).data,
+            timeout=self.list_cache_timeout,
+        )
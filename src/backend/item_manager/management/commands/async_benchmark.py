@@ -0,0 +1,92 @@
+import asyncio
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from item_manager.benchmark import benchmark_database, latency_summary, seed_dataset
+
+# (名称, 同步 DRF 接口, 异步接口)
+ENDPOINTS = [
+    ('物品列表', '/api/items/', '/api/async/items/'),
+    ('物品详情', '/api/items/{item_id}/', '/api/async/items/{item_id}/'),
+    ('当前使用记录', '/api/usages/current/', '/api/async/usages/current/'),
+    ('人员列表', '/api/personnel/', '/api/async/personnel/'),
+    (
+        '考评人员汇总',
+        '/api/evaluation-records/personnel-summary/',
+        '/api/async/evaluation-records/personnel-summary/',
+    ),
+]
+
+
+async def _drive(path, headers, total, concurrency):
+    """通过 ASGI 处理器并发请求同一接口，返回 (耗时, 延迟列表)"""
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise CommandError(f'{path} 返回 {response.status_code}')
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - start, latencies
+
+
+class Command(BaseCommand):
+    help = '在独立测试数据库中对比同步 DRF 接口与异步接口在并发下的吞吐量和延迟（经由 ASGI 处理器）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=100, help='合成数据集的物品数量，默认100')
+        parser.add_argument('--requests', type=int, default=200, help='每个接口的请求总数，默认200')
+        parser.add_argument('--concurrency', type=int, default=20, help='并发请求数，默认20')
+        parser.add_argument('--json', dest='json_path', default=None, help='将结果写入 JSON 文件')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            dataset = seed_dataset(items=options['items'])
+            user = User.objects.create_user(username='benchmark', password='benchmark')
+            headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+            item_id = dataset['first_item_id']
+            results = asyncio.run(self._run_all(headers, item_id, options))
+
+        for result in results:
+            self.stdout.write(
+                f"{result['name']}：同步 {result['sync']['rps']} 请求/秒（p95 {result['sync']['latency_ms']['p95']}ms），"
+                f"异步 {result['async']['rps']} 请求/秒（p95 {result['async']['latency_ms']['p95']}ms），"
+                f"提升 {result['speedup']}x"
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump({'dataset': dataset, 'options': {
+                    key: options[key] for key in ('items', 'requests', 'concurrency')
+                }, 'results': results}, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"结果已写入 {options['json_path']}"))
+
+    async def _run_all(self, headers, item_id, options):
+        results = []
+        for name, sync_path, async_path in ENDPOINTS:
+            result = {'name': name}
+            for mode, path in (('sync', sync_path), ('async', async_path)):
+                path = path.format(item_id=item_id)
+                # 预热一次，排除首次加载的开销
+                await _drive(path, headers, 1, 1)
+                elapsed, latencies = await _drive(path, headers, options['requests'], options['concurrency'])
+                result[mode] = {
+                    'path': path,
+                    'rps': round(len(latencies) / elapsed, 1),
+                    'latency_ms': latency_summary(latencies),
+                }
+            result['speedup'] = round(result['async']['rps'] / result['sync']['rps'], 2)
+            results.append(result)
+        return results
@@ -0,0 +1,187 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection
+from rest_framework_simplejwt.tokens import AccessToken
+
+from item_manager.benchmark import benchmark_database, current_rss_mb, latency_summary, seed_dataset
+
+# (名称, 路径)，路径中的 {item_id} 在运行时替换
+ENDPOINTS = [
+    ('物品列表', '/api/items/'),
+    ('物品详情', '/api/items/{item_id}/'),
+    ('可用物品', '/api/items/available/'),
+    ('使用记录列表', '/api/usages/'),
+    ('当前使用记录', '/api/usages/current/'),
+    ('财务记录列表', '/api/finance/'),
+    ('人员列表', '/api/personnel/'),
+    ('考评记录列表', '/api/evaluation-records/'),
+    ('考评人员汇总', '/api/evaluation-records/personnel-summary/'),
+    ('全局搜索', '/api/search/?q=物品'),
+]
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """不输出访问日志的请求处理器"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class QueryCountingApp:
+    """包装 WSGI 应用，按路径统计每个请求执行的 SQL 数量"""
+
+    def __init__(self, application):
+        self.application = application
+        self.lock = threading.Lock()
+        self.query_counts = {}
+
+    def __call__(self, environ, start_response):
+        count = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        # 服务线程各自持有数据库连接，需要在处理请求的线程内安装钩子
+        with connection.execute_wrapper(counter):
+            response = self.application(environ, start_response)
+        path = environ['PATH_INFO']
+        if environ.get('QUERY_STRING'):
+            path += '?' + environ['QUERY_STRING']
+        with self.lock:
+            self.query_counts.setdefault(path, []).append(count)
+        return response
+
+
+class Command(BaseCommand):
+    help = '在独立测试数据库中生成合成数据，启动本地服务并发请求主要接口，统计延迟、SQL 数量和内存占用'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=200, help='物品数量，默认200')
+        parser.add_argument('--images-per-item', type=int, default=2, help='每个物品的图片数量，默认2')
+        parser.add_argument('--usages-per-item', type=int, default=3, help='每个物品的使用记录数量，默认3')
+        parser.add_argument('--finance-records', type=int, default=None, help='财务记录数量，默认与物品数量相同')
+        parser.add_argument('--personnel', type=int, default=None, help='人员数量，默认为物品数量的一半')
+        parser.add_argument('--records-per-person', type=int, default=4, help='每人考评记录数量，默认4')
+        parser.add_argument('--requests', type=int, default=100, help='每个接口的请求总数，默认100')
+        parser.add_argument('--concurrency', type=int, default=8, help='并发客户端数量，默认8')
+        parser.add_argument('--endpoint', action='append', default=None,
+                            help='只测试路径包含该字符串的接口，可重复指定')
+        parser.add_argument('--seed', type=int, default=0, help='随机数种子，相同参数生成相同数据，默认0')
+        parser.add_argument('--json', dest='json_path', default=None, help='将结果写入 JSON 文件，便于回归对比')
+
+    def handle(self, *args, **options):
+        endpoints = ENDPOINTS
+        if options['endpoint']:
+            endpoints = [e for e in ENDPOINTS if any(key in e[1] for key in options['endpoint'])]
+            if not endpoints:
+                raise CommandError('没有匹配的接口')
+
+        # 服务线程需要各自连接同一个数据库，SQLite 使用临时文件而不是内存库
+        with tempfile.TemporaryDirectory(prefix='item-manager-bench-') as temp_dir:
+            test_name = os.path.join(temp_dir, 'bench.sqlite3') if connection.vendor == 'sqlite' else None
+            dataset, results, rss_before, rss_after = self._benchmark(test_name, endpoints, options)
+
+        self.stdout.write(f'数据集：{dataset}')
+        for result in results:
+            self.stdout.write(
+                f"{result['name']:<10} {result['rps']:>8} 请求/秒  "
+                f"p50 {result['latency_ms']['p50']}ms  p95 {result['latency_ms']['p95']}ms  "
+                f"p99 {result['latency_ms']['p99']}ms  SQL {result['queries_per_request']}/请求  "
+                f"内存 {result['rss_mb']}MB"
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump({
+                    'dataset': dataset,
+                    'options': {key: options[key] for key in (
+                        'items', 'images_per_item', 'usages_per_item', 'finance_records', 'personnel',
+                        'records_per_person', 'requests', 'concurrency', 'seed',
+                    )},
+                    'rss_mb': {'before': rss_before, 'after': rss_after},
+                    'results': results,
+                }, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"结果已写入 {options['json_path']}"))
+
+    def _benchmark(self, test_name, endpoints, options):
+        """在测试数据库中生成数据并压测，返回 (数据集, 结果, 压测前内存, 压测后内存)"""
+        from search.registry import rebuild
+
+        with benchmark_database(test_name):
+            dataset = seed_dataset(
+                items=options['items'], seed=options['seed'],
+                images_per_item=options['images_per_item'], usages_per_item=options['usages_per_item'],
+                finance_records=options['finance_records'], personnel=options['personnel'],
+                records_per_person=options['records_per_person'],
+            )
+            # bulk_create 不触发信号，手动重建搜索索引
+            rebuild()
+            user = User.objects.create_user(username='benchmark', password='benchmark', is_staff=True)
+            token = str(AccessToken.for_user(user))
+            rss_before = current_rss_mb()
+            results = self._run(endpoints, token, dataset['first_item_id'], options)
+            rss_after = current_rss_mb()
+        return dataset, results, rss_before, rss_after
+
+    def _run(self, endpoints, token, item_id, options):
+        app = QueryCountingApp(WSGIHandler())
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler, allow_reuse_address=False)
+        server.set_app(app)
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        base_url = f'http://127.0.0.1:{server.server_address[1]}'
+        headers = {'Authorization': f'Bearer {token}'}
+
+        def fetch(path):
+            request = urllib.request.Request(base_url + path, headers=headers)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    body = response.read()
+            except urllib.error.HTTPError as e:
+                raise CommandError(f'{path} 返回 {e.code}')
+            return time.perf_counter() - start, len(body)
+
+        results = []
+        try:
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+                for name, path in endpoints:
+                    path = urllib.parse.quote(path.format(item_id=item_id), safe='/?=&')
+                    # 预热一次，排除首次加载的开销，同时记录响应大小
+                    _, size = fetch(path)
+                    app.query_counts.pop(path, None)
+
+                    start = time.perf_counter()
+                    samples = list(executor.map(fetch, [path] * options['requests']))
+                    elapsed = time.perf_counter() - start
+                    latencies = [latency for latency, _ in samples]
+                    query_counts = app.query_counts.get(path, [])
+                    results.append({
+                        'name': name,
+                        'path': path,
+                        'rps': round(len(latencies) / elapsed, 1),
+                        'latency_ms': latency_summary(latencies),
+                        'queries_per_request': (
+                            round(sum(query_counts) / len(query_counts), 1) if query_counts else 0
+                        ),
+                        'response_bytes': size,
+                        'rss_mb': current_rss_mb(),
+                    })
+        finally:
+            server.shutdown()
+            server.server_close()
+        return results
@@ -0,0 +1,145 @@
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from item_manager.benchmark import latency_summary
+
+# 对比的连接配置：Django 默认配置 与 settings.SQLITE_PRAGMAS 调优后的配置
+PROFILES = {
+    'default': {
+        'description': '回滚日志 + DEFERRED 事务 + 5 秒超时（Django 默认）',
+        'pragmas': {},
+        'begin': 'BEGIN',
+        'timeout': 5.0,
+    },
+    'tuned': {
+        'description': 'settings.SQLITE_PRAGMAS + BEGIN IMMEDIATE',
+        'pragmas': settings.SQLITE_PRAGMAS,
+        'begin': 'BEGIN IMMEDIATE',
+        'timeout': settings.SQLITE_PRAGMAS.get('busy_timeout', 5000) / 1000,
+    },
+}
+
+
+def _connect(path, profile):
+    conn = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None)
+    for name, value in profile['pragmas'].items():
+        conn.execute(f'PRAGMA {name}={value}')
+    return conn
+
+
+def _prepare(path, profile, item_count):
+    conn = _connect(path, profile)
+    conn.executescript('''
+        CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT, status TEXT);
+        CREATE TABLE usage (
+            id INTEGER PRIMARY KEY, item_id INTEGER, user TEXT, start_time REAL, is_returned INTEGER
+        );
+        CREATE INDEX usage_item_returned ON usage (item_id, is_returned);
+    ''')
+    conn.executemany(
+        'INSERT INTO item (id, name, status) VALUES (?, ?, ?)',
+        [(i, f'物品{i}', 'available') for i in range(1, item_count + 1)],
+    )
+    conn.close()
+
+
+def _run_worker(args):
+    """模拟借用/归还：事务内先读物品状态，再写使用记录和物品状态"""
+    path, profile_name, transactions, item_count, seed = args
+    profile = PROFILES[profile_name]
+    conn = _connect(path, profile)
+    rnd = random.Random(seed)
+    committed = lock_errors = 0
+    latencies = []
+
+    for _ in range(transactions):
+        item_id = rnd.randint(1, item_count)
+        start = time.perf_counter()
+        try:
+            conn.execute(profile['begin'])
+            status = conn.execute('SELECT status FROM item WHERE id = ?', [item_id]).fetchone()[0]
+            if status == 'available':
+                conn.execute(
+                    'INSERT INTO usage (item_id, user, start_time, is_returned) VALUES (?, ?, ?, 0)',
+                    [item_id, f'用户{seed}', time.time()],
+                )
+                conn.execute("UPDATE item SET status = 'in_use' WHERE id = ?", [item_id])
+            else:
+                conn.execute('UPDATE usage SET is_returned = 1 WHERE item_id = ? AND is_returned = 0', [item_id])
+                conn.execute("UPDATE item SET status = 'available' WHERE id = ?", [item_id])
+            conn.execute('COMMIT')
+            committed += 1
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e) and 'busy' not in str(e):
+                raise
+            lock_errors += 1
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+        latencies.append(time.perf_counter() - start)
+
+        # 夹杂列表类读请求
+        conn.execute("SELECT COUNT(*) FROM item WHERE status = 'in_use'").fetchone()
+
+    conn.close()
+    return committed, lock_errors, latencies
+
+
+class Command(BaseCommand):
+    help = 'SQLite 并发写入基准测试：对比默认连接配置与调优配置的锁错误数和吞吐量'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='并发进程数，默认8')
+        parser.add_argument('--transactions', type=int, default=200, help='每个进程执行的事务数，默认200')
+        parser.add_argument('--items', type=int, default=50, help='物品数量，越少冲突越多，默认50')
+        parser.add_argument('--json', dest='json_path', default=None, help='将结果写入 JSON 文件')
+
+    def handle(self, *args, **options):
+        results = {}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, profile in PROFILES.items():
+                path = os.path.join(tmpdir, f'{name}.sqlite3')
+                _prepare(path, profile, options['items'])
+                tasks = [
+                    (path, name, options['transactions'], options['items'], seed)
+                    for seed in range(options['workers'])
+                ]
+                start = time.perf_counter()
+                with multiprocessing.Pool(options['workers']) as pool:
+                    outcomes = pool.map(_run_worker, tasks)
+                elapsed = time.perf_counter() - start
+
+                committed = sum(outcome[0] for outcome in outcomes)
+                lock_errors = sum(outcome[1] for outcome in outcomes)
+                latencies = [latency for outcome in outcomes for latency in outcome[2]]
+                results[name] = {
+                    'description': profile['description'],
+                    'committed': committed,
+                    'lock_errors': lock_errors,
+                    'elapsed_seconds': round(elapsed, 3),
+                    'throughput_tps': round(committed / elapsed, 1) if elapsed else 0.0,
+                    'latency_ms': latency_summary(latencies),
+                }
+
+        for name, result in results.items():
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"{name:<8} {result['description']}\n"
+                f"         提交 {result['committed']}，锁错误 {result['lock_errors']}，"
+                f"吞吐 {result['throughput_tps']} 事务/秒，"
+                f"延迟 p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms"
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump({'options': {
+                    key: options[key] for key in ('workers', 'transactions', 'items')
+                }, 'results': results}, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"结果已写入 {options['json_path']}"))
@@ -0,0 +1,282 @@
+"""
+请求性能统计
+
+RequestMetricsMiddleware 记录每个请求的 SQL 数量、数据库耗时、序列化耗时和响应大小，
+超过 SLOW_REQUEST_THRESHOLD_MS 的请求写入慢请求日志；按接口汇总的直方图以 Prometheus
+文本格式在 /api/metrics/ 输出。
+
+每个 worker 进程在内存中汇总，每隔 REQUEST_METRICS_FLUSH_INTERVAL 秒把快照写入共享缓存，
+/api/metrics/ 合并所有 worker 的快照。统计默认关闭，REQUEST_METRICS_ENABLED 关闭时中间件不会加载，
+也不会安装 SQL 计时钩子。序列化耗时由视图集继承的 SerializerMetricsMixin 记录，不修改 DRF 本身。
+"""
+import contextvars
+import logging
+import os
+import socket
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'item_manager'
+WORKERS_KEY = 'request_metrics:workers'
+WORKER_KEY = 'request_metrics:worker:{}'
+# worker 快照保留时间，退出的 worker 过期后不再计入
+WORKER_SNAPSHOT_TIMEOUT = 24 * 3600
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+# 指标名: (说明, 分桶)
+HISTOGRAMS = {
+    'request_duration_seconds': ('请求处理时间', DURATION_BUCKETS),
+    'db_duration_seconds': ('单个请求的数据库查询总耗时', DURATION_BUCKETS),
+    'serializer_duration_seconds': ('单个请求的序列化耗时（serializer.data）', DURATION_BUCKETS),
+    'db_queries': ('单个请求执行的 SQL 数量', QUERY_BUCKETS),
+    'response_size_bytes': ('响应大小', SIZE_BUCKETS),
+}
+
+_current_stats = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestStats:
+    """单个请求的统计数据，通过 contextvar 在同步/异步调用链之间共享"""
+    __slots__ = ('queries', 'db_time', 'serializer_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+
+
+def _record_query(execute, sql, params, many, context):
+    """安装在每个数据库连接上的钩子，只在统计中的请求内计时"""
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def install_query_hook(sender, connection, **kwargs):
+    """connection_created 信号处理：为新建的数据库连接安装 SQL 计时钩子"""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def serializer_data(serializer):
+    """返回 serializer.data，统计中的请求同时记录序列化耗时（包括序列化过程中的查询）"""
+    stats = _current_stats.get()
+    if stats is None:
+        return serializer.data
+    start = time.perf_counter()
+    try:
+        return serializer.data
+    finally:
+        stats.serializer_time += time.perf_counter() - start
+
+
+class SerializerMetricsMixin:
+    """为 ViewSet 的 list / retrieve 记录序列化耗时，与 DRF 的实现相同，只是通过 serializer_data 取数据"""
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer_data(self.get_serializer(page, many=True)))
+        return Response(serializer_data(self.get_serializer(queryset, many=True)))
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(serializer_data(self.get_serializer(self.get_object())))
+
+
+def connect_hooks():
+    """安装 SQL 计时钩子，由中间件在启用统计时调用"""
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(install_query_hook, dispatch_uid='request_metrics_query_hook')
+    # 钩子连接之前已经建立的连接
+    for connection in connections.all(initialized_only=True):
+        install_query_hook(None, connection)
+
+
+class MetricsRegistry:
+    """当前进程内按接口汇总的直方图"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.last_flush = 0.0
+
+    def observe(self, method, view, values):
+        """记录一次请求，values 为 {指标名: 数值}"""
+        with self.lock:
+            histograms = self.endpoints.get((method, view))
+            if histograms is None:
+                histograms = self.endpoints[(method, view)] = {
+                    name: [[0] * (len(buckets) + 1), 0.0, 0] for name, (_, buckets) in HISTOGRAMS.items()
+                }
+            for name, value in values.items():
+                counts, _, _ = histogram = histograms[name]
+                buckets = HISTOGRAMS[name][1]
+                index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+                counts[index] += 1
+                histogram[1] += value
+                histogram[2] += 1
+
+    def snapshot(self):
+        """返回可存入缓存的快照 {(method, view): {指标名: [分桶计数, 总和, 次数]}}"""
+        with self.lock:
+            return {
+                key: {name: [list(h[0]), h[1], h[2]] for name, h in histograms.items()}
+                for key, histograms in self.endpoints.items()
+            }
+
+    def flush(self, force=False):
+        """把快照写入共享缓存，未到刷新间隔时跳过"""
+        now = time.monotonic()
+        if not force and now - self.last_flush < settings.REQUEST_METRICS_FLUSH_INTERVAL:
+            return
+        self.last_flush = now
+        try:
+            cache.set(WORKER_KEY.format(self.worker_id), self.snapshot(), WORKER_SNAPSHOT_TIMEOUT)
+            workers = cache.get(WORKERS_KEY) or []
+            if self.worker_id not in workers:
+                cache.set(WORKERS_KEY, workers + [self.worker_id], None)
+        except Exception as e:
+            logger.warning(f"写入请求统计快照失败: {e}")
+
+    def collect(self):
+        """合并所有 worker 的快照"""
+        self.flush(force=True)
+        workers = cache.get(WORKERS_KEY) or []
+        snapshots = cache.get_many([WORKER_KEY.format(worker) for worker in workers])
+        alive = [worker for worker in workers if WORKER_KEY.format(worker) in snapshots]
+        if len(alive) != len(workers):
+            cache.set(WORKERS_KEY, alive, None)
+
+        merged = {}
+        for snapshot in snapshots.values():
+            for key, histograms in snapshot.items():
+                target = merged.setdefault(key, {
+                    name: [[0] * (len(buckets) + 1), 0.0, 0] for name, (_, buckets) in HISTOGRAMS.items()
+                })
+                for name, (counts, total, count) in histograms.items():
+                    target[name][0] = [a + b for a, b in zip(target[name][0], counts)]
+                    target[name][1] += total
+                    target[name][2] += count
+        return merged
+
+
+registry = MetricsRegistry()
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(endpoints):
+    """把汇总数据渲染为 Prometheus 文本格式"""
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        metric = f'{METRIC_PREFIX}_{name}'
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} histogram')
+        for (method, view), histograms in sorted(endpoints.items()):
+            counts, total, count = histograms[name]
+            labels = f'method="{_escape_label(method)}",view="{_escape_label(view)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{{labels}}} {round(total, 6)}')
+            lines.append(f'{metric}_count{{{labels}}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def _view_name(request):
+    """接口名称取 URL 名称而不是路径，避免路径参数产生大量标签；未匹配路由时归为 unmatched"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name
+
+
+def _response_size(response):
+    if response.streaming:
+        length = response.get('Content-Length')
+        return int(length) if length and length.isdigit() else None
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    """请求性能统计中间件"""
+    # 同时支持同步和异步调用链，统计数据通过 contextvar 跟随请求
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        connect_hooks()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        self._finish(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        self._finish(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def _finish(self, request, response, stats, duration):
+        view = _view_name(request)
+        values = {
+            'request_duration_seconds': duration,
+            'db_duration_seconds': stats.db_time,
+            'serializer_duration_seconds': stats.serializer_time,
+            'db_queries': stats.queries,
+        }
+        size = _response_size(response)
+        if size is not None:
+            values['response_size_bytes'] = size
+        registry.observe(request.method, view, values)
+
+        if duration * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS:
+            logger.warning(
+                f"慢请求 {request.method} {request.path} 视图={view} 状态={response.status_code} "
+                f"耗时={duration * 1000:.0f}ms SQL={stats.queries}条/{stats.db_time * 1000:.0f}ms "
+                f"序列化={stats.serializer_time * 1000:.0f}ms 响应={size if size is not None else '-'}字节"
+            )
+        registry.flush()
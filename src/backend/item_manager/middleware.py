@@ -0,0 +1,81 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+class RequestContext:
+    """单次请求的上下文信息（操作用户、客户端IP），按需计算并缓存"""
+
+    def __init__(self, request):
+        self._request = request
+        self._actor = None
+
+    @cached_property
+    def client_ip(self):
+        """获取客户端IP，是否信任 X-Forwarded-For 由 TRUST_X_FORWARDED_FOR / NUM_PROXIES 决定"""
+        meta = self._request.META
+        remote_addr = meta.get('REMOTE_ADDR')
+        x_forwarded_for = meta.get('HTTP_X_FORWARDED_FOR')
+
+        if not x_forwarded_for or not getattr(settings, 'TRUST_X_FORWARDED_FOR', True):
+            return remote_addr
+
+        addrs = [addr.strip() for addr in x_forwarded_for.split(',') if addr.strip()]
+        if not addrs:
+            return remote_addr
+
+        num_proxies = getattr(settings, 'NUM_PROXIES', None)
+        if num_proxies is None:
+            # 未配置代理层数时保持原有行为：取最左侧的地址
+            return addrs[0]
+        if num_proxies == 0:
+            return remote_addr
+        # 只信任最右侧 num_proxies 个代理追加的地址
+        return addrs[-min(num_proxies, len(addrs))]
+
+    @property
+    def actor(self):
+        """获取操作用户描述，用于邮件通知和审计日志"""
+        if self._actor is not None:
+            return self._actor
+        try:
+            # DRF 完成认证后会把用户写回原始请求的 user 属性
+            user = getattr(self._request, 'user', None)
+            if user is not None and user.is_authenticated:
+                # 只缓存已认证的结果，避免在 DRF 认证之前访问时把匿名结果缓存下来
+                self._actor = f"{user.username} ({user.email})"
+                return self._actor
+            return f"匿名用户 (IP: {self.client_ip})"
+        except Exception as e:
+            logger.warning(f"获取操作用户信息失败: {e}")
+            return "未知用户"
+
+
+def get_request_context(request):
+    """获取请求上下文，兼容 DRF Request 以及未经过中间件的请求"""
+    request = getattr(request, '_request', request)
+    context = getattr(request, 'request_context', None)
+    if context is None:
+        context = RequestContext(request)
+        request.request_context = context
+    return context
+
+
+class RequestContextMiddleware:
+    """请求上下文中间件，为每个请求挂载惰性计算的 request_context"""
+    # 同时支持同步和异步调用链，ASGI 下不需要为本中间件切换线程
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.request_context = RequestContext(request)
+        return self.get_response(request)
@@ -12,9 +12,12 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import json
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # SECURE 文件用来存储敏感信息，如 SECRET_KEY，SMTP信息 等
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,6 +52,7 @@ INSTALLED_APPS = [
     "corsheaders",
     "django_filters",
     "django_apscheduler",
+    "item_manager",
     "items",
     "finance",
     "email_notice",
@@ -56,9 +60,11 @@ INSTALLED_APPS = [
     "scheduler",
     "memo",
     "evaluation",
+    "search",
 ]
 
 MIDDLEWARE = [
+    "item_manager.metrics.RequestMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -67,6 +73,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "item_manager.middleware.RequestContextMiddleware",
     "email_notice.middleware.EmailNotificationMiddleware",
 ]
 
@@ -92,11 +99,35 @@ ASGI_APPLICATION = "item_manager.asgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# 数据库连接复用：连接保持 CONN_MAX_AGE 秒，复用前检查连接是否可用
+DB_CONN_MAX_AGE = SECURE.get("DATABASE", {}).get("CONN_MAX_AGE", 60)
+
+# SQLite 连接参数：多个 worker 进程共享同一个数据库文件
+# - WAL 模式下读写互不阻塞，synchronous=NORMAL 在 WAL 下仍能保证数据库一致
+# - busy_timeout 让写入在锁被占用时等待而不是立即报 database is locked
+# - 事务使用 BEGIN IMMEDIATE，开始时就获取写锁，避免读锁升级为写锁时的死锁
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 20000,  # 毫秒
+    "mmap_size": 128 * 1024 * 1024,
+    "cache_size": -32000,  # 负数表示 KiB，约 32MB
+    "temp_store": "MEMORY",
+}
+
 # SQLite 配置
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000,
+            "transaction_mode": "IMMEDIATE",
+            # 每个新连接建立后执行
+            "init_command": ";".join(f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()),
+        },
     }
 }
 
@@ -111,9 +142,40 @@ DATABASES = {
 #         "PASSWORD": DB_SECURE.get("PASSWORD"),
 #         "HOST": DB_SECURE.get("HOST"),
 #         "PORT": DB_SECURE.get("PORT"),
+#         "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+#         "CONN_HEALTH_CHECKS": True,
 #     }
 # }
 
+# 是否在运行测试
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+
+# 缓存配置：多个 worker 进程需要共享缓存（JWT 用户缓存、列表响应缓存、模型版本号）
+# 默认使用文件缓存，可在 secure.json 的 CACHE 中改为 Redis：{"BACKEND": "redis", "LOCATION": "redis://127.0.0.1:6379/1"}
+# LOCATION 留空时文件缓存使用 src/backend/cache/
+CACHE_SECURE = SECURE.get("CACHE", {})
+CACHE_BACKENDS = {
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+}
+CACHE_BACKEND = "locmem" if TESTING else CACHE_SECURE.get("BACKEND") or "file"
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"secure.json 中 CACHE.BACKEND 的值 {CACHE_BACKEND!r} 无效，可选值：{', '.join(CACHE_BACKENDS)}"
+    )
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": (
+            CACHE_SECURE.get("LOCATION") or str(BASE_DIR / "cache")
+            if CACHE_BACKEND != "locmem" else "item-manager-tests"
+        ),
+        "KEY_PREFIX": CACHE_SECURE.get("KEY_PREFIX", "item_manager"),
+        "TIMEOUT": CACHE_SECURE.get("TIMEOUT", 300),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -140,7 +202,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "item_manager.authentication.CachedJWTAuthentication",
     ],
 }
 
@@ -155,6 +217,9 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# JWT 认证用户缓存时间（秒），不会超过令牌剩余有效期；设为 0 关闭缓存
+JWT_USER_CACHE_TIMEOUT = 300
+
 
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
@@ -165,6 +230,9 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# 备忘录搜索结果是否被截断，前端需要读取
+CORS_EXPOSE_HEADERS = ["X-Search-Limit", "X-Search-Truncated"]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -186,6 +254,8 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# 是否由 Django 提供媒体文件，开发环境跟随 DEBUG
+SERVE_MEDIA = DEBUG
 
 # 安全设置（生产环境）
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -193,6 +263,11 @@ SECURE_SSL_REDIRECT = False  # 如果使用HTTPS，设置为True
 USE_X_FORWARDED_HOST = True
 USE_X_FORWARDED_PORT = True
 
+# 客户端IP识别：是否信任 X-Forwarded-For，以及前置代理层数
+# NUM_PROXIES 为 None 时取最左侧地址，为 0 时忽略该请求头，为 N 时取右数第 N 个地址
+TRUST_X_FORWARDED_FOR = True
+NUM_PROXIES = None
+
 # Email settings
 EMAIL_HOST = SECURE["SMTP"]["EMAIL_HOST"]
 EMAIL_PORT = SECURE["SMTP"]["EMAIL_PORT"]
@@ -207,6 +282,34 @@ ADMINS = SECURE["SMTP"]["ADMINS"]
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# 定时任务调度器主节点租约有效期（秒），持有者每 1/3 周期续约一次
+SCHEDULER_LOCK_TTL = 60
+
+# 物品逾期提醒：每封汇总邮件包含的最大记录数
+OVERDUE_DIGEST_BATCH_SIZE = 50
+# 同一条逾期记录两次提醒之间的最短间隔（小时）；检测任务每天执行一次，略小于 24 小时以免执行时间的抖动导致隔天漏发
+OVERDUE_REMINDER_INTERVAL_HOURS = 20
+
+# 大批量删除（删除人员考评记录、删除部门）：超过一批的数据由后台任务按主键分批删除
+DELETION_CHUNK_SIZE = 500
+# 每批之间的间隔（秒），让出数据库写锁
+DELETION_CHUNK_PAUSE = 0.05
+# 运行中的任务超过该时间（秒）没有进度视为中断，由调度器接管继续执行
+DELETION_JOB_STALE_SECONDS = 120
+# 是否在请求进程的后台线程中立即开始执行；关闭时只由调度器执行
+DELETION_JOB_IN_THREAD = True
+
+# 备忘录修订历史：每隔多少个差异版本保存一次完整内容，限制还原任意版本的开销
+MEMO_REVISION_CHECKPOINT_INTERVAL = 20
+
+# 请求性能统计（/api/metrics/ 与慢请求日志），默认关闭，关闭时中间件和计时钩子都不会加载
+METRICS_SECURE = SECURE.get("METRICS", {})
+REQUEST_METRICS_ENABLED = METRICS_SECURE.get("ENABLED", False)
+# 超过该耗时（毫秒）的请求写入 logs/slow_requests.log
+SLOW_REQUEST_THRESHOLD_MS = METRICS_SECURE.get("SLOW_REQUEST_MS", 1000)
+# 每个 worker 把统计快照写入共享缓存的间隔（秒）
+REQUEST_METRICS_FLUSH_INTERVAL = 10
+
 # 确保日志目录存在
 LOGS_DIR = BASE_DIR / 'logs'
 if not os.path.exists(LOGS_DIR):
@@ -233,6 +336,12 @@ LOGGING = {
             'filename': LOGS_DIR / 'scheduler.log',
             'formatter': 'verbose',
         },
+        'slow_requests': {
+            'level': 'WARNING',
+            'class': 'logging.FileHandler',
+            'filename': LOGS_DIR / 'slow_requests.log',
+            'formatter': 'verbose',
+        },
         'console': {
             'level': 'INFO',
             'class': 'logging.StreamHandler',
@@ -245,5 +354,10 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'item_manager.metrics': {
+            'handlers': ['slow_requests', 'console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
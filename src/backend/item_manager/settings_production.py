@@ -0,0 +1,27 @@
+"""
+生产环境配置
+
+在 settings.py 的基础上覆盖性能相关的配置，gunicorn 通过 raw_env 使用本模块：
+    DJANGO_SETTINGS_MODULE=item_manager.settings_production
+需要调整的值优先写在 secure.json 中，不必修改 settings.py。
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, REST_FRAMEWORK, SECURE
+
+PRODUCTION = SECURE.get("PRODUCTION", {})
+
+DEBUG = PRODUCTION.get("DEBUG", False)
+
+# 上传的媒体文件默认仍由 Django 提供（不依赖 DEBUG），改由 nginx 提供后可在 secure.json 中关闭
+SERVE_MEDIA = PRODUCTION.get("SERVE_MEDIA", True)
+
+# gunicorn 使用 UvicornWorker 以 ASGI 运行，同步代码在 sync_to_async 的线程中访问数据库，
+# 每个线程各自持有连接，长连接无法在请求结束时关闭而不断累积；按 Django 文档在异步模式下关闭长连接
+DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+# 只返回 JSON，不渲染可浏览 API 页面
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+}
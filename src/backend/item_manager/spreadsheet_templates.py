@@ -0,0 +1,100 @@
+"""
+Excel 样表注册表
+
+样表内容固定，各 app 用 register_template 注册生成函数，每个进程只生成一次，之后直接返回内存中的字节。
+工作簿属性中的创建/修改时间和 zip 条目时间都固定，相同内容在每个 worker、每次部署中生成相同的字节，
+ETag 取内容哈希，可以作为强 ETag；客户端携带匹配的 If-None-Match 时返回 304。
+gunicorn 使用 preload_app 时在 asgi.py 中预先生成，fork 出的 worker 共享同一份字节。
+"""
+import hashlib
+import io
+import threading
+import zipfile
+from datetime import datetime
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import content_disposition_header, quote_etag
+from openpyxl.xml.constants import ARC_CORE
+from openpyxl.xml.functions import tostring
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# 固定的文档时间和 zip 条目时间，保证生成的字节可复现
+FIXED_TIMESTAMP = datetime(2024, 1, 1)
+# 样表只在部署时变化，浏览器缓存一小时后用 ETag 重新验证
+TEMPLATE_CACHE_CONTROL = 'private, max-age=3600'
+
+_builders = {}
+_templates = {}
+_lock = threading.Lock()
+
+
+class SpreadsheetTemplate:
+    """生成好的样表"""
+    __slots__ = ('filename', 'content', 'etag')
+
+    def __init__(self, filename, content):
+        self.filename = filename
+        self.content = content
+        self.etag = quote_etag(hashlib.sha256(content).hexdigest())
+
+
+def register_template(name, filename):
+    """注册样表生成函数（装饰器），生成函数返回 openpyxl Workbook"""
+    def decorator(builder):
+        _builders[name] = (filename, builder)
+        _templates.pop(name, None)
+        return builder
+    return decorator
+
+
+def _workbook_bytes(workbook):
+    output = io.BytesIO()
+    workbook.save(output)
+
+    # openpyxl 保存时把修改时间和 zip 条目时间设为当前时间，按原顺序重新打包并替换为固定时间
+    workbook.properties.created = FIXED_TIMESTAMP
+    workbook.properties.modified = FIXED_TIMESTAMP
+    normalized = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(output.getvalue())) as source, \
+            zipfile.ZipFile(normalized, 'w', zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            entry = zipfile.ZipInfo(info.filename, date_time=FIXED_TIMESTAMP.timetuple()[:6])
+            entry.compress_type = zipfile.ZIP_DEFLATED
+            if info.filename == ARC_CORE:
+                target.writestr(entry, tostring(workbook.properties.to_tree()))
+            else:
+                target.writestr(entry, source.read(info))
+    return normalized.getvalue()
+
+
+def get_template(name):
+    """返回生成好的样表，每个进程第一次访问时生成"""
+    template = _templates.get(name)
+    if template is None:
+        with _lock:
+            template = _templates.get(name)
+            if template is None:
+                filename, builder = _builders[name]
+                template = _templates[name] = SpreadsheetTemplate(filename, _workbook_bytes(builder()))
+    return template
+
+
+def build_templates():
+    """生成所有已注册的样表，在启动时调用"""
+    for name in list(_builders):
+        get_template(name)
+
+
+def template_response(request, name):
+    """下载样表的响应，ETag 匹配时返回 304"""
+    template = get_template(name)
+    if_none_match = request.headers.get('If-None-Match', '')
+    # 经过 gzip 等代理后 ETag 可能被改为弱校验形式 W/"..."
+    if template.etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(',')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(template.content, content_type=XLSX_CONTENT_TYPE)
+        response['Content-Disposition'] = content_disposition_header(True, template.filename)
+    response['ETag'] = template.etag
+    response['Cache-Control'] = TEMPLATE_CACHE_CONTROL
+    return response
@@ -0,0 +1,224 @@
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import CachedJWTAuthentication
+from .benchmark import latency_summary, seed_dataset
+from .metrics import registry, serializer_data
+from .middleware import get_request_context
+
+
+class RequestContextTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_client_ip_uses_leftmost_forwarded_address_by_default(self):
+        """默认取 X-Forwarded-For 最左侧地址"""
+        request = self.factory.get('/', HTTP_X_FORWARDED_FOR='1.1.1.1, 10.0.0.1', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(get_request_context(request).client_ip, '1.1.1.1')
+
+    @override_settings(NUM_PROXIES=1)
+    def test_client_ip_honors_num_proxies(self):
+        """配置代理层数后只信任代理追加的地址"""
+        request = self.factory.get('/', HTTP_X_FORWARDED_FOR='6.6.6.6, 1.1.1.1', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(get_request_context(request).client_ip, '1.1.1.1')
+
+    @override_settings(TRUST_X_FORWARDED_FOR=False)
+    def test_client_ip_ignores_untrusted_header(self):
+        """不信任代理时使用 REMOTE_ADDR"""
+        request = self.factory.get('/', HTTP_X_FORWARDED_FOR='6.6.6.6', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(get_request_context(request).client_ip, '10.0.0.2')
+
+    def test_actor_resolved_after_authentication(self):
+        """认证前访问不会缓存匿名结果"""
+        request = self.factory.get('/', REMOTE_ADDR='10.0.0.2')
+        request.user = AnonymousUser()
+        context = get_request_context(request)
+        self.assertEqual(context.actor, '匿名用户 (IP: 10.0.0.2)')
+
+        request.user = User(username='admin', email='admin@example.com')
+        self.assertEqual(context.actor, 'admin (admin@example.com)')
+        self.assertIs(get_request_context(request), context)
+
+
+class CachedJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tester', email='tester@example.com', password='pass1234')
+        self.token = AccessToken.for_user(self.user)
+        self.auth = CachedJWTAuthentication()
+
+    def test_cached_user_skips_database(self):
+        """同一令牌的第二次认证不再查询用户表"""
+        self.assertEqual(self.auth.get_user(self.token), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.auth.get_user(self.token), self.user)
+
+    def test_password_hash_not_cached(self):
+        """缓存中不保存密码哈希"""
+        self.auth.get_user(self.token)
+        entry = cache.get(f"jwt_user:{self.user.id}:{self.token['jti']}")
+        self.assertNotIn(self.user.password, repr(entry))
+        with self.assertNumQueries(0):
+            user = self.auth.get_user(self.token)
+        self.assertEqual((user.username, user.email, user.is_staff), ('tester', 'tester@example.com', False))
+
+    def test_deactivated_user_invalidates_cache(self):
+        """停用用户后缓存失效，认证失败"""
+        self.auth.get_user(self.token)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
+
+
+class ConditionalListTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='tester', password='pass1234'))
+
+    def test_not_modified_until_model_changes(self):
+        """ETag 未变化时返回 304 且不查询数据库，数据变更后 ETag 更新"""
+        from finance.models import Department
+
+        response = self.client.get('/api/departments/')
+        etag = response['ETag']
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/departments/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/departments/').status_code, 200)
+
+        # 提交前版本号不变，其他请求不会以新 ETag 缓存提交前的数据
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Department.objects.create(name='技术部')
+        self.assertEqual(self.client.get('/api/departments/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        for callback in callbacks:
+            callback()
+        response = self.client.get('/api/departments/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([dept['name'] for dept in response.data], ['技术部'])
+
+    def test_if_modified_since_uses_whole_seconds_after_the_change(self):
+        """修改时间不是整秒时，同一秒开始时的 If-Modified-Since 不会得到 304"""
+        from finance.models import Department
+
+        from .caching import _version_key
+
+        cache.set(_version_key(Department), ('token', 100.7), None)
+        response = self.client.get('/api/departments/')
+        self.assertEqual(response['Last-Modified'], http_date(101))
+        self.assertEqual(self.client.get('/api/departments/', HTTP_IF_MODIFIED_SINCE=http_date(100)).status_code, 200)
+        self.assertEqual(self.client.get('/api/departments/', HTTP_IF_MODIFIED_SINCE=http_date(101)).status_code, 304)
+
+    def test_project_groups_follow_department_changes(self):
+        """项目组列表包含部门名称，部门变更后也会失效"""
+        from finance.models import Department
+
+        with self.captureOnCommitCallbacks(execute=True):
+            department = Department.objects.create(name='技术部')
+        etag = self.client.get('/api/project-groups/')['ETag']
+        department.name = '研发部'
+        with self.captureOnCommitCallbacks(execute=True):
+            department.save()
+        self.assertEqual(self.client.get('/api/project-groups/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_one_version_bump_per_transaction(self):
+        """一个事务中删除多行只在提交后更换一次版本号"""
+        from evaluation.models import EvaluationRecord
+        from finance.models import Department
+
+        with self.captureOnCommitCallbacks(execute=True):
+            department = Department.objects.create(name='技术部')
+            EvaluationRecord.objects.bulk_create([
+                EvaluationRecord(personnel=f'成员{i}', department=department, item_description='值班')
+                for i in range(30)
+            ])
+        with mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                EvaluationRecord.objects.all().delete()
+        version_writes = [
+            call for call in set_many.call_args_list if any(key.startswith('model_version') for key in call.args[0])
+        ]
+        self.assertEqual(len(version_writes), 1)
+        self.assertIn('model_version:evaluation.evaluationrecord', version_writes[0].args[0])
+        self.assertEqual(len(callbacks), 2)
+
+
+class BenchmarkDatasetTestCase(TestCase):
+    def test_seed_dataset_sizes_are_configurable(self):
+        from items.models import ItemImage, ItemUsage
+
+        dataset = seed_dataset(items=4, images_per_item=1, usages_per_item=2, finance_records=3,
+                               personnel=2, records_per_person=5)
+        self.assertEqual(ItemImage.objects.count(), 4)
+        self.assertEqual(ItemUsage.objects.count(), 8)
+        self.assertEqual(dataset['finance_records'], 3)
+        self.assertEqual(dataset['evaluation_records'], 10)
+
+    def test_latency_summary_percentiles(self):
+        summary = latency_summary([i / 1000 for i in range(1, 101)])
+        self.assertEqual(summary['p50'], 51.0)
+        self.assertEqual(summary['p99'], 100.0)
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class RequestMetricsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.endpoints.clear()
+        self.admin = User.objects.create_user(username='admin', password='pass1234', is_staff=True)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.admin)}')
+
+    def test_metrics_aggregated_per_view(self):
+        """按 URL 名称汇总请求耗时、SQL 数量等直方图"""
+        self.client.get('/api/usages/')
+        self.client.get('/api/usages/')
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('item_manager_request_duration_seconds_count{method="GET",view="itemusage-list"} 2', body)
+        self.assertIn('item_manager_db_queries_bucket{method="GET",view="itemusage-list",le="+Inf"} 2', body)
+        self.assertIn('item_manager_serializer_duration_seconds_count{method="GET",view="itemusage-list"} 2', body)
+
+    def test_serializer_time_recorded_by_opted_in_viewsets(self):
+        """序列化耗时只由继承 SerializerMetricsMixin 的视图集记录"""
+        with mock.patch('item_manager.metrics.serializer_data', wraps=serializer_data) as timed:
+            self.client.get('/api/usages/')
+            self.client.get('/api/departments/')
+        self.assertEqual(timed.call_count, 1)
+        sums = {
+            view: registry.endpoints[('GET', view)]['serializer_duration_seconds'][1]
+            for view in ('itemusage-list', 'department-list')
+        }
+        self.assertGreater(sums['itemusage-list'], 0)
+        self.assertEqual(sums['department-list'], 0)
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_disabled_by_default_setting(self):
+        self.client.get('/api/usages/')
+        self.assertEqual(registry.endpoints, {})
+
+    def test_metrics_admin_only(self):
+        user = User.objects.create_user(username='member', password='pass1234')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        self.assertEqual(client.get('/api/metrics/').status_code, 403)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_slow_request_logged_with_view_name(self):
+        with self.assertLogs('item_manager.metrics', level='WARNING') as logs:
+            self.client.get('/api/usages/')
+        self.assertIn('视图=itemusage-list', logs.output[0])
@@ -0,0 +1,37 @@
+"""
+事务提交后的批量回调
+
+逐条触发的模型信号（如 queryset.delete() 对每一行发送 post_delete）如果各自注册 on_commit 回调，
+一次删除几百行就会在提交后执行几百次写操作。defer_until_commit 把同一事务中同名的回调合并为一次，
+提交后用收集到的全部参数调用一次 flush。
+"""
+from django.db import transaction
+
+
+def _registered(connection, callback):
+    # run_on_commit 中的元素为 (保存点 id 集合, 回调, robust)，事务或保存点回滚时 Django 会移除对应的回调
+    return any(func is callback for _, func, _ in connection.run_on_commit)
+
+
+def defer_until_commit(name, item, flush, using=None):
+    """
+    在当前事务提交后调用 flush(items)，items 为本事务中所有以 name 提交的 item 的集合
+
+    不在事务中时立即调用。事务回滚后之前收集的 item 随回调一起丢弃。
+    """
+    connection = transaction.get_connection(using)
+    batches = connection.__dict__.setdefault('_deferred_batches', {})
+    batch = batches.get(name)
+    if batch is not None and _registered(connection, batch[0]):
+        batch[1].add(item)
+        return
+
+    items = {item}
+
+    def callback():
+        if batches.get(name, (None,))[0] is callback:
+            del batches[name]
+        flush(items)
+
+    batches[name] = (callback, items)
+    transaction.on_commit(callback, using=using)
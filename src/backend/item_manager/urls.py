@@ -16,11 +16,13 @@ Including another URLconf
 """
 
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+from django.views.static import serve
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from . import views
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("items.urls")),
@@ -29,10 +31,16 @@ urlpatterns = [
     path("", include("personnel.urls")),
     path("", include("memo.urls")),
     path("", include("evaluation.urls")),
+    path("", include("search.urls")),
+    path("", include("scheduler.urls")),
     path("api-auth/", include("rest_framework.urls")),
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/metrics/", views.metrics, name="metrics"),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+if settings.SERVE_MEDIA:
+    # static() 只在 DEBUG 下生效，这里显式注册，生产环境关闭 DEBUG 后仍可由 Django 提供媒体文件
+    urlpatterns += [
+        re_path(rf"^{settings.MEDIA_URL.strip('/')}/(?P<path>.*)$", serve, {"document_root": settings.MEDIA_ROOT}),
+    ]
\ No newline at end of file
@@ -0,0 +1,17 @@
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAdminUser
+
+from .authentication import CachedJWTAuthentication
+from .metrics import registry, render_prometheus
+
+
+@api_view(["GET"])
+@authentication_classes([CachedJWTAuthentication])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    """按接口汇总的请求性能直方图（Prometheus 文本格式），仅管理员可访问"""
+    return HttpResponse(
+        render_prometheus(registry.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
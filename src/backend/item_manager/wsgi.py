@@ -11,6 +11,11 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from item_manager.spreadsheet_templates import build_templates
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "item_manager.settings")
 
 application = get_wsgi_application()
+
+# 预先生成 Excel 样表，worker 共享
+build_templates()
@@ -43,8 +43,8 @@ class ItemAdmin(admin.ModelAdmin):
 
 @admin.register(ItemUsage)
 class ItemUsageAdmin(admin.ModelAdmin):
-    list_display = ['item', 'user', 'borrower_contact', 'start_time', 'end_time', 'is_returned', 'purpose']
-    list_filter = ['is_returned', 'start_time', 'item__category']
+    list_display = ['item', 'user', 'borrower_contact', 'start_time', 'end_time', 'is_returned', 'is_overdue', 'purpose']
+    list_filter = ['is_returned', 'is_overdue', 'start_time', 'item__category']
     search_fields = ['item__name', 'user', 'purpose', 'borrower_contact']
     readonly_fields = ['created_at']
     inlines = [UsageImageInline]
@@ -53,7 +53,7 @@ class ItemUsageAdmin(admin.ModelAdmin):
             'fields': ('item', 'user', 'borrower_contact', 'purpose', 'notes')
         }),
         ('时间信息', {
-            'fields': ('start_time', 'end_time', 'expected_return_time', 'is_returned')
+            'fields': ('start_time', 'end_time', 'expected_return_time', 'is_returned', 'is_overdue', 'overdue_notified_at')
         }),
         ('状况记录', {
             'fields': ('condition_before', 'condition_after')
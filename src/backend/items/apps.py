@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ItemsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "items"
+
+    def ready(self):
+        from item_manager.caching import register_versioned_models
+        register_versioned_models('items.Category')
@@ -0,0 +1,143 @@
+from collections import defaultdict
+
+from rest_framework import exceptions
+
+from item_manager.async_views import (
+    async_api_view, file_url, format_date, format_datetime, format_decimal, json_response
+)
+
+from .models import Item, ItemImage, ItemUsage, UsageImage, open_usage_filter
+
+
+def _item_image_data(request, image):
+    return {
+        'id': image.id,
+        'image': file_url(request, image.image),
+        'image_url': file_url(request, image.image),
+        'description': image.description,
+        'is_primary': image.is_primary,
+        'created_at': format_datetime(image.created_at),
+    }
+
+
+def _usage_image_data(request, image):
+    return {
+        'id': image.id,
+        'image': file_url(request, image.image),
+        'image_url': file_url(request, image.image),
+        'image_type': image.image_type,
+        'description': image.description,
+        'created_at': format_datetime(image.created_at),
+    }
+
+
+def _item_data(request, item, images, current_usage):
+    """与 ItemSerializer 输出一致"""
+    primary = next((image for image in images if image.is_primary), None)
+    return {
+        'id': item.id,
+        'name': item.name,
+        'description': item.description,
+        'serial_number': item.serial_number,
+        'category': item.category,
+        'status': item.status,
+        'location': item.location,
+        'owner': item.owner,
+        'purchase_date': format_date(item.purchase_date),
+        'value': format_decimal(item.value),
+        'created_at': format_datetime(item.created_at),
+        'updated_at': format_datetime(item.updated_at),
+        'current_user': {
+            'username': current_usage.user,
+            'contact': current_usage.borrower_contact,
+        } if current_usage else None,
+        'images': [_item_image_data(request, image) for image in images],
+        'primary_image': file_url(request, primary.image) if primary else None,
+    }
+
+
+def _usage_data(request, usage, images):
+    """与 ItemUsageSerializer 输出一致"""
+    image_data = [_usage_image_data(request, image) for image in images]
+    return {
+        'id': usage.id,
+        'item': usage.item_id,
+        'item_name': usage.item.name,
+        'item_serial': usage.item.serial_number,
+        'user': usage.user,
+        'borrower_contact': usage.borrower_contact,
+        'start_time': format_datetime(usage.start_time),
+        'end_time': format_datetime(usage.end_time),
+        'purpose': usage.purpose,
+        'notes': usage.notes,
+        'is_returned': usage.is_returned,
+        'is_overdue': usage.is_overdue,
+        'condition_before': usage.condition_before,
+        'condition_after': usage.condition_after,
+        'expected_return_time': format_datetime(usage.expected_return_time),
+        'created_at': format_datetime(usage.created_at),
+        'images': image_data,
+        'borrow_images': [data for data in image_data if data['image_type'] == 'borrow'],
+        'return_images': [data for data in image_data if data['image_type'] == 'return'],
+    }
+
+
+async def _item_images(item_ids):
+    images = defaultdict(list)
+    async for image in ItemImage.objects.filter(item_id__in=item_ids).aiterator():
+        images[image.item_id].append(image)
+    return images
+
+
+async def _current_usages(item_ids):
+    """每个物品最近一条未归还记录"""
+    usages = {}
+    async for usage in ItemUsage.objects.filter(open_usage_filter(), item_id__in=item_ids).aiterator():
+        usages.setdefault(usage.item_id, usage)
+    return usages
+
+
+async def _usage_list(request, queryset):
+    usages = [usage async for usage in queryset.aiterator()]
+    images = defaultdict(list)
+    async for image in UsageImage.objects.filter(usage_id__in=[u.id for u in usages]).aiterator():
+        images[image.usage_id].append(image)
+    return [_usage_data(request, usage, images[usage.id]) for usage in usages]
+
+
+@async_api_view
+async def item_list(request):
+    """物品列表（异步），支持 ?status= 过滤"""
+    queryset = Item.objects.all()
+    if request.GET.get('status'):
+        queryset = queryset.filter(status=request.GET['status'])
+    items = [item async for item in queryset.aiterator()]
+    item_ids = [item.id for item in items]
+    images = await _item_images(item_ids)
+    usages = await _current_usages(item_ids)
+    return json_response([
+        _item_data(request, item, images[item.id], usages.get(item.id)) for item in items
+    ])
+
+
+@async_api_view
+async def item_detail(request, pk):
+    """物品详情（异步），包含最近10条使用历史"""
+    try:
+        item = await Item.objects.aget(pk=pk)
+    except Item.DoesNotExist:
+        raise exceptions.NotFound()
+    images = await _item_images([item.id])
+    usages = await _current_usages([item.id])
+    data = _item_data(request, item, images[item.id], usages.get(item.id))
+    data['usage_history'] = await _usage_list(
+        request, ItemUsage.objects.filter(item=item).select_related('item').order_by('-start_time')[:10]
+    )
+    return json_response(data)
+
+
+@async_api_view
+async def current_usages(request):
+    """当前使用中的记录（异步）"""
+    queryset = ItemUsage.objects.filter(open_usage_filter()).select_related('item')
+    return json_response(await _usage_list(request, queryset))
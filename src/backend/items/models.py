@@ -1,8 +1,35 @@
 from django.db import models
+from django.db.models import F, Q, Value
+from django.db.models.lookups import Exact
 import os
 import uuid
 
 
+class BooleanLiteral(Value):
+    """
+    以 SQL 字面量而不是查询参数渲染的布尔值
+
+    部分索引的条件在建索引时按字面量写入（SQLite 中为 "is_returned" = 0），
+    查询条件写成参数 "is_returned" = ? 时 SQLite 无法确认它满足索引条件，不会使用部分索引。
+    PostgreSQL 使用 true/false，其他数据库的布尔列按整数存储，使用 1/0。
+    """
+
+    def as_sql(self, compiler, connection):
+        if connection.vendor == 'postgresql':
+            return ('true' if self.value else 'false'), []
+        return ('1' if self.value else '0'), []
+
+
+def open_usage_filter():
+    """
+    未归还条件，同时用作 usage_open_start_idx 部分索引的条件
+
+    Django 会把 is_returned=False 渲染成 NOT "is_returned"，SQLite/MySQL 都无法用它走索引，
+    这里显式写成与字面量的等值比较，使查询能命中以 is_returned 开头的复合索引和部分索引。
+    """
+    return Q(Exact(F('is_returned'), BooleanLiteral(False)))
+
+
 def get_item_image_path(instance, filename):
     """生成物品图片的存储路径"""
     # 如果物品还没有ID，先生成一个临时文件夹名
@@ -52,6 +79,10 @@ class Item(models.Model):
         verbose_name = '物品'
         verbose_name_plural = '物品'
         ordering = ['-created_at']
+        indexes = [
+            # available / in_use 列表：按状态过滤并按创建时间倒序
+            models.Index(fields=['status', '-created_at'], name='item_status_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.serial_number})"
@@ -85,6 +116,8 @@ class ItemUsage(models.Model):
     purpose = models.CharField(max_length=200, verbose_name='使用目的')
     notes = models.TextField(blank=True, verbose_name='使用备注')
     is_returned = models.BooleanField(default=False, verbose_name='是否已归还')
+    is_overdue = models.BooleanField(default=False, verbose_name='是否逾期')
+    overdue_notified_at = models.DateTimeField(null=True, blank=True, verbose_name='最近逾期提醒时间')
     condition_before = models.CharField(max_length=200, blank=True, verbose_name='使用前状况')
     condition_after = models.CharField(max_length=200, blank=True, verbose_name='使用后状况')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='记录创建时间')
@@ -93,10 +126,45 @@ class ItemUsage(models.Model):
         verbose_name = '使用记录'
         verbose_name_plural = '使用记录'
         ordering = ['-start_time']
+        indexes = [
+            # 逾期检测：未归还且预计归还时间早于当前时间
+            models.Index(fields=['is_returned', 'expected_return_time'], name='usage_open_due_idx'),
+            # 归还物品 / 当前使用者：按物品查找未归还记录
+            models.Index(fields=['item', 'is_returned'], name='usage_item_returned_idx'),
+            # 当前使用中的记录列表，只索引未归还记录（MySQL 不支持部分索引，会自动跳过）
+            models.Index(fields=['-start_time'], condition=open_usage_filter(), name='usage_open_start_idx'),
+        ]
 
     def __str__(self):
         return f"{self.item.name} - {self.user} ({self.start_time.strftime('%Y-%m-%d %H:%M')})"
 
+    @classmethod
+    def overdue_queryset(cls, now=None):
+        """未归还且已超过预计归还时间的使用记录（命中 usage_open_due_idx 索引）"""
+        from django.utils import timezone
+        now = now or timezone.now()
+        return cls.objects.filter(open_usage_filter(), expected_return_time__lt=now)
+
+    @classmethod
+    def check_and_mark_overdue(cls, now=None):
+        """标记所有逾期的使用记录，返回新标记数量和当前全部逾期记录"""
+        from django.utils import timezone
+        now = now or timezone.now()
+
+        overdue_usages = list(cls.overdue_queryset(now).select_related('item').order_by('expected_return_time'))
+        new_ids = [usage.id for usage in overdue_usages if not usage.is_overdue]
+        if new_ids:
+            cls.objects.filter(id__in=new_ids).update(is_overdue=True)
+            for usage in overdue_usages:
+                usage.is_overdue = True
+
+        # 预计归还时间被延后的记录取消逾期标记
+        cls.objects.filter(
+            open_usage_filter(), is_overdue=True, expected_return_time__gte=now
+        ).update(is_overdue=False)
+
+        return len(new_ids), overdue_usages
+
 
 class UsageImage(models.Model):
     """使用记录图片模型"""
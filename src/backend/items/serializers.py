@@ -1,7 +1,7 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
 
-from .models import Item, ItemUsage, Category, ItemImage, UsageImage
+from .models import Item, ItemUsage, Category, ItemImage, UsageImage, open_usage_filter
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -62,7 +62,7 @@ class ItemSerializer(serializers.ModelSerializer):
     def get_current_user(self, obj):
         """获取当前正在使用该物品的用户"""
         current_usage = ItemUsage.objects.filter(
-            item=obj, is_returned=False
+            open_usage_filter(), item=obj
         ).first()
         if current_usage:
             return {
@@ -82,6 +82,12 @@ class ItemSerializer(serializers.ModelSerializer):
 
 
 class ItemUsageSerializer(serializers.ModelSerializer):
+    """
+    使用记录序列化器
+
+    borrow_images / return_images 从 images 中按 image_type 筛选，
+    配合 prefetch_related('images') 每批使用记录只需一次图片查询
+    """
     item_name = serializers.CharField(source='item.name', read_only=True)
     item_serial = serializers.CharField(source='item.serial_number', read_only=True)
     images = UsageImageSerializer(many=True, read_only=True)
@@ -92,21 +98,24 @@ class ItemUsageSerializer(serializers.ModelSerializer):
         model = ItemUsage
         fields = [
             'id', 'item', 'item_name', 'item_serial', 'user', 'borrower_contact',
-            'start_time', 'end_time', 'purpose', 'notes', 'is_returned',
+            'start_time', 'end_time', 'purpose', 'notes', 'is_returned', 'is_overdue',
             'condition_before', 'condition_after', 'expected_return_time', 'created_at',
             'images', 'borrow_images', 'return_images'
         ]
-        read_only_fields = ['created_at']
+        read_only_fields = ['created_at', 'is_overdue']
+
+    def _images_of_type(self, obj, image_type):
+        # images.all() 使用预取结果，不产生额外查询
+        images = [image for image in obj.images.all() if image.image_type == image_type]
+        return UsageImageSerializer(images, many=True, context=self.context).data
 
     def get_borrow_images(self, obj):
-        """获取借用时图片"""
-        borrow_images = obj.images.filter(image_type='borrow')
-        return UsageImageSerializer(borrow_images, many=True, context=self.context).data
+        """借用时图片"""
+        return self._images_of_type(obj, 'borrow')
 
     def get_return_images(self, obj):
-        """获取归还时图片"""
-        return_images = obj.images.filter(image_type='return')
-        return UsageImageSerializer(return_images, many=True, context=self.context).data
+        """归还时图片"""
+        return self._images_of_type(obj, 'return')
 
 
 class ItemDetailSerializer(ItemSerializer):
@@ -118,5 +127,6 @@ class ItemDetailSerializer(ItemSerializer):
 
     def get_usage_history(self, obj):
         """获取物品的使用历史"""
-        usages = ItemUsage.objects.filter(item=obj).order_by('-start_time')[:10]
+        # 通过反向关联查询，使用记录的 item 直接指向 obj，不再逐条查询物品
+        usages = obj.itemusage_set.prefetch_related('images').order_by('-start_time')[:10]
         return ItemUsageSerializer(usages, many=True, context=self.context).data
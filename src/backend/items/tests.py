@@ -1 +1,166 @@
-# Create your tests here.
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import AsyncClient, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import Item, ItemImage, ItemUsage, UsageImage, open_usage_filter
+
+
+class OverdueUsageTestCase(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.item = Item.objects.create(name='投影仪', serial_number='SN-001', category='设备', status='in_use')
+        self.overdue = ItemUsage.objects.create(
+            item=self.item, user='张三', purpose='活动', start_time=now - timedelta(days=3),
+            expected_return_time=now - timedelta(days=1),
+        )
+        self.on_time = ItemUsage.objects.create(
+            item=self.item, user='李四', purpose='活动', start_time=now,
+            expected_return_time=now + timedelta(days=1),
+        )
+        ItemUsage.objects.create(
+            item=self.item, user='王五', purpose='活动', start_time=now - timedelta(days=5),
+            expected_return_time=now - timedelta(days=4), is_returned=True,
+        )
+
+    def test_check_and_mark_overdue(self):
+        """只标记未归还且超过预计归还时间的记录"""
+        new_count, overdue_usages = ItemUsage.check_and_mark_overdue()
+        self.assertEqual(new_count, 1)
+        self.assertEqual([usage.id for usage in overdue_usages], [self.overdue.id])
+        self.overdue.refresh_from_db()
+        self.assertTrue(self.overdue.is_overdue)
+
+        # 再次检测时不会重复计为新增
+        new_count, _ = ItemUsage.check_and_mark_overdue()
+        self.assertEqual(new_count, 0)
+
+    def test_overdue_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='admin', password='pass1234'))
+        response = client.get('/api/usages/overdue/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data], [self.overdue.id])
+
+
+class HotFilterIndexTestCase(TestCase):
+    """常用过滤条件应命中对应索引"""
+
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor not in ('sqlite', 'mysql'):
+            self.skipTest('仅在 SQLite / MySQL 上检查执行计划')
+        self.assertIn(index_name, queryset.explain())
+
+    def test_open_usage_by_item_uses_index(self):
+        queryset = ItemUsage.objects.filter(open_usage_filter(), item_id=1)
+        self.assertUsesIndex(queryset, 'usage_item_returned_idx')
+
+    def test_item_status_uses_index(self):
+        queryset = Item.objects.filter(status='available')
+        self.assertUsesIndex(queryset, 'item_status_created_idx')
+
+    def seed_and_analyze(self):
+        """生成少量数据并收集统计信息，使执行计划与实际数据库接近"""
+        now = timezone.now()
+        items = Item.objects.bulk_create([
+            Item(name=f'物品{i}', serial_number=f'SN-{i}', category='设备', status=('available', 'in_use')[i % 2])
+            for i in range(50)
+        ])
+        ItemUsage.objects.bulk_create([
+            ItemUsage(item=items[i % 50], user='张三', purpose='活动', start_time=now - timedelta(hours=i),
+                      is_returned=i % 10 != 0)
+            for i in range(200)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_open_usage_filter_matches_partial_index(self):
+        """open_usage_filter 渲染为与部分索引条件相同的字面量，当前使用记录列表按部分索引倒序扫描"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('仅 SQLite 支持部分索引')
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, ItemUsage._meta.db_table)
+        self.assertTrue(constraints['usage_open_start_idx']['index'])
+        queryset = ItemUsage.objects.filter(open_usage_filter()).order_by('-start_time')
+        sql, params = queryset.query.sql_with_params()
+        self.assertIn('"is_returned" = 0', sql)
+        self.assertEqual(params, ())
+
+        self.seed_and_analyze()
+        plan = queryset.select_related('item').explain()
+        self.assertIn('usage_open_start_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_item_status_list_sorted_by_index(self):
+        """按状态筛选并按创建时间倒序时直接按索引顺序读取，不需要额外排序"""
+        self.seed_and_analyze()
+        queryset = Item.objects.filter(status='available').order_by('-created_at')
+        self.assertUsesIndex(queryset, 'item_status_created_idx')
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('TEMP B-TREE', queryset.explain())
+
+
+class UsageImageQueryTestCase(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.item = Item.objects.create(name='投影仪', serial_number='SN-001', category='设备', status='in_use')
+        usages = [
+            ItemUsage.objects.create(item=self.item, user=f'用户{i}', purpose='活动', start_time=now - timedelta(days=i))
+            for i in range(3)
+        ]
+        UsageImage.objects.bulk_create([
+            UsageImage(usage=usage, image=f'usage_images/{usage.id}-{image_type}.jpg', image_type=image_type)
+            for usage in usages for image_type in ('borrow', 'return')
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pass1234'))
+
+    def test_usage_list_queries_do_not_grow_with_rows(self):
+        """使用记录和图片各一次查询，图片按类型在内存中拆分"""
+        # 按使用人查询时先在全文索引中查一次
+        for path, queries in [
+            ('/api/usages/', 2), ('/api/usages/current/', 2), ('/api/usages/by_user/?user_name=用户', 3),
+        ]:
+            with self.assertNumQueries(queries):
+                response = self.client.get(path)
+            self.assertEqual(len(response.data), 3)
+            row = response.data[0]
+            self.assertEqual(row['item_name'], '投影仪')
+            self.assertEqual([image['image_type'] for image in row['borrow_images']], ['borrow'])
+            self.assertEqual([image['image_type'] for image in row['return_images']], ['return'])
+
+    def test_item_detail_usage_history_prefetches_images(self):
+        # 物品、物品图片、当前使用者、主图、使用历史、使用记录图片
+        with self.assertNumQueries(6):
+            response = self.client.get(f'/api/items/{self.item.id}/')
+        self.assertEqual(len(response.data['usage_history']), 3)
+        self.assertEqual(len(response.data['usage_history'][0]['borrow_images']), 1)
+
+
+class AsyncItemViewTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='pass1234')
+        self.item = Item.objects.create(name='投影仪', serial_number='SN-001', category='设备', status='in_use')
+        ItemImage.objects.create(item=self.item, image='items/1/initial/a.jpg', is_primary=True)
+        ItemUsage.objects.create(item=self.item, user='张三', purpose='活动', start_time=timezone.now())
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def test_async_views_match_sync_views(self):
+        """异步接口与 DRF 接口输出一致"""
+        client = AsyncClient()
+        headers = {'Authorization': f'Bearer {self.token}'}
+        for sync_path, async_path in [
+            ('/api/items/', '/api/async/items/'),
+            (f'/api/items/{self.item.id}/', f'/api/async/items/{self.item.id}/'),
+            ('/api/usages/current/', '/api/async/usages/current/'),
+        ]:
+            sync_response = await client.get(sync_path, headers=headers)
+            async_response = await client.get(async_path, headers=headers)
+            self.assertEqual(async_response.status_code, 200)
+            self.assertEqual(async_response.json(), sync_response.json())
+
+        self.assertEqual((await client.get('/api/async/items/')).status_code, 401)
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'items', views.ItemViewSet)
@@ -12,5 +12,8 @@ router.register(r'item-images', views.ItemImageViewSet)
 router.register(r'usage-images', views.UsageImageViewSet)
 
 urlpatterns = [
+    path('api/async/items/', async_views.item_list, name='async_item_list'),
+    path('api/async/items/<int:pk>/', async_views.item_detail, name='async_item_detail'),
+    path('api/async/usages/current/', async_views.current_usages, name='async_current_usages'),
     path('api/', include(router.urls)),
 ]
@@ -1,21 +1,26 @@
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
-from .models import Item, ItemUsage, Category, ItemImage, UsageImage
+from item_manager.authentication import CachedJWTAuthentication
+from item_manager.caching import ConditionalListMixin
+from item_manager.metrics import SerializerMetricsMixin
+from search.filters import FullTextSearchMixin
+
+from .models import Item, ItemUsage, Category, ItemImage, UsageImage, open_usage_filter
 from .serializers import (
     ItemSerializer, ItemDetailSerializer, ItemUsageSerializer,
     CategorySerializer, UserSerializer, ItemImageSerializer, UsageImageSerializer
 )
 
 
-class ItemViewSet(viewsets.ModelViewSet):
+class ItemViewSet(SerializerMetricsMixin, viewsets.ModelViewSet):
     """物品管理API"""
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     queryset = Item.objects.all()
     serializer_class = ItemSerializer
@@ -122,11 +127,25 @@ class ItemViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # 预计归还时间（可选），用于逾期检测
+        expected_return_time = None
+        expected_return_value = request.data.get('expected_return_time')
+        if expected_return_value:
+            expected_return_time = parse_datetime(str(expected_return_value))
+            if expected_return_time is None:
+                return Response(
+                    {'error': '预计归还时间格式不正确'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(expected_return_time):
+                expected_return_time = timezone.make_aware(expected_return_time)
+
         # 创建使用记录
         usage = ItemUsage.objects.create(
             item=item,
             user=user_name,
             borrower_contact=user_contact,
+            expected_return_time=expected_return_time,
             start_time=timezone.now(),
             purpose=purpose,
             notes=notes,
@@ -157,7 +176,7 @@ class ItemViewSet(viewsets.ModelViewSet):
 
         # 查找当前的使用记录
         current_usage = ItemUsage.objects.filter(
-            item=item, is_returned=False
+            open_usage_filter(), item=item
         ).first()
 
         if not current_usage:
@@ -205,11 +224,12 @@ class ItemViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ItemUsageViewSet(viewsets.ModelViewSet):
+class ItemUsageViewSet(FullTextSearchMixin, SerializerMetricsMixin, viewsets.ModelViewSet):
     """使用记录管理API"""
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
-    queryset = ItemUsage.objects.all()
+    # 序列化需要物品名称/序列号和全部图片
+    queryset = ItemUsage.objects.select_related('item').prefetch_related('images')
     serializer_class = ItemUsageSerializer
 
     @action(detail=True, methods=['post'])
@@ -241,7 +261,16 @@ class ItemUsageViewSet(viewsets.ModelViewSet):
     @action(detail=False)
     def current(self, request):
         """获取当前使用中的记录"""
-        usages = self.queryset.filter(is_returned=False)
+        usages = self.queryset.filter(open_usage_filter())
+        serializer = self.get_serializer(usages, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False)
+    def overdue(self, request):
+        """获取逾期未归还的记录，按预计归还时间升序"""
+        usages = ItemUsage.overdue_queryset().select_related('item').prefetch_related(
+            'images'
+        ).order_by('expected_return_time')
         serializer = self.get_serializer(usages, many=True)
         return Response(serializer.data)
 
@@ -250,29 +279,30 @@ class ItemUsageViewSet(viewsets.ModelViewSet):
         """根据用户姓名获取使用记录"""
         user_name = request.query_params.get('user_name')
         if user_name:
-            usages = self.queryset.filter(user__icontains=user_name)
+            # 先用全文索引缩小范围，再在命中的记录中按使用人匹配，避免物品名称等其他字段命中
+            usages = self.queryset.filter(pk__in=self.search_ids(user_name, 'usage'), user__icontains=user_name)
             serializer = self.get_serializer(usages, many=True)
             return Response(serializer.data)
         return Response({'error': '请提供用户姓名'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """物品类别管理API"""
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     """用户管理API（只读）"""
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     queryset = User.objects.all()
     serializer_class = UserSerializer
 
 
 class ItemImageViewSet(viewsets.ModelViewSet):
     """物品图片管理API"""
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     queryset = ItemImage.objects.all()
     serializer_class = ItemImageSerializer
@@ -280,7 +310,7 @@ class ItemImageViewSet(viewsets.ModelViewSet):
 
 class UsageImageViewSet(viewsets.ModelViewSet):
     """使用记录图片管理API"""
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     queryset = UsageImage.objects.all()
     serializer_class = UsageImageSerializer
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Memo, MemoImage
+from .models import Memo, MemoImage, MemoRevision
 
 
 class MemoImageInline(admin.TabularInline):
@@ -26,3 +26,11 @@ class MemoImageAdmin(admin.ModelAdmin):
     list_display = ['memo', 'alt_text', 'uploaded_at']
     list_filter = ['uploaded_at']
     search_fields = ['memo__title', 'alt_text']
+
+
+@admin.register(MemoRevision)
+class MemoRevisionAdmin(admin.ModelAdmin):
+    list_display = ['memo', 'version', 'title', 'is_checkpoint', 'edited_by', 'created_at']
+    list_filter = ['is_checkpoint', 'created_at']
+    search_fields = ['memo__title', 'title']
+    readonly_fields = ['memo', 'version', 'title', 'is_checkpoint', 'content', 'delta', 'edited_by', 'created_at']
@@ -1,6 +1,19 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Length, Substr
 from django.contrib.auth.models import User
 
+# 列表中内容预览的长度
+PREVIEW_LENGTH = 100
+
+
+class MemoQuerySet(models.QuerySet):
+    def with_preview(self):
+        """列表用：不加载完整内容，在数据库中截取预览并计算长度"""
+        return self.defer('content').annotate(
+            preview_text=Substr('content', 1, PREVIEW_LENGTH),
+            content_length=Length('content'),
+        )
+
 
 class Memo(models.Model):
     title = models.CharField(max_length=200, verbose_name="标题")
@@ -10,6 +23,11 @@ class Memo(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
     is_active = models.BooleanField(default=True, verbose_name="是否启用")
 
+    objects = MemoQuerySet.as_manager()
+
+    # 保存时记录到修订历史的编辑者（非数据库字段），未设置时使用创建者
+    revision_editor = None
+
     class Meta:
         verbose_name = "备忘录"
         verbose_name_plural = "备忘录"
@@ -18,14 +36,47 @@ class Memo(models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """保存后记录修订版本（只存储与上一版本的差异），两者在同一事务中，记录版本失败时保存一并回滚"""
+        from .revisions import record_revision
+
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            record_revision(self, editor=self.revision_editor or self.created_by)
+
     @property
     def content_preview(self):
         """返回内容的缩略预览"""
-        if len(self.content) > 100:
-            return self.content[:100] + "..."
+        if len(self.content) > PREVIEW_LENGTH:
+            return self.content[:PREVIEW_LENGTH] + "..."
         return self.content
 
 
+class MemoRevision(models.Model):
+    """备忘录修订版本，检查点保存完整内容，其余版本只保存与上一版本的差异"""
+    memo = models.ForeignKey(Memo, on_delete=models.CASCADE, related_name='revisions', verbose_name="备忘录")
+    version = models.PositiveIntegerField(verbose_name="版本号")
+    title = models.CharField(max_length=200, verbose_name="标题")
+    is_checkpoint = models.BooleanField(default=False, verbose_name="是否检查点")
+    content = models.TextField(blank=True, verbose_name="完整内容")
+    delta = models.JSONField(null=True, blank=True, verbose_name="内容差异")
+    edited_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="编辑者"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="修订时间")
+
+    class Meta:
+        verbose_name = "备忘录修订"
+        verbose_name_plural = "备忘录修订"
+        ordering = ['-version']
+        constraints = [
+            models.UniqueConstraint(fields=['memo', 'version'], name='memo_revision_unique_version'),
+        ]
+
+    def __str__(self):
+        return f"{self.memo.title} - v{self.version}"
+
+
 class MemoImage(models.Model):
     memo = models.ForeignKey(Memo, on_delete=models.CASCADE, related_name='images', verbose_name="备忘录")
     image = models.ImageField(upload_to='memo_images/', verbose_name="图片")
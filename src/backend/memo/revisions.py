@@ -0,0 +1,141 @@
+"""
+备忘录修订历史
+
+每次保存只记录与上一版本的差异，差异为一组操作：
+    ["=", n]     保留基准内容的 n 个字符
+    ["-", n]     删除基准内容的 n 个字符
+    ["+", text]  插入 text
+每隔 MEMO_REVISION_CHECKPOINT_INTERVAL 个版本保存一次完整内容（检查点），
+还原任意版本时从最近的检查点开始依次应用差异，开销有上限。
+"""
+import difflib
+import json
+
+from django.conf import settings
+from django.db import transaction
+
+# 替换块过大时不再做字符级比较，避免 SequenceMatcher 的平方复杂度
+CHAR_DIFF_LIMIT = 4_000_000
+
+
+def _push(ops, op, value):
+    """追加操作，与上一个同类操作合并"""
+    if not value:
+        return
+    if ops and ops[-1][0] == op:
+        ops[-1][1] += value
+    else:
+        ops.append([op, value])
+
+
+def make_delta(old, new):
+    """计算 old -> new 的差异：先按行比较，变化的行内再按字符比较"""
+    ops = []
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        old_text = ''.join(old_lines[i1:i2])
+        new_text = ''.join(new_lines[j1:j2])
+        if tag == 'equal':
+            _push(ops, '=', len(old_text))
+        elif tag == 'replace' and len(old_text) * len(new_text) <= CHAR_DIFF_LIMIT:
+            char_matcher = difflib.SequenceMatcher(None, old_text, new_text, autojunk=False)
+            for char_tag, a1, a2, b1, b2 in char_matcher.get_opcodes():
+                if char_tag == 'equal':
+                    _push(ops, '=', a2 - a1)
+                else:
+                    _push(ops, '-', a2 - a1)
+                    _push(ops, '+', new_text[b1:b2])
+        else:
+            _push(ops, '-', len(old_text))
+            _push(ops, '+', new_text)
+    return ops
+
+
+def apply_delta(base, delta):
+    """把差异应用到基准内容上"""
+    parts = []
+    pos = 0
+    for op, value in delta:
+        if op == '=':
+            parts.append(base[pos:pos + value])
+            pos += value
+        elif op == '-':
+            pos += value
+        elif op == '+':
+            parts.append(value)
+        else:
+            raise ValueError(f'未知的差异操作：{op}')
+    if pos != len(base):
+        raise ValueError('修订差异与基准内容不匹配')
+    return ''.join(parts)
+
+
+def delta_size(delta):
+    """差异序列化后的长度，用于判断是否值得存差异"""
+    return len(json.dumps(delta, ensure_ascii=False))
+
+
+def _revision_chain(memo, version):
+    """返回 version 之前最近的检查点及其后直到 version 的所有修订"""
+    from .models import MemoRevision
+
+    checkpoint = MemoRevision.objects.filter(
+        memo=memo, version__lte=version, is_checkpoint=True
+    ).order_by('-version').first()
+    if checkpoint is None:
+        raise MemoRevision.DoesNotExist(f'备忘录 {memo.pk} 没有版本 {version} 之前的检查点')
+    deltas = list(MemoRevision.objects.filter(
+        memo=memo, version__gt=checkpoint.version, version__lte=version
+    ).order_by('version'))
+    return checkpoint, deltas
+
+
+def reconstruct(memo, version):
+    """还原指定版本的内容"""
+    checkpoint, deltas = _revision_chain(memo, version)
+    last = deltas[-1] if deltas else checkpoint
+    if last.version != version:
+        raise last.DoesNotExist(f'备忘录 {memo.pk} 没有版本 {version}')
+    content = checkpoint.content
+    for revision in deltas:
+        content = apply_delta(content, revision.delta)
+    return content
+
+
+def record_revision(memo, editor=None):
+    """内容或标题有变化时为备忘录新增一个修订版本，返回新版本（无变化时返回 None）"""
+    from .models import Memo, MemoRevision
+
+    with transaction.atomic():
+        # 锁住备忘录行，避免并发保存生成重复的版本号
+        Memo.objects.select_for_update().filter(pk=memo.pk).first()
+        latest = MemoRevision.objects.filter(memo=memo).order_by('-version').first()
+
+        if latest is None:
+            return MemoRevision.objects.create(
+                memo=memo, version=1, title=memo.title, is_checkpoint=True,
+                content=memo.content, edited_by=editor,
+            )
+
+        checkpoint, deltas = _revision_chain(memo, latest.version)
+        previous = checkpoint.content
+        for revision in deltas:
+            previous = apply_delta(previous, revision.delta)
+        if previous == memo.content and latest.title == memo.title:
+            return None
+
+        delta = make_delta(previous, memo.content)
+        interval = getattr(settings, 'MEMO_REVISION_CHECKPOINT_INTERVAL', 20)
+        # 距上一个检查点足够远，或差异本身不比全文小时，直接保存完整内容
+        is_checkpoint = len(deltas) + 1 >= interval or delta_size(delta) >= len(memo.content)
+        return MemoRevision.objects.create(
+            memo=memo,
+            version=latest.version + 1,
+            title=memo.title,
+            is_checkpoint=is_checkpoint,
+            content=memo.content if is_checkpoint else '',
+            delta=None if is_checkpoint else delta,
+            edited_by=editor,
+        )
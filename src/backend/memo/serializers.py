@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Memo, MemoImage
+from .models import PREVIEW_LENGTH, Memo, MemoImage, MemoRevision
+from .revisions import delta_size
 
 
 class MemoImageSerializer(serializers.ModelSerializer):
@@ -25,9 +26,35 @@ class MemoSerializer(serializers.ModelSerializer):
 
 
 class MemoListSerializer(serializers.ModelSerializer):
-    content_preview = serializers.ReadOnlyField()
+    content_preview = serializers.SerializerMethodField()
+    highlight = serializers.SerializerMethodField()
     created_by_name = serializers.CharField(source='created_by.username', read_only=True)
 
     class Meta:
         model = Memo
-        fields = ['id', 'title', 'content_preview', 'created_by_name', 'updated_at']
\ No newline at end of file
+        fields = ['id', 'title', 'content_preview', 'highlight', 'created_by_name', 'updated_at']
+
+    def get_content_preview(self, obj):
+        """优先使用查询集中截取的预览，避免加载完整内容"""
+        if not hasattr(obj, 'preview_text'):
+            return obj.content_preview
+        if obj.content_length > PREVIEW_LENGTH:
+            return obj.preview_text + "..."
+        return obj.preview_text
+
+    def get_highlight(self, obj):
+        """搜索时返回命中片段（HTML，命中词以 <mark> 标记），否则为空"""
+        return self.context.get('search_highlights', {}).get(obj.id, '')
+
+
+class MemoRevisionSerializer(serializers.ModelSerializer):
+    edited_by_name = serializers.CharField(source='edited_by.username', read_only=True, default='')
+    change_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = MemoRevision
+        fields = ['id', 'version', 'title', 'is_checkpoint', 'change_size', 'edited_by_name', 'created_at']
+
+    def get_change_size(self, obj):
+        """该版本占用的存储大小（字符数）"""
+        return len(obj.content) if obj.is_checkpoint else delta_size(obj.delta)
@@ -1,3 +1,104 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .models import Memo
+from .revisions import reconstruct
+from .views import MemoViewSet
+
+
+class MemoListTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='pass1234')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.long_memo = Memo.objects.create(title='长备忘录', content='内容' * 200, created_by=self.user)
+        Memo.objects.create(title='短备忘录', content='简短内容', created_by=self.user)
+
+    def test_list_does_not_load_content(self):
+        """列表只查询一次，内容预览在数据库中截取"""
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/memos/')
+        self.assertEqual(response.status_code, 200)
+        previews = {memo['title']: memo['content_preview'] for memo in response.data}
+        self.assertEqual(previews['长备忘录'], self.long_memo.content_preview)
+        self.assertEqual(previews['短备忘录'], '简短内容')
+
+        memo = Memo.objects.with_preview().get(pk=self.long_memo.pk)
+        self.assertIn('content', memo.get_deferred_fields())
+
+    def test_search_orders_by_relevance_with_highlight(self):
+        """搜索走全文索引，标题命中优先，并返回高亮片段"""
+        body_hit = Memo.objects.create(title='周会', content='下周讨论招新安排', created_by=self.user)
+        title_hit = Memo.objects.create(title='招新计划', content='准备宣传材料', created_by=self.user)
+
+        response = self.client.get('/api/memos/', {'search': '招新'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([memo['id'] for memo in response.data], [title_hit.id, body_hit.id])
+        self.assertEqual(response.data[1]['highlight'], '下周讨论<mark>招新</mark>安排')
+        self.assertEqual(response['X-Search-Truncated'], 'false')
+
+    def test_search_reports_truncation(self):
+        """命中数超过上限时只返回前 search_limit 条，并在响应头中说明"""
+        for i in range(3):
+            Memo.objects.create(title=f'招新计划{i}', content='准备宣传材料', created_by=self.user)
+        with mock.patch.object(MemoViewSet, 'search_limit', 2):
+            response = self.client.get('/api/memos/', {'search': '招新'})
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual((response['X-Search-Limit'], response['X-Search-Truncated']), ('2', 'true'))
+        self.assertNotIn('X-Search-Truncated', self.client.get('/api/memos/'))
+
+
+class MemoRevisionTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='pass1234')
+        self.lines = [f'第{i}行：会议记录内容\n' for i in range(50)]
+        self.memo = Memo.objects.create(title='会议记录', content=''.join(self.lines), created_by=self.user)
+
+    def edit(self, index, text):
+        self.lines[index] = text
+        self.memo.content = ''.join(self.lines)
+        self.memo.save()
+        return self.memo.content
+
+    @override_settings(MEMO_REVISION_CHECKPOINT_INTERVAL=3)
+    def test_deltas_reconstruct_every_version(self):
+        """差异只记录修改部分，每隔固定版本保存检查点，任意版本都能还原"""
+        versions = {1: self.memo.content}
+        for version in range(2, 7):
+            versions[version] = self.edit(version, f'第{version}行：已修改\n')
+
+        revisions = {rev.version: rev for rev in self.memo.revisions.all()}
+        self.assertEqual([v for v, rev in sorted(revisions.items()) if rev.is_checkpoint], [1, 4])
+        self.assertLess(len(str(revisions[2].delta)), 50)
+        for version, content in versions.items():
+            self.assertEqual(reconstruct(self.memo, version), content)
+
+    def test_unchanged_save_creates_no_revision(self):
+        self.memo.save()
+        self.assertEqual(self.memo.revisions.count(), 1)
+
+    def test_failed_revision_rolls_back_save(self):
+        """记录版本失败时，备忘录的修改一并回滚"""
+        original = self.memo.content
+        with mock.patch('memo.revisions.make_delta', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                self.edit(0, '新的第一行\n')
+        self.memo.refresh_from_db()
+        self.assertEqual(self.memo.content, original)
+        self.assertEqual(self.memo.revisions.count(), 1)
+
+    def test_revision_endpoints(self):
+        original = self.memo.content
+        self.edit(0, '新的第一行\n')
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(f'/api/memos/{self.memo.id}/revisions/')
+        self.assertEqual([rev['version'] for rev in response.data], [2, 1])
+
+        response = client.get(f'/api/memos/{self.memo.id}/revisions/1/')
+        self.assertEqual(response.data['content'], original)
+        self.assertEqual(client.get(f'/api/memos/{self.memo.id}/revisions/9/').status_code, 404)
@@ -3,18 +3,23 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
-from .models import Memo, MemoImage
-from .serializers import MemoSerializer, MemoListSerializer, MemoImageSerializer
+from django.db.models import Case, IntegerField, Value, When
+from item_manager.metrics import SerializerMetricsMixin
+from search.filters import FullTextSearchMixin
+from search.services import search as search_documents
+from .models import Memo, MemoImage, MemoRevision
+from .revisions import reconstruct
+from .serializers import MemoSerializer, MemoListSerializer, MemoImageSerializer, MemoRevisionSerializer
 
 
-class MemoViewSet(viewsets.ModelViewSet):
+class MemoViewSet(FullTextSearchMixin, SerializerMetricsMixin, viewsets.ModelViewSet):
     queryset = Memo.objects.filter(is_active=True)
     serializer_class = MemoSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'content']
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     ordering_fields = ['created_at', 'updated_at']
     ordering = ['-updated_at']
+    # 搜索最多返回的备忘录数量，超出时响应头 X-Search-Truncated 为 true
+    search_limit = 200
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -22,14 +27,67 @@ class MemoViewSet(viewsets.ModelViewSet):
         return MemoSerializer
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | Q(content__icontains=search)
+        queryset = super().get_queryset().select_related('created_by')
+        if self.action == 'list':
+            # 列表不返回完整内容和图片
+            queryset = queryset.with_preview()
+        elif self.action == 'retrieve':
+            queryset = queryset.prefetch_related('images')
+
+        search = self.request.query_params.get('search', '').strip()
+        if search and self.action == 'list':
+            # 走全文索引，按相关度排序，并记录命中片段供序列化器输出
+            # 多取一条，用于判断结果是否被截断
+            hits = search_documents(search, doc_types=['memo'], limit=self.search_limit + 1)
+            self.search_truncated = len(hits) > self.search_limit
+            hits = hits[:self.search_limit]
+            self.search_highlights = {hit['id']: hit['highlight'] for hit in hits}
+            queryset = queryset.filter(pk__in=self.search_highlights).annotate(
+                search_rank=Case(
+                    *[When(pk=hit['id'], then=Value(rank)) for rank, hit in enumerate(hits)],
+                    output_field=IntegerField(),
+                )
             )
         return queryset
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # 搜索时未指定排序则按相关度排序
+        if hasattr(self, 'search_highlights') and 'ordering' not in self.request.query_params:
+            queryset = queryset.order_by('search_rank')
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['search_highlights'] = getattr(self, 'search_highlights', {})
+        return context
+
+    def perform_update(self, serializer):
+        serializer.instance.revision_editor = self.request.user
+        serializer.save()
+
+    @action(detail=True, methods=['get'])
+    def revisions(self, request, pk=None):
+        """获取修订历史列表（不含内容）"""
+        memo = self.get_object()
+        revisions = memo.revisions.select_related('edited_by')
+        serializer = MemoRevisionSerializer(revisions, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path=r'revisions/(?P<version>\d+)')
+    def revision(self, request, pk=None, version=None):
+        """还原指定版本的标题和内容"""
+        memo = self.get_object()
+        try:
+            revision = memo.revisions.select_related('edited_by').get(version=version)
+            content = reconstruct(memo, revision.version)
+        except MemoRevision.DoesNotExist:
+            return Response({'error': '版本不存在'}, status=status.HTTP_404_NOT_FOUND)
+
+        data = MemoRevisionSerializer(revision).data
+        data['content'] = content
+        return Response(data)
+
     @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
     def upload_image(self, request, pk=None):
         memo = self.get_object()
@@ -5,3 +5,7 @@ class PersonnelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'personnel'
     verbose_name = '人员管理'
+
+    def ready(self):
+        from item_manager.caching import register_versioned_models
+        register_versioned_models('personnel.Personnel', 'personnel.ProjectGroup')
@@ -0,0 +1,46 @@
+from item_manager.async_views import async_api_view, format_date, format_datetime, int_param, json_response
+
+from .models import Personnel
+
+
+def _personnel_data(person):
+    """与 PersonnelReadSerializer 输出一致"""
+    data = {
+        'id': person.id,
+        'name': person.name,
+        'student_id': person.student_id,
+        'gender': person.gender,
+        'gender_display': person.get_gender_display(),
+        'grade_major': person.grade_major,
+        'department': person.department_id,
+        'department_name': person.department.name,
+        'project_group': person.project_group_id,
+        'position': person.position,
+        'position_display': person.position,
+        'start_date': format_date(person.start_date),
+        'end_date': format_date(person.end_date),
+        'is_active': person.is_active,
+        'status_display': person.status_display,
+        'phone': person.phone,
+        'qq': person.qq,
+        'email': person.email,
+        'description': person.description,
+        'created_at': format_datetime(person.created_at),
+        'updated_at': format_datetime(person.updated_at),
+    }
+    # 与 DRF 一致：没有项目组时不输出 project_group_name
+    if person.project_group:
+        data = {**data, 'project_group_name': person.project_group.name}
+    return data
+
+
+@async_api_view
+async def personnel_list(request):
+    """人员列表（异步），支持 ?department= 和 ?is_active=true/false 过滤"""
+    department_id = int_param(request, 'department')
+    queryset = Personnel.objects.select_related('department', 'project_group')
+    if department_id is not None:
+        queryset = queryset.filter(department_id=department_id)
+    if request.GET.get('is_active') in ('true', 'false'):
+        queryset = queryset.filter(is_active=request.GET['is_active'] == 'true')
+    return json_response([_personnel_data(person) async for person in queryset.aiterator()])
@@ -0,0 +1,42 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import AsyncClient, TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from finance.models import Department
+
+from .models import Personnel, ProjectGroup
+
+
+class AsyncPersonnelViewTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='pass1234')
+        self.department = Department.objects.create(name='程序部')
+        other = Department.objects.create(name='Web部')
+        group = ProjectGroup.objects.create(name='官网组')
+        for name, department, project_group, end_date in [
+            ('张三', self.department, group, None),
+            ('李四', self.department, None, date(2025, 6, 30)),
+            ('王五', other, None, None),
+        ]:
+            Personnel.objects.create(
+                name=name, student_id='20240001', gender='male', grade_major='2024级 计算机',
+                department=department, project_group=project_group, position='成员',
+                start_date=date(2024, 9, 1), end_date=end_date, phone='13800000000', qq='10001',
+                email='a@example.com',
+            )
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    async def test_async_list_matches_sync_list(self):
+        """异步人员列表与 DRF 接口输出一致"""
+        client = AsyncClient()
+        for query in ['', f'?department={self.department.id}']:
+            sync_response = await client.get(f'/api/personnel/{query}', headers=self.headers)
+            async_response = await client.get(f'/api/async/personnel/{query}', headers=self.headers)
+            self.assertEqual(async_response.status_code, 200)
+            self.assertEqual(async_response.json(), sync_response.json())
+
+    async def test_invalid_department_rejected(self):
+        response = await AsyncClient().get('/api/async/personnel/?department=abc', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import PersonnelViewSet, ProjectGroupViewSet
 
 router = DefaultRouter()
@@ -8,5 +9,6 @@ router.register(r'personnel', PersonnelViewSet)
 router.register(r'project-groups', ProjectGroupViewSet)
 
 urlpatterns = [
+    path('api/async/personnel/', async_views.personnel_list, name='async_personnel_list'),
     path('api/', include(router.urls)),
 ]
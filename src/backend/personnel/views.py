@@ -6,7 +6,12 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from item_manager.authentication import CachedJWTAuthentication
+from item_manager.caching import ConditionalListMixin
+from item_manager.metrics import SerializerMetricsMixin
+from item_manager.middleware import get_request_context
+from search.filters import FullTextSearchFilter, FullTextSearchMixin
 
 from .filters import PersonnelFilter
 from .models import Personnel, ProjectGroup
@@ -19,13 +24,14 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
-class PersonnelViewSet(viewsets.ModelViewSet):
+class PersonnelViewSet(FullTextSearchMixin, SerializerMetricsMixin, viewsets.ModelViewSet):
     """人员信息视图集"""
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     queryset = Personnel.objects.all()
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, OrderingFilter]
     filterset_class = PersonnelFilter
-    search_fields = ['name', 'student_id', 'phone', 'email', 'grade_major']
+    # 姓名、学号、电话、邮箱、专业等字段在全文索引中搜索
+    search_doc_type = 'personnel'
     ordering_fields = ['created_at', 'start_date', 'end_date', 'name']
     ordering = ['-is_active', 'department', 'position', 'name']
 
@@ -133,7 +139,7 @@ class PersonnelViewSet(viewsets.ModelViewSet):
         }
 
         # 获取用户信息
-        user_info = self._get_user_info(request)
+        user_info = get_request_context(request).actor
 
         # 执行删除操作
         response = super().destroy(request, *args, **kwargs)
@@ -153,25 +159,6 @@ class PersonnelViewSet(viewsets.ModelViewSet):
 
         return response
 
-    def _get_user_info(self, request):
-        """获取用户信息"""
-        try:
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                return f"{request.user.username} ({request.user.email})"
-            else:
-                return f"匿名用户 (IP: {self._get_client_ip(request)})"
-        except:
-            return "未知用户"
-
-    def _get_client_ip(self, request):
-        """获取客户端IP"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-
     @action(detail=False, methods=['post'])
     def check_expired(self, request):
         """检查并更新已到期的人员状态"""
@@ -191,15 +178,17 @@ class PersonnelViewSet(viewsets.ModelViewSet):
             })
 
 
-class ProjectGroupViewSet(viewsets.ModelViewSet):
+class ProjectGroupViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """项目组视图集"""
-    authentication_classes = [JWTAuthentication]
-    queryset = ProjectGroup.objects.all()
+    authentication_classes = [CachedJWTAuthentication]
+    queryset = ProjectGroup.objects.prefetch_related('departments')
     serializer_class = ProjectGroupSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter]
     filterset_fields = ['departments']
     search_fields = ['name', 'description']
     ordering = ['name']
+    # 序列化结果包含部门名称
+    list_cache_dependencies = ['finance.Department']
 
     @action(detail=False, methods=['get'])
     def by_department(self, request):
@@ -229,7 +218,7 @@ class ProjectGroupViewSet(viewsets.ModelViewSet):
         }
 
         # 获取用户信息
-        user_info = self._get_user_info(request)
+        user_info = get_request_context(request).actor
 
         # 执行删除操作
         response = super().destroy(request, *args, **kwargs)
@@ -249,21 +238,3 @@ class ProjectGroupViewSet(viewsets.ModelViewSet):
 
         return response
 
-    def _get_user_info(self, request):
-        """获取用户信息"""
-        try:
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                return f"{request.user.username} ({request.user.email})"
-            else:
-                return f"匿名用户 (IP: {self._get_client_ip(request)})"
-        except:
-            return "未知用户"
-
-    def _get_client_ip(self, request):
-        """获取客户端IP"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
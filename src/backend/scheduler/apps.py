@@ -6,8 +6,13 @@ class SchedulerConfig(AppConfig):
     name = 'scheduler'
 
     def ready(self):
-        # 只有在runserver命令时才启动调度器，避免在migrate等命令时启动 :(
+        # 开发环境下 runserver 时顺带启动调度器，生产环境使用 manage.py run_scheduler 独立进程
+        # 两种方式都需要先获取数据库租约，因此不会同时运行多个调度器
         import sys
         if 'runserver' in sys.argv:
             from . import jobs
-            jobs.start_scheduler()
+            try:
+                jobs.start_scheduler()
+            except Exception as e:
+                # 首次启动尚未迁移时锁表不存在
+                jobs.logger.error(f"启动定时任务调度器失败：{e}")
@@ -0,0 +1,178 @@
+"""
+后台分批删除
+
+一次性删除大量记录（或删除部门时级联删除人员和考评记录）会在一个大事务中长时间持有 SQLite 写锁。
+这里把删除拆成 DeletionJob：每一步是一个模型上的过滤条件，按主键升序每次删除一个主键范围内的
+DELETION_CHUNK_SIZE 条记录，每批单独提交并记录进度，批次之间让出写锁。
+提交任务时每一步记录当时的最大主键，执行时只删除不超过它的记录，提交之后新建的符合条件的记录不会被误删。
+
+任务提交后在请求进程的后台线程中执行；进程退出导致中断的任务由调度器的 resume_deletion_jobs 接管，
+从记录的 last_pk 继续删除。执行前通过带条件的 UPDATE 抢占任务，同一任务不会被两个进程同时执行。
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, models, transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import DeletionJob
+
+logger = logging.getLogger(__name__)
+
+
+def _identity():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _step_queryset(step):
+    model = apps.get_model(step['model'])
+    return model._base_manager.filter(**step['filters'])
+
+
+def cascade_steps(instance):
+    """
+    删除 instance 的步骤：先分批删除通过 CASCADE 外键指向它的记录，最后删除它本身
+
+    被其他步骤的模型引用的模型排在后面，例如先删考评记录再删人员，避免删除人员时再逐条置空考评记录的关联。
+    更深层的级联在每一批删除时由 Django 处理。
+    """
+    relations = [
+        relation for relation in instance._meta.related_objects
+        if (relation.one_to_many or relation.one_to_one) and relation.on_delete is models.CASCADE
+    ]
+    related_models = [relation.related_model for relation in relations]
+
+    def referenced(model):
+        return any(
+            field.is_relation and field.related_model is model
+            for other in related_models if other is not model
+            for field in other._meta.concrete_fields
+        )
+
+    relations.sort(key=lambda relation: referenced(relation.related_model))
+    steps = [
+        {'model': relation.related_model._meta.label, 'filters': {relation.field.attname: instance.pk}}
+        for relation in relations
+    ]
+    steps.append({'model': instance._meta.label, 'filters': {'pk': instance.pk}})
+    return steps
+
+
+def _bound_steps(steps):
+    """给每一步的过滤条件加上当前的最大主键，跳过没有记录的步骤，返回 (步骤, 记录总数)"""
+    bounded, total = [], 0
+    for step in steps:
+        stats = _step_queryset(step).aggregate(count=Count('pk'), max_pk=Max('pk'))
+        if stats['count']:
+            bounded.append({**step, 'filters': {**step['filters'], 'pk__lte': stats['max_pk']}})
+            total += stats['count']
+    return bounded, total
+
+
+def enqueue_deletion(steps, description, created_by=''):
+    """创建删除任务，在当前事务提交后开始执行，返回任务"""
+    steps, total = _bound_steps(steps)
+    return _create_job(steps, description, created_by, total)
+
+
+def _create_job(steps, description, created_by, total):
+    job = DeletionJob.objects.create(
+        description=description, steps=steps, total=total, created_by=created_by
+    )
+    if settings.DELETION_JOB_IN_THREAD:
+        transaction.on_commit(lambda: threading.Thread(
+            target=_run_in_thread, args=(job.id,), daemon=True
+        ).start())
+    return job
+
+
+def delete_or_enqueue(steps, description, created_by=''):
+    """不超过一批时在当前请求中直接删除，返回 (None, 数量)；否则提交后台任务，返回 (任务, 数量)"""
+    steps, total = _bound_steps(steps)
+    if total > settings.DELETION_CHUNK_SIZE:
+        return _create_job(steps, description, created_by, total), total
+    with transaction.atomic():
+        for step in steps:
+            _step_queryset(step).delete()
+    return None, total
+
+
+def _run_in_thread(job_id):
+    try:
+        run_deletion_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def _claim(job_id, owner):
+    """抢占等待中或已中断的任务，成功返回 True"""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.DELETION_JOB_STALE_SECONDS)
+    return DeletionJob.objects.filter(id=job_id).filter(
+        Q(status='pending') | Q(status='running', heartbeat_at__lt=stale)
+    ).update(status='running', owner=owner, heartbeat_at=now) == 1
+
+
+def _save_progress(job, owner, **extra):
+    """记录进度，任务已被其他进程接管时返回 False"""
+    return DeletionJob.objects.filter(id=job.id, owner=owner).update(
+        step=job.step, last_pk=job.last_pk, deleted=job.deleted, heartbeat_at=timezone.now(), **extra
+    ) == 1
+
+
+def run_deletion_job(job_id):
+    """执行删除任务直到完成，返回是否完成；任务不可抢占或执行中被接管时返回 False"""
+    owner = _identity()
+    if not _claim(job_id, owner):
+        return False
+    job = DeletionJob.objects.get(id=job_id)
+    if job.started_at is None:
+        DeletionJob.objects.filter(id=job_id).update(started_at=timezone.now())
+
+    chunk_size = settings.DELETION_CHUNK_SIZE
+    try:
+        while job.step < len(job.steps):
+            step = job.steps[job.step]
+            queryset = _step_queryset(step)
+            pks = list(
+                queryset.filter(pk__gt=job.last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+            )
+            if pks:
+                # 按主键范围删除，每批一个短事务；级联和删除信号由 Django 按批处理
+                with transaction.atomic():
+                    _, per_model = queryset.filter(pk__gte=pks[0], pk__lte=pks[-1]).delete()
+                job.deleted += per_model.get(step['model'], 0)
+                job.last_pk = pks[-1]
+            if len(pks) < chunk_size:
+                job.step += 1
+                job.last_pk = 0
+            if not _save_progress(job, owner):
+                logger.warning(f"删除任务 {job.id} 已被其他进程接管，停止执行")
+                return False
+            if pks:
+                time.sleep(settings.DELETION_CHUNK_PAUSE)
+    except Exception as e:
+        logger.error(f"删除任务 {job.id}（{job.description}）执行失败：{e}")
+        _save_progress(job, owner, status='failed', error=str(e), finished_at=timezone.now())
+        return False
+
+    _save_progress(job, owner, status='done', finished_at=timezone.now())
+    logger.info(f"删除任务 {job.id}（{job.description}）完成，共删除 {job.deleted} 条记录")
+    return True
+
+
+def resume_stale_jobs():
+    """执行等待中的任务，并继续长时间没有进度的中断任务，返回完成的任务数"""
+    stale = timezone.now() - timedelta(seconds=settings.DELETION_JOB_STALE_SECONDS)
+    job_ids = DeletionJob.objects.filter(
+        Q(status='pending') | Q(status='running', heartbeat_at__lt=stale)
+    ).order_by('created_at').values_list('id', flat=True)
+    return sum(run_deletion_job(job_id) for job_id in list(job_ids))
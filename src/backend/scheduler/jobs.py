@@ -1,13 +1,68 @@
+import functools
 import logging
+import threading
+import time
+from datetime import timedelta
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
 from django_apscheduler import util
 from django_apscheduler.jobstores import DjangoJobStore
 from django_apscheduler.models import DjangoJobExecution
+from email_notice.services import EmailNotificationService
+from items.models import ItemUsage
 from personnel.models import Personnel
 
+from .deletion import resume_stale_jobs
+from .leader import LeaderLock
+
 logger = logging.getLogger(__name__)
 
+# 任务执行耗时统计（进程内），键为任务函数名
+JOB_METRICS = {}
+_metrics_lock = threading.Lock()
+
+
+def timed_job(func):
+    """记录任务执行次数、失败次数与耗时"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        failed = False
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            with _metrics_lock:
+                stats = JOB_METRICS.setdefault(func.__name__, {
+                    'runs': 0, 'failures': 0, 'total_seconds': 0.0,
+                    'last_seconds': 0.0, 'max_seconds': 0.0,
+                })
+                stats['runs'] += 1
+                stats['failures'] += int(failed)
+                stats['total_seconds'] += duration
+                stats['last_seconds'] = duration
+                stats['max_seconds'] = max(stats['max_seconds'], duration)
+            logger.info(f"任务 {func.__name__} 执行{'失败' if failed else '完成'}，耗时 {duration:.3f} 秒")
+    return wrapper
+
+
+def job_metrics_snapshot():
+    """返回任务耗时统计的副本，附带平均耗时"""
+    with _metrics_lock:
+        snapshot = {name: dict(stats) for name, stats in JOB_METRICS.items()}
+    for stats in snapshot.values():
+        stats['avg_seconds'] = stats['total_seconds'] / stats['runs'] if stats['runs'] else 0.0
+    return snapshot
+
+
+@timed_job
+@util.close_old_connections
 def check_expired_personnel():
     """检查并更新已到期的人员状态"""
     try:
@@ -21,15 +76,88 @@ def check_expired_personnel():
 
     except Exception as e:
         logger.error(f"定时任务执行失败：{str(e)}")
+        # 继续抛出，由 timed_job 记录失败次数
+        raise
+
+@timed_job
+@util.close_old_connections
+def check_overdue_usages():
+    """
+    检查逾期未归还的物品，标记逾期并发送汇总提醒邮件
 
+    同一条记录在 OVERDUE_REMINDER_INTERVAL_HOURS 内只提醒一次；邮件确认发送后才记录提醒时间，发送失败的记录下次执行时重试。
+    """
+    try:
+        now = timezone.now()
+        new_count, overdue_usages = ItemUsage.check_and_mark_overdue(now)
+
+        if not overdue_usages:
+            logger.info("定时任务执行成功：没有逾期未归还的物品")
+            return
+
+        logger.info(f"定时任务执行成功：共 {len(overdue_usages)} 条逾期记录，其中新增 {new_count} 条")
+        remind_before = now - timedelta(hours=getattr(settings, 'OVERDUE_REMINDER_INTERVAL_HOURS', 20))
+        pending = [
+            usage for usage in overdue_usages
+            if usage.overdue_notified_at is None or usage.overdue_notified_at <= remind_before
+        ]
+        if not pending:
+            logger.info("逾期记录近期都已提醒过，本次不发送邮件")
+            return
+
+        delivered = EmailNotificationService.send_overdue_digest_notification(
+            pending,
+            new_overdue_count=new_count,
+            batch_size=getattr(settings, 'OVERDUE_DIGEST_BATCH_SIZE', 50),
+        )
+        if len(delivered) < len(pending):
+            logger.warning(f"{len(pending) - len(delivered)} 条逾期记录的提醒邮件未发送成功，下次执行时重试")
+        ItemUsage.objects.filter(id__in=[usage.id for usage in delivered]).update(overdue_notified_at=now)
+
+    except Exception as e:
+        logger.error(f"逾期检测任务执行失败：{str(e)}")
+        raise
+
+@timed_job
+@util.close_old_connections
+def resume_deletion_jobs():
+    """执行未开始的后台删除任务，接管进程退出后中断的任务"""
+    try:
+        finished = resume_stale_jobs()
+        if finished:
+            logger.info(f"定时任务执行成功：完成 {finished} 个后台删除任务")
+    except Exception as e:
+        logger.error(f"后台删除任务执行失败：{str(e)}")
+        raise
+
+@timed_job
 @util.close_old_connections
 def delete_old_job_executions(max_age=604_800):
     """删除旧的任务执行记录（默认保留7天）"""
     DjangoJobExecution.objects.delete_old_job_executions(max_age)
 
-def start_scheduler():
-    """启动定时任务调度器"""
-    scheduler = BackgroundScheduler()
+
+def keep_leadership(scheduler, lock, stop_event):
+    """定期续约主节点租约，失去租约时立即停止本调度器，交由其他进程接管"""
+    interval = max(lock.ttl // 3, 1)
+    while scheduler.running and not stop_event.wait(interval):
+        close_old_connections()
+        try:
+            renewed = lock.renew()
+        except Exception as e:
+            logger.error(f"调度器租约续约失败：{e}")
+            renewed = False
+
+        if not renewed:
+            logger.warning("调度器已失去主节点租约，正在停止...")
+            scheduler.shutdown(wait=False)
+            return False
+    return True
+
+
+def create_scheduler(scheduler_class=BackgroundScheduler):
+    """创建调度器并注册所有定时任务"""
+    scheduler = scheduler_class(timezone=settings.TIME_ZONE)
     scheduler.add_jobstore(DjangoJobStore(), "default")
 
     # 添加人员到期检测任务 - 每天早上8点执行
@@ -44,6 +172,29 @@ def start_scheduler():
     )
     logger.info("已添加人员到期检测定时任务：每天早上8:00执行")
 
+    # 添加物品逾期检测任务 - 每天早上9点执行
+    scheduler.add_job(
+        check_overdue_usages,
+        trigger="cron",
+        hour=9,
+        minute=0,
+        id="check_overdue_usages",
+        max_instances=1,
+        replace_existing=True,
+    )
+    logger.info("已添加物品逾期检测定时任务：每天早上9:00执行")
+
+    # 添加后台删除任务的接管任务 - 每分钟执行一次
+    scheduler.add_job(
+        resume_deletion_jobs,
+        trigger="interval",
+        minutes=1,
+        id="resume_deletion_jobs",
+        max_instances=1,
+        replace_existing=True,
+    )
+    logger.info("已添加后台删除任务接管任务：每分钟执行")
+
     # 添加清理旧任务记录的任务 - 每周执行一次
     scheduler.add_job(
         delete_old_job_executions,
@@ -56,12 +207,27 @@ def start_scheduler():
         replace_existing=True,
     )
     logger.info("已添加清理旧任务记录任务：每周一凌晨1:00执行")
+    return scheduler
+
+
+def start_scheduler(lock=None):
+    """获取主节点租约并启动后台调度器，已有其他调度器运行时返回 None"""
+    lock = lock or LeaderLock()
+    if not lock.acquire():
+        logger.info(f"调度器已在其他进程中运行（{lock.current_owner()}），本进程不启动调度器")
+        return None
 
+    scheduler = create_scheduler()
     try:
         logger.info("正在启动定时任务调度器...")
         scheduler.start()
-        logger.info("定时任务调度器启动成功")
+        logger.info(f"定时任务调度器启动成功（{lock.identity}）")
+        threading.Thread(
+            target=keep_leadership, args=(scheduler, lock, threading.Event()), daemon=True
+        ).start()
     except KeyboardInterrupt:
         logger.info("正在停止定时任务调度器...")
         scheduler.shutdown()
+        lock.release()
         logger.info("定时任务调度器已停止")
+    return scheduler
@@ -0,0 +1,63 @@
+import logging
+import os
+import socket
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import SchedulerLock
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """
+    基于数据库的主节点租约锁
+
+    通过带条件的 UPDATE 抢占租约：只有锁空闲、已过期或本身就是持有者时才能写入成功，
+    因此即使多个进程同时抢占，也只会有一个成功。持有者需要在租约过期前定期续约。
+    """
+
+    def __init__(self, name='default', ttl=None):
+        self.name = name
+        self.ttl = ttl or getattr(settings, 'SCHEDULER_LOCK_TTL', 60)
+        self.identity = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def _ensure_row(self):
+        if not SchedulerLock.objects.filter(name=self.name).exists():
+            try:
+                SchedulerLock.objects.create(name=self.name)
+            except IntegrityError:
+                # 其他进程已创建
+                pass
+
+    def acquire(self):
+        """尝试获取租约，成功返回 True"""
+        self._ensure_row()
+        now = timezone.now()
+        updated = SchedulerLock.objects.filter(name=self.name).filter(
+            Q(owner=self.identity) | Q(owner='') | Q(expires_at__isnull=True) | Q(expires_at__lt=now)
+        ).update(owner=self.identity, acquired_at=now, expires_at=now + timedelta(seconds=self.ttl))
+        return updated == 1
+
+    def renew(self):
+        """续约，只有当前持有者可以续约成功"""
+        now = timezone.now()
+        updated = SchedulerLock.objects.filter(
+            name=self.name, owner=self.identity, expires_at__gte=now
+        ).update(expires_at=now + timedelta(seconds=self.ttl))
+        return updated == 1
+
+    def release(self):
+        """释放租约"""
+        SchedulerLock.objects.filter(name=self.name, owner=self.identity).update(owner='', expires_at=None)
+
+    def current_owner(self):
+        lock = SchedulerLock.objects.filter(name=self.name).first()
+        if lock and lock.owner and lock.expires_at and lock.expires_at >= timezone.now():
+            return lock.owner
+        return None
@@ -0,0 +1,81 @@
+import logging
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from scheduler.jobs import create_scheduler, job_metrics_snapshot, keep_leadership
+from scheduler.leader import LeaderLock
+
+logger = logging.getLogger('scheduler')
+
+
+class Command(BaseCommand):
+    help = '以独立进程运行定时任务调度器，通过数据库租约保证全局只有一个调度器在运行'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-interval',
+            type=int,
+            default=15,
+            help='未获得主节点租约时的重试间隔（秒），默认15秒',
+        )
+        parser.add_argument(
+            '--lock-ttl',
+            type=int,
+            default=None,
+            help='租约有效期（秒），默认使用 SCHEDULER_LOCK_TTL 配置',
+        )
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+
+        def request_stop(signum, frame):
+            self.stdout.write('收到停止信号，正在退出...')
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        lock = LeaderLock(ttl=options['lock_ttl'])
+        self.stdout.write(f'调度器进程已启动（{lock.identity}），等待获取主节点租约...')
+
+        while not stop_event.is_set():
+            close_old_connections()
+            try:
+                acquired = lock.acquire()
+            except Exception as e:
+                logger.error(f"获取调度器租约失败：{e}")
+                acquired = False
+
+            if not acquired:
+                stop_event.wait(options['retry_interval'])
+                continue
+
+            self.stdout.write(self.style.SUCCESS('已成为主节点，启动定时任务调度器'))
+            scheduler = create_scheduler()
+            scheduler.start()
+
+            # 在主线程中续约，失去租约时调度器会被停止，此时回到等待状态
+            if keep_leadership(scheduler, lock, stop_event):
+                scheduler.shutdown()
+                lock.release()
+            else:
+                self.stdout.write(self.style.WARNING('调度器已失去主节点租约，重新进入等待状态'))
+
+        self._report_metrics()
+        self.stdout.write(self.style.SUCCESS('调度器进程已退出'))
+
+    def _report_metrics(self):
+        """输出本进程内的任务耗时统计"""
+        metrics = job_metrics_snapshot()
+        if not metrics:
+            return
+        self.stdout.write('任务耗时统计:')
+        for name, stats in sorted(metrics.items()):
+            self.stdout.write(
+                f"  - {name}: 执行 {stats['runs']} 次，失败 {stats['failures']} 次，"
+                f"平均 {stats['avg_seconds']:.3f}s，最长 {stats['max_seconds']:.3f}s，"
+                f"最近 {stats['last_seconds']:.3f}s"
+            )
@@ -0,0 +1,62 @@
+from django.db import models
+
+
+class SchedulerLock(models.Model):
+    """调度器主节点锁，保证所有进程/主机中只有一个调度器在运行"""
+    name = models.CharField(max_length=100, unique=True, verbose_name='锁名称')
+    owner = models.CharField(max_length=200, blank=True, verbose_name='持有者')
+    acquired_at = models.DateTimeField(null=True, blank=True, verbose_name='获取时间')
+    expires_at = models.DateTimeField(null=True, blank=True, verbose_name='过期时间')
+
+    class Meta:
+        verbose_name = '调度器锁'
+        verbose_name_plural = verbose_name
+
+    def __str__(self):
+        return f"{self.name} ({self.owner or '空闲'})"
+
+
+class DeletionJob(models.Model):
+    """后台分批删除任务，按步骤依次删除，每一步按主键范围分批执行"""
+    STATUS_CHOICES = [
+        ('pending', '等待中'),
+        ('running', '执行中'),
+        ('done', '已完成'),
+        ('failed', '失败'),
+    ]
+
+    description = models.CharField(max_length=255, verbose_name='任务说明')
+    # 删除步骤 [{"model": "app_label.Model", "filters": {...}}]，按顺序执行
+    steps = models.JSONField(verbose_name='删除步骤')
+    step = models.PositiveIntegerField(default=0, verbose_name='当前步骤')
+    last_pk = models.BigIntegerField(default=0, verbose_name='已删除到的主键')
+    total = models.PositiveIntegerField(default=0, verbose_name='待删除数量')
+    deleted = models.PositiveIntegerField(default=0, verbose_name='已删除数量')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name='状态')
+    owner = models.CharField(max_length=200, blank=True, verbose_name='执行者')
+    error = models.TextField(blank=True, verbose_name='错误信息')
+    created_by = models.CharField(max_length=200, blank=True, verbose_name='创建者')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='开始时间')
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name='最近进度时间')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='完成时间')
+
+    class Meta:
+        verbose_name = '后台删除任务'
+        verbose_name_plural = verbose_name
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'heartbeat_at'], name='deletion_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.description} ({self.get_status_display()})"
+
+    @property
+    def progress(self):
+        """完成百分比"""
+        if self.status == 'done':
+            return 100
+        if not self.total:
+            return 0
+        return min(round(self.deleted * 100 / self.total, 1), 99.9)
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+
+from .models import DeletionJob
+
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    """后台删除任务进度"""
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = DeletionJob
+        fields = [
+            'id', 'description', 'status', 'status_display', 'total', 'deleted', 'progress', 'error',
+            'created_by', 'created_at', 'started_at', 'finished_at'
+        ]
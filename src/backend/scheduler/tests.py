@@ -0,0 +1,182 @@
+import threading
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from evaluation.models import EvaluationRecord
+from finance.models import Department
+from items.models import Item, ItemUsage
+from personnel.models import Personnel
+
+from .deletion import cascade_steps, enqueue_deletion, resume_stale_jobs, run_deletion_job
+from .jobs import JOB_METRICS, check_expired_personnel, check_overdue_usages, resume_deletion_jobs
+from .leader import LeaderLock
+from .models import DeletionJob, SchedulerLock
+
+
+class LeaderLockTestCase(TestCase):
+    def test_only_one_holder(self):
+        """同一时间只有一个进程能持有租约"""
+        first, second = LeaderLock(ttl=60), LeaderLock(ttl=60)
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        self.assertTrue(first.renew())
+        self.assertFalse(second.renew())
+
+        first.release()
+        self.assertTrue(second.acquire())
+
+    def test_expired_lease_can_be_taken_over(self):
+        """租约过期后其他进程可以接管，原持有者续约失败"""
+        first, second = LeaderLock(ttl=60), LeaderLock(ttl=60)
+        self.assertTrue(first.acquire())
+        SchedulerLock.objects.filter(name='default').update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertTrue(second.acquire())
+        self.assertFalse(first.renew())
+        self.assertEqual(second.current_owner(), second.identity)
+
+
+@override_settings(DELETION_CHUNK_SIZE=2, DELETION_CHUNK_PAUSE=0, DELETION_JOB_IN_THREAD=False)
+class DeletionJobTestCase(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name='程序部')
+        for i in range(3):
+            person = Personnel.objects.create(
+                name=f'人员{i}', student_id=f'2024000{i}', gender='male', grade_major='2024级 计算机',
+                department=self.department, position='成员', start_date=date(2024, 9, 1),
+                phone='13800000000', qq='10001', email='a@example.com',
+            )
+            EvaluationRecord.objects.bulk_create([
+                EvaluationRecord(personnel=person.name, personnel_ref=person, department=self.department,
+                                 item_description='值班', bonus_score=1)
+                for _ in range(2)
+            ])
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pass1234'))
+
+        # 不发送真实的邮件；部门删除通知在视图启动的线程中发送，用事件等待调用完成
+        self.department_notified = threading.Event()
+        patcher = mock.patch(
+            'email_notice.services.EmailNotificationService.send_operation_notification',
+            side_effect=lambda *args, **kwargs: self.department_notified.set(),
+        )
+        self.notify_department = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('evaluation.views.EmailNotificationService.send_evaluation_operation_notification')
+        self.notify_evaluation = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_department_cascade_deleted_in_background(self):
+        """部门关联数据超过一批时返回 202，任务按步骤分批删除并可查询进度"""
+        response = self.client.delete(f'/api/departments/{self.department.id}/')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['job']['id']
+        self.assertEqual(response.data['job']['total'], 10)
+        self.assertTrue(Department.objects.filter(id=self.department.id).exists())
+        self.assertTrue(self.department_notified.wait(5))
+        self.assertEqual(
+            self.notify_department.call_args.args[:3], ('DELETE', '部门', {'id': self.department.id, 'name': '程序部'})
+        )
+
+        self.assertTrue(run_deletion_job(job_id))
+        self.assertFalse(Department.objects.exists())
+        self.assertFalse(Personnel.objects.exists())
+        self.assertFalse(EvaluationRecord.objects.exists())
+
+        response = self.client.get(f'/api/deletion-jobs/{job_id}/')
+        self.assertEqual((response.data['status'], response.data['deleted'], response.data['progress']),
+                         ('done', 10, 100))
+
+    def test_stale_job_resumed_from_last_pk(self):
+        """中断的任务由调度器从记录的位置继续，已完成的任务不会重复执行"""
+        job = enqueue_deletion(cascade_steps(self.department), '删除部门')
+        last_pk = EvaluationRecord.objects.order_by('id').values_list('id', flat=True)[1]
+        EvaluationRecord.objects.filter(id__lte=last_pk).delete()
+        DeletionJob.objects.filter(id=job.id).update(
+            status='running', owner='crashed', last_pk=last_pk, deleted=2,
+            heartbeat_at=timezone.now() - timedelta(hours=1),
+        )
+
+        self.assertEqual(resume_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted), ('done', 10))
+        self.assertFalse(Department.objects.exists())
+        self.assertFalse(run_deletion_job(job.id))
+
+    def test_rows_created_after_enqueue_survive(self):
+        """任务只删除提交时已存在的记录"""
+        job = enqueue_deletion(
+            [{'model': 'evaluation.EvaluationRecord', 'filters': {'department_id': self.department.id}}], '删除考评记录'
+        )
+        later = EvaluationRecord.objects.create(personnel='新成员', department=self.department, item_description='值班')
+
+        self.assertTrue(run_deletion_job(job.id))
+        job.refresh_from_db()
+        self.assertEqual((job.total, job.deleted), (6, 6))
+        self.assertEqual(list(EvaluationRecord.objects.values_list('id', flat=True)), [later.id])
+
+    def test_delete_personnel_small_batch_runs_inline(self):
+        response = self.client.delete('/api/evaluation-records/delete-personnel/?personnel=人员0')
+        self.assertEqual((response.status_code, response.data['deleted_count']), (200, 2))
+        self.assertFalse(DeletionJob.objects.exists())
+        self.notify_evaluation.assert_called_once()
+        self.assertIn('人员0', self.notify_evaluation.call_args.kwargs['operation_description'])
+
+
+class OverdueReminderTestCase(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        item = Item.objects.create(name='投影仪', serial_number='SN-001', category='设备', status='in_use')
+        self.usage = ItemUsage.objects.create(
+            item=item, user='张三', purpose='活动', start_time=now - timedelta(days=3),
+            expected_return_time=now - timedelta(days=1),
+        )
+
+    def test_reminder_recorded_only_after_confirmed_send(self):
+        """发送失败时不记录提醒时间，下次重试；发送成功后在提醒间隔内不再重复提醒"""
+        target = 'email_notice.services.EmailNotificationService.send_operation_notification'
+        with mock.patch(target, return_value=0) as send, self.assertLogs('scheduler.jobs', 'WARNING'):
+            check_overdue_usages()
+        send.assert_called_once()
+        self.usage.refresh_from_db()
+        self.assertIsNone(self.usage.overdue_notified_at)
+
+        with mock.patch(target, return_value=1) as send:
+            check_overdue_usages()
+            check_overdue_usages()
+        send.assert_called_once()
+        self.usage.refresh_from_db()
+        self.assertIsNotNone(self.usage.overdue_notified_at)
+
+        ItemUsage.objects.filter(id=self.usage.id).update(overdue_notified_at=timezone.now() - timedelta(days=1))
+        with mock.patch(target, return_value=1) as send:
+            check_overdue_usages()
+        send.assert_called_once()
+
+
+class JobFailureTestCase(TestCase):
+    def failures(self, job):
+        return JOB_METRICS.get(job.__name__, {}).get('failures', 0)
+
+    def test_failed_jobs_counted(self):
+        """任务内部出错时记录日志后继续抛出，timed_job 记录失败次数"""
+        before = self.failures(check_expired_personnel)
+        with mock.patch.object(Personnel, 'check_and_update_expired_personnel', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError), self.assertLogs('scheduler.jobs', 'ERROR'):
+                check_expired_personnel()
+        self.assertEqual(self.failures(check_expired_personnel), before + 1)
+        with mock.patch.object(ItemUsage, 'check_and_mark_overdue', side_effect=RuntimeError('boom')):
+            before = self.failures(check_overdue_usages)
+            with self.assertRaises(RuntimeError), self.assertLogs('scheduler.jobs', 'ERROR'):
+                check_overdue_usages()
+        self.assertEqual(self.failures(check_overdue_usages), before + 1)
+        with mock.patch('scheduler.jobs.resume_stale_jobs', side_effect=RuntimeError('boom')):
+            before = self.failures(resume_deletion_jobs)
+            with self.assertRaises(RuntimeError), self.assertLogs('scheduler.jobs', 'ERROR'):
+                resume_deletion_jobs()
+        self.assertEqual(self.failures(resume_deletion_jobs), before + 1)
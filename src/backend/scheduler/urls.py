@@ -0,0 +1,11 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from .views import DeletionJobViewSet
+
+router = DefaultRouter()
+router.register(r'deletion-jobs', DeletionJobViewSet)
+
+urlpatterns = [
+    path('api/', include(router.urls)),
+]
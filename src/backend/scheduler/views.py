@@ -0,0 +1,13 @@
+from rest_framework import viewsets
+
+from item_manager.authentication import CachedJWTAuthentication
+
+from .models import DeletionJob
+from .serializers import DeletionJobSerializer
+
+
+class DeletionJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """后台删除任务进度查询"""
+    authentication_classes = [CachedJWTAuthentication]
+    queryset = DeletionJob.objects.all()
+    serializer_class = DeletionJobSerializer
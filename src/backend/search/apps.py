@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "search"
+    verbose_name = "全文搜索"
+
+    def ready(self):
+        from . import indexes  # noqa: F401  注册各应用的索引定义
+        from .backends import install_search_backend
+        from .registry import connect_signals
+
+        connect_signals()
+        # 全文索引（FTS5 虚拟表 / FULLTEXT 索引）无法用模型声明，迁移完成后再创建
+        post_migrate.connect(install_search_backend, sender=self)
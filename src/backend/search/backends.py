@@ -0,0 +1,203 @@
+"""
+全文搜索后端
+
+- SQLite：FTS5 外部内容表 + 触发器，对预切分的二元组词元做 bm25 排序
+- MySQL：title/body 上的 FULLTEXT 索引，使用 ngram 解析器处理中文
+- 其他数据库或 SQLite 未编译 FTS5 时回退到 LIKE 匹配
+"""
+import functools
+import logging
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .models import SearchDocument
+from .tokenizer import query_terms
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'search_document_fts'
+FULLTEXT_INDEX = 'search_doc_fulltext'
+# bm25 列权重：标题命中比正文命中更重要
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+
+class LikeSearchBackend:
+    """回退实现：逐词 LIKE 匹配，标题命中排在前面"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, query, doc_types=None, limit=20, column='id'):
+        """返回 [(文档ID, 得分)]，按得分降序；column='object_id' 时返回对象主键"""
+        words = query.split()
+        if not words:
+            return []
+        queryset = SearchDocument.objects.using(self.connection.alias)
+        title_match = Q()
+        for word in words:
+            queryset = queryset.filter(Q(title__icontains=word) | Q(body__icontains=word))
+            title_match &= Q(title__icontains=word)
+        if doc_types:
+            queryset = queryset.filter(doc_type__in=doc_types)
+        queryset = queryset.annotate(
+            score=Case(When(title_match, then=Value(2)), default=Value(1), output_field=IntegerField())
+        ).order_by('-score', '-updated_at')
+        return [(doc_id, float(score)) for doc_id, score in queryset.values_list(column, 'score')[:limit]]
+
+
+class SQLiteFTSBackend(LikeSearchBackend):
+    """SQLite FTS5 实现"""
+
+    def install(self):
+        table = SearchDocument._meta.db_table
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+            )
+            exists = cursor.fetchone() is not None
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"title_tokens, body_tokens, content='{table}', content_rowid='id', tokenize='unicode61')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {FTS_TABLE}(rowid, title_tokens, body_tokens) "
+                f"VALUES (new.id, new.title_tokens, new.body_tokens); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title_tokens, body_tokens) "
+                f"VALUES ('delete', old.id, old.title_tokens, old.body_tokens); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title_tokens, body_tokens) "
+                f"VALUES ('delete', old.id, old.title_tokens, old.body_tokens); "
+                f"INSERT INTO {FTS_TABLE}(rowid, title_tokens, body_tokens) "
+                f"VALUES (new.id, new.title_tokens, new.body_tokens); END"
+            )
+        if not exists:
+            # 升级前已存在的搜索文档需要补建索引
+            self.rebuild()
+
+    def rebuild(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+    @staticmethod
+    def match_expression(query):
+        """把查询转换成 FTS5 MATCH 表达式，各词之间为 AND 关系"""
+        parts = []
+        for tokens, prefix in query_terms(query):
+            phrase = '"' + ' '.join(tokens) + '"'
+            parts.append(phrase + '*' if prefix else phrase)
+        return ' '.join(parts)
+
+    def search(self, query, doc_types=None, limit=20, column='id'):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        table = SearchDocument._meta.db_table
+        sql = (
+            f"SELECT d.{column}, bm25({FTS_TABLE}, %s, %s) AS rank FROM {FTS_TABLE} "
+            f"JOIN {table} d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s"
+        )
+        params = [TITLE_WEIGHT, BODY_WEIGHT, expression]
+        if doc_types:
+            sql += f" AND d.doc_type IN ({', '.join(['%s'] * len(doc_types))})"
+            params.extend(doc_types)
+        sql += " ORDER BY rank LIMIT %s"
+        params.append(limit)
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+        except DatabaseError as e:
+            logger.warning(f"FTS5 查询失败，回退到 LIKE 匹配：{e}")
+            return super().search(query, doc_types, limit, column)
+        # bm25 越小越相关，取反后得分越大越相关
+        return [(doc_id, -rank) for doc_id, rank in rows]
+
+
+class MySQLFulltextBackend(LikeSearchBackend):
+    """MySQL FULLTEXT 实现，中文分词交给 ngram 解析器（ngram_token_size 默认为 2）"""
+
+    def install(self):
+        table = SearchDocument._meta.db_table
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+                [table, FULLTEXT_INDEX],
+            )
+            if cursor.fetchone()[0]:
+                return
+            cursor.execute(
+                f"ALTER TABLE {table} ADD FULLTEXT INDEX {FULLTEXT_INDEX} (title, body) WITH PARSER ngram"
+            )
+
+    @staticmethod
+    def match_expression(query):
+        """布尔模式表达式：每个词都必须出现，按短语匹配"""
+        words = [word.replace('"', '') for word in query.split()]
+        return ' '.join(f'+"{word}"' for word in words if word)
+
+    def search(self, query, doc_types=None, limit=20, column='id'):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        table = SearchDocument._meta.db_table
+        match = "MATCH(title, body) AGAINST (%s IN BOOLEAN MODE)"
+        sql = f"SELECT {column}, {match} AS score FROM {table} WHERE {match}"
+        params = [expression, expression]
+        if doc_types:
+            sql += f" AND doc_type IN ({', '.join(['%s'] * len(doc_types))})"
+            params.extend(doc_types)
+        sql += " ORDER BY score DESC LIMIT %s"
+        params.append(limit)
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+        except DatabaseError as e:
+            logger.warning(f"FULLTEXT 查询失败，回退到 LIKE 匹配：{e}")
+            return super().search(query, doc_types, limit, column)
+        return [(doc_id, float(score)) for doc_id, score in rows]
+
+
+@functools.lru_cache(maxsize=None)
+def sqlite_has_fts5():
+    """检查当前 SQLite 是否编译了 FTS5 扩展"""
+    import sqlite3
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE probe USING fts5(content)')
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def get_search_backend(using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and sqlite_has_fts5():
+        return SQLiteFTSBackend(connection)
+    if connection.vendor == 'mysql':
+        return MySQLFulltextBackend(connection)
+    return LikeSearchBackend(connection)
+
+
+def install_search_backend(sender=None, using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate 回调：创建全文索引结构"""
+    backend = get_search_backend(using)
+    try:
+        backend.install()
+    except Exception as e:
+        logger.error(f"创建全文索引失败，搜索将回退到 LIKE 匹配：{e}")
@@ -0,0 +1,42 @@
+"""
+列表视图的全文搜索
+
+FullTextSearchFilter 代替 DRF 的 SearchFilter：?search= 不再对 search_fields 逐列做 LIKE '%x%' 全表扫描，
+而是在全文索引中查出命中的对象主键后按主键过滤。视图用 search_doc_type 指定索引类型。
+"""
+from rest_framework.filters import SearchFilter
+
+from .services import matching_ids
+
+
+class FullTextSearchMixin:
+    """
+    全文搜索结果最多 search_limit 条，视图设置 search_truncated 后在响应头中说明是否被截断
+
+    X-Search-Limit 为上限，X-Search-Truncated 为 true 时说明还有更多结果，需要更精确的关键词。
+    """
+    search_limit = 1000
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'search_truncated', None) is not None:
+            response['X-Search-Limit'] = str(self.search_limit)
+            response['X-Search-Truncated'] = 'true' if self.search_truncated else 'false'
+        return response
+
+    def search_ids(self, query, doc_type):
+        """全文索引中命中的主键，最多 search_limit 个"""
+        # 多取一条，用于判断结果是否被截断
+        ids = matching_ids(query, doc_type, self.search_limit + 1)
+        self.search_truncated = len(ids) > self.search_limit
+        return ids[:self.search_limit]
+
+
+class FullTextSearchFilter(SearchFilter):
+    """按 ?search= 在视图的 search_doc_type 索引中搜索，视图需要继承 FullTextSearchMixin"""
+
+    def filter_queryset(self, request, queryset, view):
+        query = ' '.join(self.get_search_terms(request))
+        if not query:
+            return queryset
+        return queryset.filter(pk__in=view.search_ids(query, view.search_doc_type))
@@ -0,0 +1,51 @@
+"""各应用的搜索索引定义"""
+from evaluation.models import EvaluationRecord
+from finance.models import Department
+from items.models import Item, ItemUsage
+from memo.models import Memo
+from personnel.models import Personnel
+
+from .registry import register
+
+
+register(
+    'item', Item, '物品',
+    lambda item: (item.name, [
+        item.serial_number, item.category, item.location, item.owner, item.description,
+    ]),
+)
+
+register(
+    'usage', ItemUsage, '使用记录',
+    lambda usage: (f'{usage.item.name} - {usage.user}', [
+        usage.user, usage.item.serial_number, usage.purpose, usage.notes,
+    ]),
+    queryset=lambda: ItemUsage.objects.select_related('item'),
+    depends_on=[(Item, 'item', ['name', 'serial_number'])],
+)
+
+register(
+    'memo', Memo, '备忘录',
+    # 已停用的备忘录不出现在搜索结果中
+    lambda memo: (memo.title, [memo.content]) if memo.is_active else None,
+    queryset=lambda: Memo.objects.filter(is_active=True),
+)
+
+register(
+    'personnel', Personnel, '人员',
+    lambda person: (person.name, [
+        person.student_id, person.department.name, person.position, person.grade_major,
+        person.phone, person.email, person.qq, person.description,
+    ]),
+    queryset=lambda: Personnel.objects.select_related('department'),
+    depends_on=[(Department, 'department', ['name'])],
+)
+
+register(
+    'evaluation', EvaluationRecord, '考评记录',
+    lambda record: (f'{record.personnel} {record.item_description}', [
+        record.department.name, record.grade, record.remarks,
+    ]),
+    queryset=lambda: EvaluationRecord.objects.select_related('department'),
+    depends_on=[(Department, 'department', ['name'])],
+)
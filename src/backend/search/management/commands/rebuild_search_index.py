@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from search.backends import get_search_backend
+from search.registry import INDEXES, rebuild
+
+
+class Command(BaseCommand):
+    help = '重建全文搜索索引（批量导入或直接修改数据库后使用）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--types',
+            nargs='*',
+            default=None,
+            help=f'只重建指定类型，可选：{", ".join(INDEXES)}',
+        )
+
+    def handle(self, *args, **options):
+        doc_types = options['types']
+        unknown = [t for t in doc_types or [] if t not in INDEXES]
+        if unknown:
+            raise CommandError(f'不支持的搜索类型：{", ".join(unknown)}')
+
+        backend = get_search_backend()
+        backend.install()
+        counts = rebuild(doc_types)
+        backend.rebuild()
+
+        for doc_type, count in counts.items():
+            self.stdout.write(f'{INDEXES[doc_type].label}：{count} 条')
+        self.stdout.write(self.style.SUCCESS('搜索索引重建完成'))
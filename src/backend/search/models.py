@@ -0,0 +1,30 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """搜索文档，每个被索引的对象对应一行，由信号保持与源数据同步"""
+    doc_type = models.CharField(max_length=30, verbose_name='文档类型')
+    object_id = models.PositiveBigIntegerField(verbose_name='对象ID')
+    title = models.CharField(max_length=255, verbose_name='标题')
+    body = models.TextField(blank=True, verbose_name='正文')
+    # 预先切分好的词元（中文二元组），供 SQLite FTS5 使用
+    title_tokens = models.TextField(blank=True, verbose_name='标题词元')
+    body_tokens = models.TextField(blank=True, verbose_name='正文词元')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        verbose_name = '搜索文档'
+        verbose_name_plural = verbose_name
+        constraints = [
+            models.UniqueConstraint(fields=['doc_type', 'object_id'], name='search_doc_unique_object'),
+        ]
+
+    def __str__(self):
+        return f"{self.doc_type}#{self.object_id} {self.title}"
+
+    @property
+    def summary(self):
+        """返回正文的缩略预览"""
+        if len(self.body) > 100:
+            return self.body[:100] + "..."
+        return self.body
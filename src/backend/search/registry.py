@@ -0,0 +1,226 @@
+"""
+搜索索引注册表
+
+各应用的模型通过 register() 声明如何生成标题和正文，保存/删除时由信号同步到 SearchDocument。
+bulk_create / update 不会触发信号，批量写入后需要显式调用 index_objects()。
+删除时同一事务中的文档在提交后用 remove_documents() 一次删除，queryset.delete() 不会逐行删除文档。
+文档中冗余了关联对象的字段（如使用记录中的物品名称）时，用 depends_on 声明，关联对象的这些字段修改后重建相关文档。
+"""
+import logging
+
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from item_manager.transactions import defer_until_commit
+
+from .models import SearchDocument
+from .tokenizer import tokenize
+
+logger = logging.getLogger(__name__)
+
+# doc_type -> SearchIndex
+INDEXES = {}
+
+
+class SearchIndex:
+    """单个模型的索引定义"""
+
+    def __init__(self, doc_type, model, label, build, queryset=None, depends_on=None):
+        self.doc_type = doc_type
+        self.model = model
+        self.label = label
+        # build(instance) 返回 (标题, [正文片段...])，返回 None 表示该对象不应被索引
+        self.build = build
+        self._queryset = queryset
+        # [(关联模型, 指向它的外键名, [文档中用到的字段...])]
+        self.depends_on = depends_on or []
+
+    def get_queryset(self):
+        """重建索引时使用的查询集"""
+        if self._queryset is not None:
+            return self._queryset()
+        return self.model._default_manager.all()
+
+    def make_document(self, instance):
+        built = self.build(instance)
+        if built is None:
+            return None
+        title, parts = built
+        title = str(title or '')[:255]
+        body = '\n'.join(str(part) for part in parts if part)
+        return SearchDocument(
+            doc_type=self.doc_type,
+            object_id=instance.pk,
+            title=title,
+            body=body,
+            title_tokens=tokenize(title),
+            body_tokens=tokenize(body),
+        )
+
+
+def register(doc_type, model, label, build, queryset=None, depends_on=None):
+    """注册模型的索引定义"""
+    INDEXES[doc_type] = SearchIndex(doc_type, model, label, build, queryset, depends_on)
+    return INDEXES[doc_type]
+
+
+def get_index_for_model(model):
+    for index in INDEXES.values():
+        if index.model is model:
+            return index
+    return None
+
+
+def index_instance(instance):
+    """写入或更新单个对象的搜索文档"""
+    index = get_index_for_model(type(instance))
+    if index is None:
+        return
+    document = index.make_document(instance)
+    if document is None:
+        remove_instance(instance)
+        return
+    SearchDocument.objects.update_or_create(
+        doc_type=index.doc_type,
+        object_id=instance.pk,
+        defaults={
+            'title': document.title,
+            'body': document.body,
+            'title_tokens': document.title_tokens,
+            'body_tokens': document.body_tokens,
+        },
+    )
+
+
+def remove_instance(instance):
+    index = get_index_for_model(type(instance))
+    if index is not None:
+        SearchDocument.objects.filter(doc_type=index.doc_type, object_id=instance.pk).delete()
+
+
+def remove_documents(model, ids, batch_size=500):
+    """
+    批量删除已删除对象的搜索文档，返回删除的文档数
+
+    仍然存在的对象（例如所在的保存点已回滚）会被跳过。
+    """
+    index = get_index_for_model(model)
+    if index is None:
+        return 0
+    ids = list(ids)
+    removed = 0
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        existing = model._base_manager.filter(pk__in=chunk).values_list('pk', flat=True)
+        removed += SearchDocument.objects.filter(
+            doc_type=index.doc_type, object_id__in=set(chunk) - set(existing)
+        ).delete()[0]
+    return removed
+
+
+def index_objects(objects, batch_size=500):
+    """批量写入搜索文档（用于 bulk_create 之后或重建索引），返回写入数量"""
+    objects = [obj for obj in objects if obj.pk is not None]
+    if not objects:
+        return 0
+    index = get_index_for_model(type(objects[0]))
+    if index is None:
+        return 0
+
+    documents = [doc for doc in (index.make_document(obj) for obj in objects) if doc is not None]
+    SearchDocument.objects.filter(
+        doc_type=index.doc_type, object_id__in=[obj.pk for obj in objects]
+    ).delete()
+    SearchDocument.objects.bulk_create(documents, batch_size=batch_size)
+    return len(documents)
+
+
+def index_created(objects):
+    """bulk_create 之后同步索引；数据库不回填主键（如 MySQL）时重建该类型的全部文档"""
+    objects = list(objects)
+    if not objects:
+        return 0
+    if all(obj.pk is not None for obj in objects):
+        return index_objects(objects)
+    index = get_index_for_model(type(objects[0]))
+    return rebuild([index.doc_type])[index.doc_type] if index else 0
+
+
+def index_queryset(queryset, chunk_size=500):
+    """分批为查询集中的对象写入搜索文档，返回写入数量"""
+    count = 0
+    chunk = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) >= chunk_size:
+            count += index_objects(chunk)
+            chunk = []
+    return count + index_objects(chunk)
+
+
+def rebuild(doc_types=None, chunk_size=500):
+    """按类型重建搜索文档，返回 {doc_type: 文档数}"""
+    counts = {}
+    for doc_type, index in INDEXES.items():
+        if doc_types and doc_type not in doc_types:
+            continue
+        SearchDocument.objects.filter(doc_type=doc_type).delete()
+        counts[doc_type] = index_queryset(index.get_queryset(), chunk_size)
+    return counts
+
+
+def _on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_instance(instance)
+
+
+def _on_delete(sender, instance, using=None, **kwargs):
+    # 同一事务中删除的对象在提交后一起删除文档
+    defer_until_commit(
+        ('search_remove', sender._meta.label_lower), instance.pk,
+        lambda ids: remove_documents(sender, ids), using=using,
+    )
+
+
+def _dependents(model):
+    """依赖 model 字段的索引：[(索引, 外键名, 字段)]"""
+    return [
+        (index, lookup, fields)
+        for index in INDEXES.values()
+        for related_model, lookup, fields in index.depends_on
+        if related_model is model
+    ]
+
+
+def _on_related_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """记录关联对象修改前的字段值，保存后只在这些字段变化时重建相关文档"""
+    if raw or instance.pk is None:
+        return
+    dependents = _dependents(sender)
+    fields = sorted({field for _, _, watched in dependents for field in watched})
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+    instance._search_previous_values = (
+        sender._base_manager.filter(pk=instance.pk).values(*fields).first()
+    )
+
+
+def _on_related_save(sender, instance, created=False, raw=False, **kwargs):
+    previous = instance.__dict__.pop('_search_previous_values', None)
+    if raw or created or previous is None:
+        return
+    for index, lookup, fields in _dependents(sender):
+        if any(previous[field] != getattr(instance, field) for field in fields):
+            index_queryset(index.get_queryset().filter(**{lookup: instance.pk}))
+
+
+def connect_signals():
+    related_models = set()
+    for doc_type, index in INDEXES.items():
+        post_save.connect(_on_save, sender=index.model, dispatch_uid=f'search_index_save_{doc_type}')
+        post_delete.connect(_on_delete, sender=index.model, dispatch_uid=f'search_index_delete_{doc_type}')
+        related_models.update(related_model for related_model, _, _ in index.depends_on)
+    for model in related_models:
+        label = model._meta.label_lower
+        pre_save.connect(_on_related_pre_save, sender=model, dispatch_uid=f'search_related_pre_save_{label}')
+        post_save.connect(_on_related_save, sender=model, dispatch_uid=f'search_related_save_{label}')
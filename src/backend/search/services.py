@@ -0,0 +1,72 @@
+import re
+
+from django.utils.html import escape
+
+from .backends import get_search_backend
+from .models import SearchDocument
+from .registry import INDEXES
+from .tokenizer import query_terms
+
+# 高亮片段的长度（字符数）
+SNIPPET_LENGTH = 80
+
+
+def search(query, doc_types=None, limit=20):
+    """跨应用全文搜索，返回按相关度排序的结果列表"""
+    query = (query or '').strip()
+    if not query:
+        return []
+    ranked = get_search_backend().search(query, doc_types=doc_types, limit=limit)
+    documents = SearchDocument.objects.in_bulk([doc_id for doc_id, _ in ranked])
+
+    results = []
+    for doc_id, score in ranked:
+        document = documents.get(doc_id)
+        if document is None:
+            continue
+        index = INDEXES.get(document.doc_type)
+        results.append({
+            'type': document.doc_type,
+            'type_display': index.label if index else document.doc_type,
+            'id': document.object_id,
+            'title': document.title,
+            'summary': document.summary,
+            'highlight': highlight(document.body, query) or escape(document.summary),
+            'score': round(score, 4),
+        })
+    return results
+
+
+def matching_ids(query, doc_type, limit):
+    """返回全文索引中命中的某类对象的主键，按相关度排序"""
+    query = (query or '').strip()
+    if not query:
+        return []
+    ranked = get_search_backend().search(query, doc_types=[doc_type], limit=limit, column='object_id')
+    return [object_id for object_id, _ in ranked]
+
+
+def highlight(text, query, length=SNIPPET_LENGTH):
+    """截取正文中第一个命中词附近的片段，命中词用 <mark> 包裹（已做 HTML 转义）；未命中时返回空字符串"""
+    words = []
+    for tokens, _ in query_terms(query):
+        words.append(tokens[0] + ''.join(token[1:] for token in tokens[1:]))
+    if not text or not words:
+        return ''
+    pattern = re.compile('|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True)), re.IGNORECASE)
+    first = pattern.search(text)
+    if first is None:
+        return ''
+
+    start = max(first.start() - length // 4, 0)
+    end = min(start + length, len(text))
+    snippet = text[start:end]
+    parts, last = [], 0
+    for match in pattern.finditer(snippet):
+        parts.append(escape(snippet[last:match.start()]))
+        parts.append(f'<mark>{escape(match.group())}</mark>')
+        last = match.end()
+    parts.append(escape(snippet[last:]))
+    prefix = '...' if start > 0 else ''
+    suffix = '...' if end < len(text) else ''
+    return prefix + ''.join(parts) + suffix
@@ -0,0 +1,126 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from evaluation.models import EvaluationRecord
+from finance.models import Department
+from items.models import Item, ItemUsage
+from memo.models import Memo
+from personnel.models import Personnel
+
+from .models import SearchDocument
+from .registry import rebuild
+from .services import search
+from .tokenizer import tokenize
+
+
+class TokenizerTestCase(TestCase):
+    def test_chinese_bigrams(self):
+        self.assertEqual(tokenize('投影仪 SN-001'), '投影 影仪 仪 sn 001')
+
+
+class SearchTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='pass1234')
+        self.projector = Item.objects.create(
+            name='便携投影仪', serial_number='SN-001', category='设备', description='会议室使用'
+        )
+        Item.objects.create(name='白板笔', serial_number='SN-002', category='文具', description='投影仪旁边的抽屉')
+        self.memo = Memo.objects.create(title='社团活动安排', content='周五借用投影仪', created_by=self.user)
+
+    def test_chinese_substring_ranked_by_title(self):
+        """中文子串可以命中，标题命中排在正文命中之前"""
+        results = search('投影')
+        self.assertEqual(len(results), 3)
+        self.assertEqual((results[0]['type'], results[0]['id']), ('item', self.projector.id))
+
+    def test_index_follows_updates_and_deletes(self):
+        self.memo.is_active = False
+        self.memo.save()
+        self.assertEqual(search('社团'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.projector.delete()
+        self.assertFalse(SearchDocument.objects.filter(doc_type='item', object_id=self.projector.id).exists())
+
+    def test_dependent_documents_follow_renames(self):
+        """物品、部门改名后，使用记录、考评记录中冗余的名称同步更新；无关字段修改不重建"""
+        usage = ItemUsage.objects.create(
+            item=self.projector, user='张三', purpose='活动', start_time=timezone.now()
+        )
+        department = Department.objects.create(name='程序部')
+        record = EvaluationRecord.objects.create(personnel='李四', department=department, item_description='值班')
+
+        indexed_at = SearchDocument.objects.get(doc_type='usage', object_id=usage.id).updated_at
+        self.projector.status = 'in_use'
+        self.projector.save()
+        self.assertEqual(SearchDocument.objects.get(doc_type='usage', object_id=usage.id).updated_at, indexed_at)
+
+        self.projector.name = '激光投影仪'
+        self.projector.save()
+        document = SearchDocument.objects.get(doc_type='usage', object_id=usage.id)
+        self.assertEqual(document.title, '激光投影仪 - 张三')
+
+        department.name = '网络部'
+        department.save()
+        self.assertEqual([hit['id'] for hit in search('网络部', doc_types=['evaluation'])], [record.id])
+
+    def test_bulk_delete_removes_documents_in_one_query(self):
+        """queryset.delete() 删除多行时，提交后用一条语句删除全部文档"""
+        department = Department.objects.create(name='程序部')
+        EvaluationRecord.objects.bulk_create([
+            EvaluationRecord(personnel=f'成员{i}', department=department, item_description='值班') for i in range(30)
+        ])
+        rebuild(['evaluation'])
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            EvaluationRecord.objects.all().delete()
+        document_deletes = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('DELETE FROM "search_searchdocument"')
+        ]
+        self.assertEqual(len(document_deletes), 1)
+        self.assertFalse(SearchDocument.objects.filter(doc_type='evaluation').exists())
+
+    def test_list_search_uses_index(self):
+        """人员、考评记录的 ?search= 和按使用人查询使用记录都走全文索引，不再对全表逐列 LIKE"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        department = Department.objects.create(name='程序部')
+        person = Personnel.objects.create(
+            name='张三', student_id='20240001', gender='male', grade_major='2024级 计算机', department=department,
+            position='成员', start_date=date(2024, 9, 1), phone='13800000000', qq='10001', email='a@example.com',
+        )
+        record = EvaluationRecord.objects.create(personnel='李四', department=department, item_description='值班')
+        EvaluationRecord.objects.create(personnel='王五', department=department, item_description='迟到')
+        usage = ItemUsage.objects.create(item=self.projector, user='张三', purpose='活动', start_time=timezone.now())
+        ItemUsage.objects.create(item=self.projector, user='李四', purpose='张三的活动', start_time=timezone.now())
+
+        for path, params, expected in [
+            ('/api/personnel/', {'search': '计算机'}, [person.id]),
+            ('/api/evaluation-records/', {'search': '值班'}, [record.id]),
+            ('/api/usages/by_user/', {'user_name': '张三'}, [usage.id]),
+        ]:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(path, params)
+            self.assertEqual([row['id'] for row in response.data], expected)
+            self.assertEqual(response['X-Search-Truncated'], 'false')
+            # 按使用人查询只在索引命中的记录中再匹配使用人，不扫描全表
+            self.assertFalse([
+                query for query in queries.captured_queries
+                if ' LIKE ' in query['sql'] and ' IN (' not in query['sql']
+            ])
+
+    def test_search_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/search/', {'q': 'sn 001', 'types': 'item'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([hit['id'] for hit in response.data['results']], [self.projector.id])
+
+        response = client.get('/api/search/', {'q': '投影', 'types': 'unknown'})
+        self.assertEqual(response.status_code, 400)
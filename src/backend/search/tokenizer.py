@@ -0,0 +1,47 @@
+"""
+中文 n-gram 分词
+
+SQLite 自带的 unicode61 分词器会把一整段中文当成一个词，无法做子串匹配。
+这里在写入索引前把中文切成重叠的二元组（"投影仪" -> "投影 影仪 仪"），
+字母数字按整词保留，查询时再按相同规则切分，从而用 FTS 实现中文子串搜索。
+"""
+import re
+import unicodedata
+
+_CJK_RANGES = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_TOKEN_RE = re.compile(f'([{_CJK_RANGES}]+)|([0-9a-z]+)')
+
+
+def _runs(text):
+    """按中文段 / 字母数字段切分，返回 (是否中文, 片段)"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    for match in _TOKEN_RE.finditer(text):
+        cjk, word = match.groups()
+        yield (True, cjk) if cjk else (False, word)
+
+
+def tokenize(text):
+    """索引分词：中文切成二元组并补上末字（保证每个字都是某个词元的开头），字母数字按整词保留"""
+    tokens = []
+    for is_cjk, run in _runs(text):
+        if is_cjk:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            tokens.append(run[-1])
+        else:
+            tokens.append(run)
+    return ' '.join(tokens)
+
+
+def query_terms(text):
+    """
+    查询分词，返回 [(词元列表, 是否前缀匹配)]
+
+    多字中文切成相邻二元组做短语匹配；单个汉字和字母数字做前缀匹配。
+    """
+    terms = []
+    for is_cjk, run in _runs(text):
+        if is_cjk and len(run) > 1:
+            terms.append(([run[i:i + 2] for i in range(len(run) - 1)], False))
+        else:
+            terms.append(([run], True))
+    return terms
@@ -0,0 +1,41 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from item_manager.authentication import CachedJWTAuthentication
+
+from .registry import INDEXES
+from .services import search
+
+MAX_LIMIT = 100
+
+
+@api_view(["GET"])
+@authentication_classes([CachedJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def global_search(request):
+    """统一搜索API：/api/search/?q=关键词&types=item,memo&limit=20"""
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': '请输入搜索关键词'}, status=status.HTTP_400_BAD_REQUEST)
+
+    doc_types = [t for t in request.query_params.get('types', '').split(',') if t]
+    unknown = [t for t in doc_types if t not in INDEXES]
+    if unknown:
+        return Response(
+            {'error': f'不支持的搜索类型：{", ".join(unknown)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), MAX_LIMIT)
+    except ValueError:
+        return Response({'error': 'limit 必须为整数'}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = search(query, doc_types=doc_types or None, limit=limit)
+    return Response({
+        'query': query,
+        'count': len(results),
+        'results': results,
+    })
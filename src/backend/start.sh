@@ -227,6 +227,15 @@ check_port() {
     fi
 }
 
+# 启动定时任务调度器（独立进程，通过数据库租约保证全局只运行一个）
+start_scheduler() {
+    print_step "启动定时任务调度器..."
+    mkdir -p logs
+    DJANGO_SETTINGS_MODULE=item_manager.settings_production \
+        nohup python manage.py run_scheduler >> logs/scheduler-process.log 2>&1 &
+    print_message "定时任务调度器已在后台启动，PID: $!"
+}
+
 # 启动服务器
 start_server() {
     print_step "启动Gunicorn ASGI服务器..."
@@ -279,6 +288,7 @@ main() {
     print_message "- 默认管理员: admin / admin123"
     echo ""
 
+    start_scheduler
     start_server
 }
 